@@ -0,0 +1,201 @@
+"""
+Request Micro-Batching for the Fraud Detection API
+Coalesces concurrent requests into batches scored by a single call
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Asyncio request coalescer
+
+    submit() enqueues an item and waits for its result. A background task
+    collects queued items until max_batch_size are waiting or the oldest has
+    waited max_wait_ms, scores them with one score_batch call and resolves
+    each caller. score_batch takes a list of items and returns their results
+    in the same order; an exception in place of a result fails only that
+    item's caller. score_batch may have side effects, so a batch that raises
+    fails all of its callers rather than being replayed item by item.
+
+    runner, if given, is awaited as runner(score_batch, items) to run the
+    call elsewhere (e.g. ScoringPool.run); otherwise it runs on the event
+    loop. With max_queue_size, submit() raises asyncio.QueueFull once that
+    many items are waiting.
+    """
+
+    def __init__(self, score_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, metrics_window: int = 10000,
+                 runner: Optional[Callable[..., Awaitable]] = None, max_queue_size: int = 0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms cannot be negative")
+
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.runner = runner
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+
+        # Metrics
+        self.batch_count = 0
+        self.item_count = 0
+        self.failed_batches = 0
+        self.failed_items = 0
+        self.batch_size_histogram: Counter = Counter()
+        self.queue_delays_ms: Deque[float] = deque(maxlen=metrics_window)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the flush task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task, letting a batch in flight finish, then score whatever is still queued"""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # A batch that was being scored when the task was cancelled still resolves its callers
+        if self._flushing is not None:
+            await self._flushing
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for start in range(0, len(pending), self.max_batch_size):
+            await self._flush(pending[start:start + self.max_batch_size])
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if not self.running:
+            raise RuntimeError("MicroBatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                await self._collect(batch)
+            finally:
+                # Also on cancellation, so a batch collected at shutdown is still scored. Shielded
+                # so stop() cannot cancel a batch mid-score and leave its callers waiting
+                self._flushing = asyncio.ensure_future(self._flush(batch))
+                await asyncio.shield(self._flushing)
+
+    async def _collect(self, batch: List) -> None:
+        """Add queued items to batch until it is full or its oldest item is due"""
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take what is already queued before waiting for more
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def _score(self, items: List) -> List:
+        if self.runner is not None:
+            return await self.runner(self.score_batch, items)
+        return self.score_batch(items)
+
+    async def _flush(self, batch: List) -> None:
+        """Score one batch and resolve its futures"""
+        flush_time = time.perf_counter()
+        self.batch_count += 1
+        self.item_count += len(batch)
+        self.batch_size_histogram[len(batch)] += 1
+        self.queue_delays_ms.extend((flush_time - enqueued) * 1000 for _, _, enqueued in batch)
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self._score(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"score_batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self.failed_batches += 1
+            logger.warning(f"Batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                self._resolve(future, exception=e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if isinstance(result, Exception):
+                self.failed_items += 1
+                self._resolve(future, exception=result)
+            else:
+                self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, exception: Optional[Exception] = None) -> None:
+        # The caller may have gone away (e.g. client disconnect cancelled the request)
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def get_metrics(self) -> Dict:
+        """Batch-size distribution and queue delay statistics"""
+        histogram = {}
+        for bucket, count in sorted(self._bucket_batch_sizes().items()):
+            low, high = (2 ** (bucket - 1) + 1 if bucket else 1), 2 ** bucket
+            histogram[str(high) if low == high else f"{low}-{high}"] = count
+        delays = np.array(self.queue_delays_ms) if self.queue_delays_ms else np.zeros(1)
+
+        return {
+            "enabled": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_size": self.max_queue_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batch_count,
+            "items": self.item_count,
+            "failed_batches": self.failed_batches,
+            "failed_items": self.failed_items,
+            "avg_batch_size": self.item_count / self.batch_count if self.batch_count else 0,
+            "batch_size_distribution": histogram,
+            "queue_delay_ms": {
+                "p50": float(np.percentile(delays, 50)),
+                "p95": float(np.percentile(delays, 95)),
+                "p99": float(np.percentile(delays, 99)),
+                "max": float(delays.max()),
+            },
+        }
+
+    def _bucket_batch_sizes(self) -> Counter:
+        """Batch counts by power-of-two size bucket (1, 2, 3-4, 5-8, ...)"""
+        buckets: Counter = Counter()
+        for size, count in self.batch_size_histogram.items():
+            buckets[(size - 1).bit_length()] += count
+        return buckets
@@ -7,11 +7,14 @@ import os
 import json
 import logging
 import sys
+import time
 from datetime import datetime
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
-from fastapi import FastAPI
+from typing import Dict, Any, List, Optional, Union
+import asyncio
+import numpy as np
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 # Add src to path for AML compliance imports
@@ -20,10 +23,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 try:
     from aml_compliance import AMLComplianceChecker, add_aml_features_to_transaction
     from velocity_monitoring import VelocityMonitor, add_velocity_features_to_transaction
+    from velocity_snapshot import PeriodicSnapshotWriter
 except ImportError:
+    PeriodicSnapshotWriter = None
+    
     # Fallback for when modules aren't available
     class AMLComplianceChecker:
-        def calculate_overall_aml_risk(self, transaction_data):
+        def calculate_overall_aml_risk(self, transaction_data, record=False):
             return {
                 'aml_overall_risk_score': 0.1,
                 'aml_risk_level': 'LOW',
@@ -81,6 +87,34 @@ except ImportError:
             customer_id = transaction_data.get("customer_id", "UNKNOWN")
         return {**transaction_data, **velocity_monitor.assess_velocity_risk(customer_id, transaction_data)}
 
+try:
+    from app.batching import MicroBatcher
+    from app.offload import PoolSaturatedError, ScoringPool
+    from app.scoring_cache import ScoringCache, canonical_key
+except ImportError:
+    # Started from inside app/ (python main.py)
+    from batching import MicroBatcher
+    from offload import PoolSaturatedError, ScoringPool
+    from scoring_cache import ScoringCache, canonical_key
+
+try:
+    try:
+        from app.models import ModelManager
+        from app.predictor import FeatureProcessor
+    except ImportError:
+        from models import ModelManager
+        from predictor import FeatureProcessor
+except ImportError:
+    # ML dependencies (joblib, pandas) unavailable: /predict uses the rule-based score
+    ModelManager = None
+    FeatureProcessor = None
+
+try:
+    from velocity_store import SharedVelocityMonitor
+except ImportError:
+    # Unix sockets are unavailable (e.g. Windows) or the velocity modules are missing
+    SharedVelocityMonitor = None
+
 # Get port from environment - Railway provides this, default to 8080
 PORT = int(os.getenv("PORT", "8080"))
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -88,9 +122,38 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 # Check if running on Railway
 IS_RAILWAY = os.getenv("RAILWAY_ENVIRONMENT") is not None
 
+# Shared velocity store socket: set by start_api.py when running several workers
+VELOCITY_STORE_SOCKET = os.getenv("VELOCITY_STORE_SOCKET")
+
+# Velocity state snapshot: restored on startup, rewritten periodically (empty path disables)
+VELOCITY_SNAPSHOT_PATH = os.getenv("VELOCITY_SNAPSHOT_PATH", "data/velocity_snapshot.bin")
+VELOCITY_SNAPSHOT_INTERVAL = float(os.getenv("VELOCITY_SNAPSHOT_INTERVAL", "60"))
+
+# Opt-in micro-batching of /predict: flush at PREDICT_MAX_BATCH_SIZE requests or PREDICT_MAX_WAIT_MS
+PREDICT_BATCHING = os.getenv("PREDICT_BATCHING", "false").lower() in ("1", "true", "yes")
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "64"))
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "5"))
+PREDICT_MAX_QUEUE = int(os.getenv("PREDICT_MAX_QUEUE", "1024"))
+
+# Scoring runs off the event loop on a "thread" or "process" pool ("inline" keeps it on the loop);
+# beyond SCORING_WORKERS running and SCORING_QUEUE_SIZE waiting calls, requests get 429. Each worker
+# process has its own copy of in-process state, so "process" is refused unless that state is shared
+# (see process_pool_blockers); the scoring cache stays per worker process
+SCORING_POOL_KIND = os.getenv("SCORING_POOL", "thread").lower()
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+SCORING_QUEUE_SIZE = int(os.getenv("SCORING_QUEUE_SIZE", "64"))
+
+# Stateless scores (fraud model, AML rules for transactions without customer history) cached by transaction content
+# for retries and resubmissions; velocity is stateful and always recomputed. SCORING_CACHE_SIZE=0 disables it
+SCORING_CACHE_SIZE = int(os.getenv("SCORING_CACHE_SIZE", "10000"))
+SCORING_CACHE_TTL = float(os.getenv("SCORING_CACHE_TTL", "300"))
+
 # Initialize global instances for AML and velocity monitoring
 AML_CHECKER = AMLComplianceChecker()
-VELOCITY_MONITOR = VelocityMonitor()
+if VELOCITY_STORE_SOCKET and SharedVelocityMonitor is not None:
+    VELOCITY_MONITOR = SharedVelocityMonitor(VELOCITY_STORE_SOCKET)
+else:
+    VELOCITY_MONITOR = VelocityMonitor()
 
 if IS_RAILWAY:
     print(f"🚂 Running on Railway, PORT: {PORT}")
@@ -107,6 +170,36 @@ start_time = datetime.now()
 MODEL_METADATA: Optional[Dict[str, Any]] = None
 AVAILABLE_MODELS = []
 
+# Request coalescer for /predict, created in lifespan when PREDICT_BATCHING is set
+PREDICT_BATCHER: Optional[MicroBatcher] = None
+
+# Worker pool for CPU-bound scoring, created in lifespan unless SCORING_POOL is "inline"
+SCORING_POOL: Optional[ScoringPool] = None
+
+# Trained models and their feature builder; loaded and warmed in lifespan. Model files are
+# memory-mapped (MODEL_MMAP_MODE, empty to disable) so uvicorn workers share their arrays,
+# and only the best model loads at startup unless MODEL_LAZY_LOADING is off
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+MODEL_LAZY_LOADING = os.getenv("MODEL_LAZY_LOADING", "true").lower() in ("1", "true", "yes")
+MODEL_MANAGER = (
+    ModelManager(mmap_mode=MODEL_MMAP_MODE, lazy=MODEL_LAZY_LOADING) if ModelManager is not None else None
+)
+FEATURE_PROCESSOR = FeatureProcessor(aml_checker=AML_CHECKER) if FeatureProcessor is not None else None
+MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", "32"))
+# Model used by /predict, e.g. logistic_regression_fast; the best model by F1 when unset
+PREDICT_MODEL = os.getenv("PREDICT_MODEL") or None
+
+# Cache of stateless scoring results, keyed on the fields each score reads
+SCORING_CACHE = ScoringCache(SCORING_CACHE_SIZE, SCORING_CACHE_TTL) if SCORING_CACHE_SIZE > 0 else None
+PREDICT_CACHE_FIELDS = (
+    [*FeatureProcessor.FEATURE_COLUMNS, "additional_features"] if FeatureProcessor is not None else []
+)
+# AML results are cached only for transactions that read no customer history (see assess_aml)
+AML_CACHE_FIELDS = getattr(AML_CHECKER, "INPUT_FIELDS", None)
+
+# Startup and first-request timings, reported by /metrics
+STARTUP_STATS: Dict[str, Any] = {}
+
 def load_model_metadata():
     """Load actual model metadata from models directory"""
     global MODEL_METADATA, AVAILABLE_MODELS
@@ -159,10 +252,59 @@ def load_model_metadata():
         
     return False
 
+def start_velocity_snapshots():
+    """Restore velocity windows from the last snapshot and start the periodic writer"""
+    if not VELOCITY_SNAPSHOT_PATH or PeriodicSnapshotWriter is None:
+        return None
+    
+    # The shared velocity store restores and snapshots its own state
+    if SharedVelocityMonitor is not None and isinstance(VELOCITY_MONITOR, SharedVelocityMonitor):
+        return None
+    
+    snapshot_path = Path(VELOCITY_SNAPSHOT_PATH)
+    if snapshot_path.exists():
+        try:
+            customers = VELOCITY_MONITOR.load_snapshot(str(snapshot_path))
+            logger.info(f"⚡ Restored velocity history for {customers} customers from {snapshot_path}")
+        except Exception as e:
+            logger.error(f"Error restoring velocity snapshot: {e}")
+    
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = PeriodicSnapshotWriter(VELOCITY_MONITOR, str(snapshot_path), VELOCITY_SNAPSHOT_INTERVAL)
+    writer.start()
+    return writer
+
+def load_and_warm_models() -> bool:
+    """Load the trained models once and run a dummy batch through them"""
+    if MODEL_MANAGER is None:
+        return False
+    
+    load_start = time.perf_counter()
+    if not MODEL_MANAGER.load_models():
+        return False
+    STARTUP_STATS["model_load_seconds"] = time.perf_counter() - load_start
+    
+    # The first predict call pays for lazy initialisation; pay it here instead of in a request
+    warmup_start = time.perf_counter()
+    try:
+        dummy_batch = FEATURE_PROCESSOR.build_feature_matrix([{}] * MODEL_WARMUP_ROWS)
+        MODEL_MANAGER.predict_fraud_batch(dummy_batch, PREDICT_MODEL)
+    except Exception as e:
+        logger.error(f"❌ Model warm-up failed, falling back to rule-based scoring: {e}")
+        MODEL_MANAGER.model_loaded = False
+        return False
+    STARTUP_STATS["model_warmup_seconds"] = time.perf_counter() - warmup_start
+    return True
+
 # Lifespan context manager (modern FastAPI pattern - no deprecation warning)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    startup_start = time.perf_counter()
+    blockers = process_pool_blockers() if SCORING_POOL_KIND == "process" else []
+    if blockers:
+        raise RuntimeError(f"SCORING_POOL=process would split scoring state across worker processes: "
+                           f"{'; '.join(blockers)}. Use SCORING_POOL=thread or share the state")
     logger.info(f"✅ FastAPI starting on port {PORT}")
     logger.info(f"🌐 Environment: {ENVIRONMENT}")
     
@@ -175,9 +317,46 @@ async def lifespan(app: FastAPI):
     if IS_RAILWAY:
         logger.info("🚂 Running on Railway platform")
     
+    if load_and_warm_models():
+        logger.info(f"🏆 Scoring /predict with {PREDICT_MODEL or MODEL_MANAGER.best_model_name} "
+                    f"(load {STARTUP_STATS['model_load_seconds']:.2f}s, "
+                    f"warm-up {STARTUP_STATS['model_warmup_seconds'] * 1000:.1f}ms)")
+    else:
+        logger.warning("⚠️ Trained models unavailable - /predict uses rule-based scoring")
+    
+    snapshot_writer = start_velocity_snapshots()
+    
+    global PREDICT_BATCHER, SCORING_POOL
+    if SCORING_POOL_KIND != "inline":
+        SCORING_POOL = ScoringPool(SCORING_POOL_KIND, SCORING_WORKERS, SCORING_QUEUE_SIZE)
+        logger.info(f"🧵 Scoring on a {SCORING_POOL_KIND} pool: {SCORING_WORKERS} workers, "
+                    f"{SCORING_QUEUE_SIZE} queued calls")
+    
+    if PREDICT_BATCHING:
+        PREDICT_BATCHER = MicroBatcher(
+            score_predictions, PREDICT_MAX_BATCH_SIZE, PREDICT_MAX_WAIT_MS,
+            runner=SCORING_POOL.run if SCORING_POOL is not None else None,
+            max_queue_size=PREDICT_MAX_QUEUE
+        )
+        await PREDICT_BATCHER.start()
+        logger.info(f"📦 Micro-batching /predict: up to {PREDICT_MAX_BATCH_SIZE} requests "
+                    f"or {PREDICT_MAX_WAIT_MS}ms")
+    
+    STARTUP_STATS["startup_seconds"] = time.perf_counter() - startup_start
+    STARTUP_STATS.pop("first_request_ms", None)
+    logger.info(f"⏱️ Startup took {STARTUP_STATS['startup_seconds']:.2f}s")
+    
     yield
     
     # Shutdown
+    if PREDICT_BATCHER is not None:
+        await PREDICT_BATCHER.stop()
+        PREDICT_BATCHER = None
+    if SCORING_POOL is not None:
+        SCORING_POOL.shutdown()
+        SCORING_POOL = None
+    if snapshot_writer is not None:
+        snapshot_writer.stop()
     logger.info("👋 FastAPI shutting down")
 
 # Simple FastAPI app with lifespan
@@ -217,8 +396,8 @@ async def health():
         "port": PORT,
         "environment": ENVIRONMENT,
         "timestamp": datetime.now().isoformat(),
-        "models_loaded": bool(AVAILABLE_MODELS),
-        "available_models": AVAILABLE_MODELS  # Return actual loaded models
+        "models_loaded": bool(MODEL_MANAGER is not None and MODEL_MANAGER.model_loaded),
+        "available_models": AVAILABLE_MODELS
     }
 
 @app.get("/healthz")
@@ -229,27 +408,157 @@ async def healthz():
 async def ping():
     return {"ping": "pong", "port": PORT}
 
+def process_pool_blockers() -> List[str]:
+    """In-process scoring state that worker processes of a process pool would each keep their own copy of"""
+    blockers = []
+    if SharedVelocityMonitor is None or not isinstance(VELOCITY_MONITOR, SharedVelocityMonitor):
+        blockers.append("velocity windows are in-process (set VELOCITY_STORE_SOCKET to a shared velocity store)")
+    if not getattr(AML_CHECKER, "stateless", True):
+        blockers.append("the AML history store is in-process (disable history_store in the AML config)")
+    return blockers
+
+async def run_scoring(fn, *args):
+    """Run a scoring call on the scoring pool, or inline when there is none"""
+    if SCORING_POOL is None:
+        return fn(*args)
+    return await SCORING_POOL.run(fn, *args)
+
+def scoring_saturated(error: Exception) -> HTTPException:
+    """429 response for requests turned away by back-pressure"""
+    logger.warning(f"Rejecting request, scoring saturated: {error or 'queue full'}")
+    return HTTPException(status_code=429, detail="Scoring capacity exhausted, retry shortly",
+                         headers={"Retry-After": "1"})
+
 @app.post("/predict")
 async def predict(data: dict):
-    # Enhanced fraud detection logic with AML compliance and velocity monitoring
-    amount = data.get("transaction_amount", 100)
-    hour = data.get("transaction_hour", 12) 
-    risk = data.get("merchant_risk_score", 0.1)
-    customer_id = data.get("customer_id", "UNKNOWN")
+    request_start = time.perf_counter()
+    try:
+        if PREDICT_BATCHER is not None:
+            result = await PREDICT_BATCHER.submit(data)
+        else:
+            result = (await run_scoring(score_predictions, [data]))[0]
+    except (PoolSaturatedError, asyncio.QueueFull) as e:
+        raise scoring_saturated(e)
+    if isinstance(result, Exception):
+        raise result
+    
+    if "first_request_ms" not in STARTUP_STATS:
+        STARTUP_STATS["first_request_ms"] = (time.perf_counter() - request_start) * 1000
+        logger.info(f"⏱️ First /predict took {STARTUP_STATS['first_request_ms']:.1f}ms")
+    return result
+
+def score_predictions(transactions: List[dict]) -> List[Union[dict, Exception]]:
+    """
+    Score a batch of /predict requests: one fraud scoring call for cache misses, then AML and velocity per request.
+    A transaction that cannot be fraud-scored gets its exception in place of a result, before any AML or velocity
+    state is recorded for it, so it fails alone and nothing is recorded twice
+    """
+    version = scoring_version()
+    scores = [None] * len(transactions)
+    keys = None
+    if SCORING_CACHE is not None:
+        keys = [canonical_key(data, PREDICT_CACHE_FIELDS, "predict") for data in transactions]
+        scores = [SCORING_CACHE.get(key, version) for key in keys]
+    
+    misses = [idx for idx, score in enumerate(scores) if score is None]
+    if misses:
+        for idx, score in zip(misses, isolated_fraud_scores([transactions[idx] for idx in misses])):
+            scores[idx] = score
+            if keys is not None and not isinstance(score, Exception):
+                SCORING_CACHE.put(keys[idx], score, version)
+    
+    return [
+        score if isinstance(score, Exception) else
+        assess_prediction(data, score["fraud_probability"], score["is_fraud"], score["model_used"], score["method"])
+        for data, score in zip(transactions, scores)
+    ]
+
+def isolated_fraud_scores(transactions: List[dict]) -> List[Union[dict, Exception]]:
+    """fraud_scores, falling back to one transaction at a time (it is stateless) when the batch fails"""
+    try:
+        return fraud_scores(transactions)
+    except Exception as e:
+        if len(transactions) == 1:
+            return [e]
+        logger.warning(f"Fraud scoring failed for a batch of {len(transactions)} ({e}), scoring individually")
+        return [isolated_fraud_scores([data])[0] for data in transactions]
+
+def scoring_version() -> str:
+    """Version of the models and sanctions list behind stateless scores; cached scores from another version are dropped"""
+    sanctions_version = getattr(AML_CHECKER, "sanctions_version", "")
+    if MODEL_MANAGER is not None and MODEL_MANAGER.model_loaded:
+        return f"{MODEL_MANAGER.version}:{PREDICT_MODEL or MODEL_MANAGER.best_model_name}:{sanctions_version}"
+    return f"rule_based:{sanctions_version}"
+
+def fraud_scores(transactions: List[dict]) -> List[dict]:
+    """Fraud score of each transaction from the model (or the rule-based fallback), with its feature vector"""
+    if MODEL_MANAGER is not None and MODEL_MANAGER.model_loaded:
+        features = FEATURE_PROCESSOR.build_feature_matrix(transactions)
+        batch = MODEL_MANAGER.predict_fraud_batch(features, PREDICT_MODEL)
+        return [
+            {"features": row.copy(), "fraud_probability": fraud_prob, "is_fraud": is_fraud,
+             "model_used": batch["model_used"], "method": "model"}
+            for row, fraud_prob, is_fraud in zip(features, batch["fraud_probability"].tolist(),
+                                                 batch["is_fraud"].tolist())
+        ]
+    
+    # Use best model from metadata if available
+    model_used = MODEL_METADATA.get("best_model", "ensemble") if MODEL_METADATA else "ensemble"
+    return [
+        {"features": None, "fraud_probability": fraud_prob, "is_fraud": fraud_prob >= 0.5,
+         "model_used": model_used, "method": "rule_based"}
+        for fraud_prob in rule_based_fraud_scores(transactions)
+    ]
+
+@app.post("/compare_models")
+async def compare_models(data: dict, models: Optional[str] = None):
+    """Fraud scores of several models (comma-separated, default all) for one transaction"""
+    if MODEL_MANAGER is None or not MODEL_MANAGER.model_loaded:
+        raise HTTPException(status_code=503, detail="Trained models not loaded")
     
-    # Basic fraud score calculation
-    score = 0.0
-    if amount > 500: score += 0.3
-    if hour < 6 or hour > 22: score += 0.2
-    score += risk * 0.4
+    model_names = [name.strip() for name in models.split(",") if name.strip()] if models else None
+    try:
+        return await run_scoring(compare_model_scores, data, model_names)
+    except PoolSaturatedError as e:
+        raise scoring_saturated(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def compare_model_scores(data: dict, model_names: Optional[List[str]]) -> dict:
+    """Score one transaction with several models in one call, running each base model once"""
+    features = FEATURE_PROCESSOR.build_feature_matrix([data])
+    results = MODEL_MANAGER.predict_fraud_multi(features, model_names)
+    return {
+        "models": {
+            model_name: {
+                "fraud_probability": float(batch["fraud_probability"][0]),
+                "is_fraud": bool(batch["is_fraud"][0]),
+                "risk_level": str(batch["risk_level"][0]),
+                "threshold": batch["threshold"],
+            }
+            for model_name, batch in results.items()
+        },
+        "best_model": MODEL_MANAGER.best_model_name,
+        "prediction_timestamp": datetime.now().isoformat()
+    }
+
+def rule_based_fraud_scores(transactions: List[dict]) -> List[float]:
+    """Fallback fraud score from amount, hour and merchant risk when no trained model is loaded"""
+    amounts = np.array([data.get("transaction_amount", 100) for data in transactions], dtype=float)
+    hours = np.array([data.get("transaction_hour", 12) for data in transactions], dtype=float)
+    risks = np.array([data.get("merchant_risk_score", 0.1) for data in transactions], dtype=float)
     
-    fraud_prob = min(1.0, score)
-    is_fraud = fraud_prob >= 0.5
+    scores = 0.3 * (amounts > 500) + 0.2 * ((hours < 6) | (hours > 22)) + risks * 0.4
+    return np.minimum(1.0, scores).tolist()
+
+def assess_prediction(data: dict, fraud_prob: float, is_fraud: bool, model_used: str, method: str) -> dict:
+    """Combine a fraud probability with AML compliance and velocity monitoring for one request"""
+    customer_id = data.get("customer_id", "UNKNOWN")
     risk_level = "HIGH" if fraud_prob >= 0.8 else "MEDIUM" if fraud_prob >= 0.5 else "LOW"
     
-    # Add AML compliance assessment
+    # Add AML compliance assessment; the scoring path is the one place transactions enter the AML history
     try:
-        aml_result = AML_CHECKER.calculate_overall_aml_risk(data)
+        aml_result = assess_aml(data, record=True)
     except Exception as e:
         logger.warning(f"AML assessment failed: {e}")
         aml_result = {
@@ -261,7 +570,7 @@ async def predict(data: dict):
     
     # Add velocity monitoring assessment
     try:
-        velocity_result = VELOCITY_MONITOR.assess_velocity_risk(customer_id, data)
+        velocity_result = assess_velocity(customer_id, data)
     except Exception as e:
         logger.warning(f"Velocity assessment failed: {e}")
         velocity_result = {
@@ -285,9 +594,6 @@ async def predict(data: dict):
         velocity_result['velocity_risk_level'] == 'HIGH'):
         risk_level = "HIGH"
         is_fraud = True
-        
-    # Use best model from metadata if available
-    model_used = MODEL_METADATA.get("best_model", "ensemble") if MODEL_METADATA else "ensemble"
     
     return {
         "is_fraud": is_fraud,
@@ -303,15 +609,38 @@ async def predict(data: dict):
         "requires_manual_review": aml_result['requires_manual_review'],
         "requires_velocity_review": velocity_result['requires_velocity_review'],
         "model_used": model_used,
+        "method": method,
         "confidence": abs(combined_risk - 0.5) * 2,
         "prediction_timestamp": datetime.now().isoformat()
     }
 
+# Module-level so a process scoring pool can pickle them by reference
+def assess_aml(data: dict, record: bool = False) -> dict:
+    """
+    AML compliance assessment for one transaction, recorded into the AML history when record is set.
+    Served from the scoring cache when it reads no customer history, since it then depends on its fields alone
+    """
+    reads_history = getattr(AML_CHECKER, "reads_history", None)
+    if SCORING_CACHE is None or AML_CACHE_FIELDS is None or (reads_history is not None and reads_history(data)):
+        return AML_CHECKER.calculate_overall_aml_risk(data, record=record)
+    
+    key = canonical_key(data, AML_CACHE_FIELDS, "aml")
+    version = scoring_version()
+    aml_result = SCORING_CACHE.get(key, version)
+    if aml_result is None:
+        aml_result = AML_CHECKER.calculate_overall_aml_risk(data)
+        SCORING_CACHE.put(key, aml_result, version)
+    return aml_result
+
+def assess_velocity(customer_id: str, data: dict) -> dict:
+    """Velocity assessment for one transaction"""
+    return VELOCITY_MONITOR.assess_velocity_risk(customer_id, data)
+
 @app.post("/aml_check")
 async def aml_check(data: dict):
     """Dedicated AML compliance check endpoint"""
     try:
-        aml_result = AML_CHECKER.calculate_overall_aml_risk(data)
+        aml_result = await run_scoring(assess_aml, data)
         
         return {
             "transaction_id": data.get("transaction_id", "unknown"),
@@ -320,6 +649,8 @@ async def aml_check(data: dict):
             "compliance_status": "PASS" if aml_result['aml_overall_risk_score'] < 0.5 else "REVIEW_REQUIRED"
         }
         
+    except PoolSaturatedError as e:
+        raise scoring_saturated(e)
     except Exception as e:
         logger.error(f"AML check failed: {e}")
         return {
@@ -334,7 +665,7 @@ async def velocity_check(data: dict):
     """Dedicated velocity monitoring endpoint"""
     try:
         customer_id = data.get("customer_id", "UNKNOWN")
-        velocity_result = VELOCITY_MONITOR.assess_velocity_risk(customer_id, data)
+        velocity_result = await run_scoring(assess_velocity, customer_id, data)
         
         return {
             "transaction_id": data.get("transaction_id", "unknown"),
@@ -344,6 +675,8 @@ async def velocity_check(data: dict):
             "velocity_status": "NORMAL" if velocity_result['velocity_risk_score'] < 0.5 else "REVIEW_REQUIRED"
         }
         
+    except PoolSaturatedError as e:
+        raise scoring_saturated(e)
     except Exception as e:
         logger.error(f"Velocity check failed: {e}")
         return {
@@ -415,6 +748,13 @@ async def get_metrics():
         "available_models": AVAILABLE_MODELS,
         "best_model": MODEL_METADATA.get("best_model", "unknown") if MODEL_METADATA else "unknown",
         "model_performance": performance_data,
+        "predict_batching": PREDICT_BATCHER.get_metrics() if PREDICT_BATCHER is not None else {"enabled": False},
+        "scoring_pool": SCORING_POOL.get_metrics() if SCORING_POOL is not None else {"kind": "inline"},
+        "scoring_cache": SCORING_CACHE.get_metrics() if SCORING_CACHE is not None else {"enabled": False},
+        "aml_history": (AML_CHECKER.history_store.get_metrics()
+                        if getattr(AML_CHECKER, "history_store", None) is not None else {"enabled": False}),
+        "startup": STARTUP_STATS,
+        "model_load_seconds": MODEL_MANAGER.load_seconds if MODEL_MANAGER is not None else {},
         "system_info": {
             "python_version": "3.9+",
             "port": PORT,
@@ -3,38 +3,98 @@ Model Management for FastAPI Application
 This file handles model loading and serving for the API
 """
 
+import itertools
 import json
 import logging
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
 
-# Add src to path for imports
+# Add src to path for imports (compiled_trees models unpickle from there)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 sys.path.append("src")
 sys.path.append(".")
 
+from compiled_linear import CompiledLinearModel
+from soft_voting import SoftVotingEnsemble
+
 logger = logging.getLogger(__name__)
 
+# Numbers successful loads across all managers, so a version string is never reused
+_LOAD_GENERATION = itertools.count(1)
+
 
 class ModelManager:
     """Manages loading and serving of trained ML models"""
 
-    def __init__(self):
+    # Risk buckets by fraud probability: np.digitize against the edges gives the index
+    RISK_LEVELS = np.array(["VERY_LOW", "LOW", "MEDIUM", "HIGH"])
+    RISK_BUCKET_EDGES = np.array([0.2, 0.5, 0.8])
+
+    # Precompiled variants of a trained model, served under their own name. They are
+    # built from the base model on first use and share its metadata threshold.
+    FAST_MODELS = {"logistic_regression_fast": "logistic_regression"}
+
+    def __init__(self, models_dir: str = "models", mmap_mode: Optional[str] = "r", lazy: bool = True,
+                 compiled: bool = True):
+        """
+        models_dir: directory holding model_metadata.json, scalers.pkl and the model files
+        mmap_mode: joblib mmap_mode for model and scaler files saved uncompressed; the
+            NumPy arrays inside stay on disk and worker processes share their pages.
+            None reads everything into private memory.
+        lazy: load only the best model in load_models and the others on first use
+        compiled: load a model's compiled_file_path (flat node arrays from
+            compiled_trees) instead of the scikit-learn file when metadata has one
+        """
+        self.models_dir = models_dir
+        self.mmap_mode = mmap_mode
+        self.lazy = lazy
+        self.compiled = compiled
         self.models = {}
+        self.model_paths: Dict[str, Path] = {}
+        self.load_seconds: Dict[str, float] = {}
         self.scalers = {}
         self.metadata = {}
         self.model_loaded = False
         self.best_model_name = None
+        # Changes on every successful load_models, so caches of model outputs can tell a reload
+        self.version: Optional[str] = None
+        self.load_count = 0
+        self._load_lock = threading.Lock()
+
+    @property
+    def available_models(self) -> List[str]:
+        """Models that are loaded or can be loaded on first use"""
+        models = list(dict.fromkeys([*self.models, *self.model_paths]))
+        return models + [
+            fast_name for fast_name, base_name in self.FAST_MODELS.items()
+            if base_name in models and fast_name not in models
+        ]
+
+    def is_available(self, model_name: Optional[str]) -> bool:
+        """Whether model_name is loaded or can be loaded on first use"""
+        if model_name in self.models or model_name in self.model_paths:
+            return True
+        base_name = self.FAST_MODELS.get(model_name)
+        return base_name is not None and self.is_available(base_name)
 
     def load_models(self):
-        """Load all trained models and metadata"""
+        """Load metadata, scalers and the best model; the rest load eagerly unless lazy"""
         try:
-            models_dir = Path("models")
+            models_dir = Path(self.models_dir)
+
+            # A reload starts from scratch rather than mixing in models from the previous load
+            with self._load_lock:
+                self.models = {}
+                self.load_seconds = {}
+            self.best_model_name = None
 
             # Load metadata
             metadata_path = models_dir / "model_metadata.json"
@@ -46,33 +106,45 @@ class ModelManager:
             # Load scalers
             scalers_path = models_dir / "scalers.pkl"
             if scalers_path.exists():
-                self.scalers = joblib.load(scalers_path)
+                self.scalers = joblib.load(scalers_path, mmap_mode=self.mmap_mode)
                 logger.info("✅ Scalers loaded")
 
-            # Load individual models
-            model_count = 0
+            # Register model files, best F1 first (metadata order when there are no scores)
+            self.model_paths = {}
             for model_name, model_info in self.metadata.get("models", {}).items():
                 model_path = models_dir / model_info["file_path"]
+                compiled_file = model_info.get("compiled_file_path")
+                if self.compiled and compiled_file and (models_dir / compiled_file).exists():
+                    model_path = models_dir / compiled_file
                 if model_path.exists():
-                    try:
-                        self.models[model_name] = joblib.load(model_path)
-                        logger.info(f"✅ Loaded {model_name}")
-                        model_count += 1
-                    except Exception as e:
-                        logger.error(f"❌ Failed to load {model_name}: {e}")
+                    self.model_paths[model_name] = model_path
 
-            # Determine best model
-            if self.models:
-                performance_summary = self.metadata.get("performance_summary", {})
-                if performance_summary:
-                    self.best_model_name = max(
-                        performance_summary.keys(),
-                        key=lambda x: performance_summary[x].get("f1_score", 0),
-                    )
-                else:
-                    self.best_model_name = list(self.models.keys())[0]
+            performance_summary = self.metadata.get("performance_summary", {})
+            candidates = sorted(
+                self.model_paths, key=lambda x: performance_summary.get(x, {}).get("f1_score", 0), reverse=True
+            )
 
+            # The best model loads now so startup fails fast; with lazy loading the rest wait
+            for model_name in candidates:
+                try:
+                    self.get_model(model_name)
+                except Exception as e:
+                    logger.error(f"❌ Failed to load {model_name}: {e}")
+                    del self.model_paths[model_name]
+                    continue
+
+                if self.best_model_name is None:
+                    self.best_model_name = model_name
+                    if self.lazy:
+                        break
+
+            # Determine best model
+            if self.best_model_name is not None:
                 logger.info(f"🏆 Best model selected: {self.best_model_name}")
+                if self.lazy and len(self.model_paths) > 1:
+                    logger.info(f"💤 Deferred loading of {len(self.model_paths) - 1} models until first use")
+                self.load_count += 1
+                self.version = f"{self.metadata.get('training_date', 'untrained')}#{next(_LOAD_GENERATION)}"
                 self.model_loaded = True
                 return True
 
@@ -83,6 +155,29 @@ class ModelManager:
             logger.error(f"❌ Failed to load models: {e}")
             return False
 
+    def get_model(self, model_name: str) -> Any:
+        """Return a model, loading it from its file on first use"""
+        model = self.models.get(model_name)
+        if model is not None:
+            return model
+
+        if model_name in self.FAST_MODELS:
+            base_model = self.get_model(self.FAST_MODELS[model_name])
+            self.models[model_name] = CompiledLinearModel.from_sklearn(base_model, self.scalers.get("standard"))
+            return self.models[model_name]
+
+        if model_name not in self.model_paths:
+            raise ValueError(f"Model '{model_name}' not available")
+
+        # Concurrent first requests for the same model load it once
+        with self._load_lock:
+            if model_name not in self.models:
+                start = time.perf_counter()
+                self.models[model_name] = joblib.load(self.model_paths[model_name], mmap_mode=self.mmap_mode)
+                self.load_seconds[model_name] = time.perf_counter() - start
+                logger.info(f"✅ Loaded {model_name} in {self.load_seconds[model_name] * 1000:.0f}ms")
+        return self.models[model_name]
+
     def predict_fraud(self, features: np.ndarray, model_name: Optional[str] = None) -> Dict:
         """Make fraud prediction using specified model or best model"""
         if not self.model_loaded:
@@ -92,55 +187,17 @@ class ModelManager:
         if model_name is None:
             model_name = self.best_model_name
 
-        if not model_name or model_name not in self.models:
+        if not model_name or not self.is_available(model_name):
             raise ValueError(f"Model '{model_name}' not available")
 
-        model = self.models[model_name]
-
         try:
-            # Prepare features based on model type
-            if model_name in ["logistic_regression", "ensemble"]:
-                if "standard" in self.scalers:
-                    features_processed = self.scalers["standard"].transform(features)
-                else:
-                    features_processed = features
-            else:
-                features_processed = features
-
-            # Make predictions
-            if hasattr(model, "predict_proba"):
-                probabilities = model.predict_proba(features_processed)
-                fraud_probability = float(probabilities[0][1])
-                threshold = (
-                    self.metadata.get("models", {}).get(model_name, {}).get("threshold", 0.5)
-                )
-                is_fraud = fraud_probability >= threshold
-
-            elif model_name == "isolation_forest":
-                anomaly_score = model.predict(features_processed)
-                is_fraud = anomaly_score[0] == -1
-                raw_scores = model.score_samples(features_processed)
-                fraud_probability = float(1 / (1 + np.exp(raw_scores[0])))
-
-            else:
-                prediction = model.predict(features_processed)
-                is_fraud = bool(prediction[0])
-                fraud_probability = float(prediction[0])
-
-            # Determine risk level
-            if fraud_probability >= 0.8:
-                risk_level = "HIGH"
-            elif fraud_probability >= 0.5:
-                risk_level = "MEDIUM"
-            elif fraud_probability >= 0.2:
-                risk_level = "LOW"
-            else:
-                risk_level = "VERY_LOW"
+            batch = self.predict_fraud_batch(features, model_name)
+            fraud_probability = float(batch["fraud_probability"][0])
 
             return {
-                "is_fraud": bool(is_fraud),
+                "is_fraud": bool(batch["is_fraud"][0]),
                 "fraud_probability": fraud_probability,
-                "risk_level": risk_level,
+                "risk_level": str(batch["risk_level"][0]),
                 "model_used": model_name,
                 "confidence": abs(fraud_probability - 0.5) * 2,
                 "prediction_timestamp": datetime.now().isoformat(),
@@ -150,6 +207,132 @@ class ModelManager:
             logger.error(f"Prediction failed: {e}")
             raise RuntimeError(f"Prediction error: {str(e)}")
 
+    def predict_fraud_batch(self, features: np.ndarray, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fraud predictions for every row of features, with one scaler and model call
+        (one call per member for soft-voting ensembles)
+
+        Returns the model used and its threshold, plus per-row arrays:
+        fraud_probability, is_fraud (probability or anomaly score against the
+        model's metadata threshold), risk_code (index into RISK_LEVELS) and
+        risk_level.
+        """
+        if not self.model_loaded:
+            raise RuntimeError("Models not loaded")
+
+        # Use specified model or best model
+        if model_name is None:
+            model_name = self.best_model_name
+
+        if not model_name or not self.is_available(model_name):
+            raise ValueError(f"Model '{model_name}' not available")
+
+        return self._predict(model_name, {"features": np.atleast_2d(features), "scores": {}})
+
+    def predict_fraud_multi(self, features: np.ndarray, model_names: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        predict_fraud_batch results of several models (default: every available model) for the same rows
+
+        Work is shared across the models in one call: features are scaled
+        once, and each base model runs once, with soft-voting ensembles built
+        from their members' probabilities instead of scoring the members again.
+        """
+        if not self.model_loaded:
+            raise RuntimeError("Models not loaded")
+
+        model_names = self.available_models if model_names is None else model_names
+        for model_name in model_names:
+            if not self.is_available(model_name):
+                raise ValueError(f"Model '{model_name}' not available")
+
+        cache = {"features": np.atleast_2d(features), "scores": {}}
+        return {model_name: self._predict(model_name, cache) for model_name in model_names}
+
+    def _predict(self, model_name: str, cache: Dict[str, Any]) -> Dict[str, Any]:
+        """Decisions and risk levels of one model, from scores shared through cache"""
+        threshold_name = self.FAST_MODELS.get(model_name, model_name)
+        threshold = self.metadata.get("models", {}).get(threshold_name, {}).get("threshold")
+        probabilities, anomaly_scores = self._fraud_scores(model_name, cache)
+
+        if anomaly_scores is not None:
+            # Anomalies (predict == -1) are rows whose decision_function falls below the threshold
+            threshold = 0.0 if threshold is None else threshold
+            is_fraud = anomaly_scores < threshold
+        else:
+            threshold = 0.5 if threshold is None else threshold
+            is_fraud = probabilities >= threshold
+
+        # Same buckets as np.digitize(probabilities, RISK_BUCKET_EDGES), without its dtype checks
+        risk_code = self.RISK_BUCKET_EDGES.searchsorted(probabilities, side="right").astype(np.int8)
+
+        return {
+            "model_used": model_name,
+            "threshold": threshold,
+            "fraud_probability": probabilities,
+            "is_fraud": is_fraud,
+            "risk_code": risk_code,
+            "risk_level": self.RISK_LEVELS[risk_code],
+        }
+
+    def _fraud_scores(self, model_name: str, cache: Dict[str, Any]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Fraud probabilities of one model, plus decision_function scores for
+        isolation_forest, computed at most once per cache
+        """
+        if model_name in cache["scores"]:
+            return cache["scores"][model_name]
+
+        model = self.get_model(model_name)
+        anomaly_scores = None
+
+        if isinstance(model, SoftVotingEnsemble):
+            probabilities = model.combine({
+                member: self._fraud_scores(member, cache)[0] for member in model.members
+            })
+
+        else:
+            # Prepare features based on model type (fast models have the scaler folded in)
+            if model_name in ["logistic_regression", "ensemble"]:
+                if "scaled" not in cache:
+                    cache["scaled"] = self._standardize(cache["features"])
+                features_processed = cache["scaled"]
+            else:
+                features_processed = cache["features"]
+
+            if hasattr(model, "predict_proba"):
+                probabilities = model.predict_proba(features_processed)[:, 1].astype(np.float64)
+
+            elif model_name == "isolation_forest":
+                # One pass over the trees: decision_function is score_samples shifted by offset_
+                raw_scores = model.score_samples(features_processed)
+                anomaly_scores = raw_scores - model.offset_
+                probabilities = 1 / (1 + np.exp(raw_scores))
+
+            else:
+                probabilities = np.asarray(model.predict(features_processed), dtype=np.float64)
+
+        cache["scores"][model_name] = (probabilities, anomaly_scores)
+        return cache["scores"][model_name]
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        """Apply the standard scaler, as plain NumPy arithmetic when it is a StandardScaler"""
+        scaler = self.scalers.get("standard")
+        if scaler is None:
+            return features
+        if not (hasattr(scaler, "mean_") and hasattr(scaler, "scale_")):
+            return scaler.transform(features)
+
+        # Same operations as StandardScaler.transform, minus its per-call input validation
+        n_features = getattr(scaler, "n_features_in_", features.shape[1])
+        if n_features != features.shape[1]:
+            raise ValueError(f"Scaler expects {n_features} features, got {features.shape[1]}")
+        scaled = np.array(features, dtype=np.float64)
+        if scaler.mean_ is not None and getattr(scaler, "with_mean", True):
+            scaled -= scaler.mean_
+        if scaler.scale_ is not None:
+            scaled /= scaler.scale_
+        return scaled
+
 
 # This can be imported by main.py
 model_manager = ModelManager()
@@ -0,0 +1,89 @@
+"""
+Scoring Pool for the Fraud Detection API
+Runs CPU-bound scoring off the event loop with bounded admission
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the scoring pool has no room for another call"""
+
+
+class ScoringPool:
+    """
+    Thread or process pool for scoring calls made from async endpoints
+
+    At most max_workers calls run at once and max_queue_size more may wait
+    for a worker. Calls beyond that are rejected with PoolSaturatedError
+    instead of queueing without bound, so the API can answer 429 and keep
+    the event loop free for health checks and light endpoints.
+
+    A process pool sidesteps the GIL but each worker keeps its own copy of
+    in-process state, so callables and arguments must be picklable and
+    stateful monitors must live in a shared store; the API refuses to start
+    a process pool otherwise.
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue_size: int = 64):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown scoring pool kind: {kind}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size cannot be negative")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.executor: Executor = (
+            ThreadPoolExecutor(max_workers, thread_name_prefix="scoring")
+            if kind == "thread" else ProcessPoolExecutor(max_workers)
+        )
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_size
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool, or raise PoolSaturatedError if it is full"""
+        # Admission is checked and counted on the event loop thread, so it needs no lock
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PoolSaturatedError(f"Scoring pool saturated ({self.in_flight} calls in flight)")
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers, finishing calls already running"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_metrics(self) -> Dict:
+        """Pool size, occupancy and rejection counts"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import sys
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
@@ -50,9 +51,62 @@ logger = logging.getLogger(__name__)
 class FeatureProcessor:
     """Process and validate features for fraud detection"""
 
-    def __init__(self):
+    # AML features used when a transaction cannot be assessed
+    AML_FALLBACK_FEATURES = {
+        "aml_risk_score": 0.1,
+        "aml_flags_count": 0,
+        "requires_manual_review": 0,
+        "structuring_risk": 0.0,
+        "rapid_movement_risk": 0.0,
+        "suspicious_patterns_risk": 0.1,
+        "sanctions_risk": 0.0,
+    }
+
+    # Named model inputs, in column order; additional_features follow them
+    FEATURE_COLUMNS = [
+        "transaction_amount",
+        "transaction_hour",
+        "transaction_day",
+        "transaction_weekend",
+        "is_business_hours",
+        "card_amount_mean",
+        "card_txn_count_recent",
+        "time_since_last_txn",
+        "merchant_risk_score",
+        "amount_zscore",
+        "is_amount_outlier",
+    ]
+
+    # Values for fields missing from a raw transaction (is_business_hours is derived from the hour)
+    FEATURE_DEFAULTS = {
+        "transaction_amount": 0.0,
+        "transaction_hour": 12,
+        "transaction_day": 15,
+        "transaction_weekend": 0,
+        "is_business_hours": 0,
+        "card_amount_mean": 50.0,
+        "card_txn_count_recent": 1,
+        "time_since_last_txn": 3600.0,
+        "merchant_risk_score": 0.1,
+        "amount_zscore": 0.0,
+        "is_amount_outlier": 0,
+    }
+
+    INTEGER_FEATURES = {
+        "transaction_hour",
+        "transaction_day",
+        "transaction_weekend",
+        "is_business_hours",
+        "card_txn_count_recent",
+        "is_amount_outlier",
+    }
+
+    def __init__(self, aml_checker: Optional[AMLComplianceChecker] = None):
         self.required_features = 82  # Based on trained models
 
+        # Rule engines are built once and shared by every transaction processed
+        self.aml_checker = aml_checker if aml_checker is not None else AMLComplianceChecker()
+
     def validate_features(self, features: Union[Dict, List, np.ndarray]) -> bool:
         """Validate input features"""
 
@@ -69,9 +123,8 @@ class FeatureProcessor:
         # Check feature count
         if len(feature_array) != self.required_features:
             logger.warning(
-                f"Expected {
-                    self.required_features} features, got {
-                    len(feature_array)}. Padding/truncating..."
+                f"Expected {self.required_features} features, got "
+                f"{len(feature_array)}. Padding/truncating..."
             )
             return True  # We'll handle padding in processing
 
@@ -84,109 +137,158 @@ class FeatureProcessor:
 
     def _dict_to_array(self, feature_dict: Dict) -> np.ndarray:
         """Convert feature dictionary to array with proper padding"""
+        return self.build_feature_matrix([feature_dict], apply_defaults=False)[0]
 
-        # Define expected feature order
-        expected_features = [
-            "transaction_amount",
-            "transaction_hour",
-            "transaction_day",
-            "transaction_weekend",
-            "is_business_hours",
-            "card_amount_mean",
-            "card_txn_count_recent",
-            "time_since_last_txn",
-            "merchant_risk_score",
-            "amount_zscore",
-            "is_amount_outlier",
-        ]
-
-        # Extract core features
-        feature_list = []
-        for feature_name in expected_features:
-            value = feature_dict.get(feature_name, 0.0)
-            feature_list.append(float(value))
-
-        # Add additional features if provided
-        additional = feature_dict.get("additional_features", [])
-        if additional:
-            feature_list.extend(additional)
-
-        # Pad to required length with zeros
-        while len(feature_list) < self.required_features:
-            feature_list.append(0.0)
-
-        # Truncate if too long
-        feature_list = feature_list[: self.required_features]
-
-        # Convert to numpy array and handle NaN/inf values
-        feature_array: np.ndarray = np.array(feature_list)
-        feature_array = np.nan_to_num(feature_array, nan=0.0, posinf=0.0, neginf=0.0)
-
-        return feature_array
+    def build_feature_matrix(self, transactions: Union[List[Dict], pd.DataFrame],
+                             apply_defaults: bool = True, dtype=np.float64) -> np.ndarray:
+        """
+        Build the (n, required_features) model input matrix in one pass
+
+        Named columns are filled column by column, additional_features follow
+        them, and the rest stays zero. With apply_defaults, missing fields take
+        FEATURE_DEFAULTS and integer fields are truncated, as for a raw
+        transaction; otherwise missing fields are 0.
+        """
+        is_frame = isinstance(transactions, pd.DataFrame)
+        n_rows = len(transactions)
+        feature_matrix = np.zeros((n_rows, self.required_features), dtype=dtype)
+        if n_rows == 0:
+            return feature_matrix
+
+        for col, feature_name in enumerate(self.FEATURE_COLUMNS):
+            default = self.FEATURE_DEFAULTS[feature_name] if apply_defaults else 0.0
+            if is_frame:
+                if feature_name not in transactions.columns:
+                    feature_matrix[:, col] = default
+                    continue
+                values = pd.to_numeric(transactions[feature_name]).to_numpy(dtype=np.float64)
+                missing = np.isnan(values)
+            else:
+                values = np.array(
+                    [txn.get(feature_name, default) for txn in transactions], dtype=np.float64
+                )
+                missing = None
+
+            if feature_name == "is_business_hours" and apply_defaults:
+                # Derived from the hour unless given explicitly
+                hour = feature_matrix[:, self.FEATURE_COLUMNS.index("transaction_hour")]
+                if missing is None:
+                    missing = np.fromiter((feature_name not in txn for txn in transactions), bool, n_rows)
+                values = np.where(missing, (hour >= 9) & (hour <= 17), values)
+            elif missing is not None:
+                values = np.where(missing, default, values)
+
+            if apply_defaults and feature_name in self.INTEGER_FEATURES:
+                values = np.trunc(values)
+            feature_matrix[:, col] = values
+
+        # Additional features fill the columns after the named ones, truncated to fit
+        first_extra = len(self.FEATURE_COLUMNS)
+        if is_frame:
+            additional = transactions["additional_features"] if "additional_features" in transactions.columns else ()
+        else:
+            additional = (txn.get("additional_features") for txn in transactions)
+        for row, extra in enumerate(additional):
+            if isinstance(extra, (list, tuple, np.ndarray)) and len(extra):
+                extra = extra[:self.required_features - first_extra]
+                feature_matrix[row, first_extra:first_extra + len(extra)] = extra
+
+        np.nan_to_num(feature_matrix, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        return feature_matrix
 
     def process_transaction_features(self, transaction_data: Dict) -> np.ndarray:
-        """Process raw transaction data into model features with AML compliance"""
-
-        # Extract and compute features
-        amount = float(transaction_data.get("transaction_amount", 0))
-        hour = int(transaction_data.get("transaction_hour", 12))
-
-        features = {
-            "transaction_amount": amount,
-            "transaction_hour": hour,
-            "transaction_day": int(transaction_data.get("transaction_day", 15)),
-            "transaction_weekend": int(transaction_data.get("transaction_weekend", 0)),
-            "is_business_hours": int(
-                transaction_data.get("is_business_hours", 1 if 9 <= hour <= 17 else 0)
-            ),
-            "card_amount_mean": float(transaction_data.get("card_amount_mean", 50)),
-            "card_txn_count_recent": int(transaction_data.get("card_txn_count_recent", 1)),
-            "time_since_last_txn": float(transaction_data.get("time_since_last_txn", 3600)),
-            "merchant_risk_score": float(transaction_data.get("merchant_risk_score", 0.1)),
-            "amount_zscore": float(transaction_data.get("amount_zscore", 0)),
-            "is_amount_outlier": int(transaction_data.get("is_amount_outlier", 0)),
-        }
+        """Process raw transaction data into model features"""
+        return self.process_many([transaction_data])[0]
 
-        # Add AML compliance features
+    def _aml_features(self, transaction_data: Dict) -> Dict:
+        """AML risk features for one transaction from the shared checker"""
         try:
-            aml_checker = AMLComplianceChecker()
-            aml_result = aml_checker.calculate_overall_aml_risk(transaction_data)
-            
-            # Add AML features to the feature set
-            features.update({
-                "aml_risk_score": aml_result['aml_overall_risk_score'],
-                "aml_flags_count": len(aml_result['aml_flags']),
-                "requires_manual_review": int(aml_result['requires_manual_review']),
-                "structuring_risk": aml_result['aml_component_scores']['structuring'],
-                "rapid_movement_risk": aml_result['aml_component_scores']['rapid_movement'],
-                "suspicious_patterns_risk": aml_result['aml_component_scores']['suspicious_patterns'],
-                "sanctions_risk": aml_result['aml_component_scores']['sanctions']
-            })
-        except:
-            # Fallback values if AML checker fails
-            features.update({
-                "aml_risk_score": 0.1,
-                "aml_flags_count": 0,
-                "requires_manual_review": 0,
-                "structuring_risk": 0.0,
-                "rapid_movement_risk": 0.0,
-                "suspicious_patterns_risk": 0.1,
-                "sanctions_risk": 0.0
-            })
-
-        # Add any additional features from transaction_data
-        if "additional_features" in transaction_data:
-            features["additional_features"] = transaction_data["additional_features"]
-
-        return self._dict_to_array(features)
+            aml_result = self.aml_checker.calculate_overall_aml_risk(transaction_data)
+        except (TypeError, ValueError, AttributeError) as e:
+            # Malformed transaction fields (e.g. a non-numeric amount); rule bugs still raise
+            logger.warning(f"AML assessment failed, using fallback features: {e}")
+            return dict(self.AML_FALLBACK_FEATURES)
+
+        component_scores = aml_result['aml_component_scores']
+        return {
+            "aml_risk_score": aml_result['aml_overall_risk_score'],
+            "aml_flags_count": len(aml_result['aml_flags']),
+            "requires_manual_review": int(aml_result['requires_manual_review']),
+            "structuring_risk": component_scores['structuring'],
+            "rapid_movement_risk": component_scores['rapid_movement'],
+            "suspicious_patterns_risk": component_scores['suspicious_patterns'],
+            "sanctions_risk": component_scores['sanctions'],
+        }
+
+    def aml_features_many(self, transactions: List[Dict]) -> List[Dict]:
+        """AML risk features for each of a list of transactions from the shared checker"""
+        return [self._aml_features(transaction_data) for transaction_data in transactions]
+
+    def process_many(self, transactions: List[Dict]) -> np.ndarray:
+        """Process a list of transactions into an (n, required_features) matrix"""
+        # AML scores are not model columns; callers that need them use aml_features_many
+        return self.build_feature_matrix(transactions)
+
+
+@dataclass
+class BatchPredictionResult:
+    """Columnar batch predictions; rows listed in errors hold placeholder values"""
+
+    transaction_ids: List[Optional[str]]
+    fraud_probability: np.ndarray
+    is_fraud: np.ndarray
+    risk_level: np.ndarray
+    model_used: Optional[str]
+    errors: Dict[int, str]
+    prediction_timestamp: str
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Per-row prediction dictionaries, in the format of ModelManager.predict_fraud"""
+        fraud_probability = self.fraud_probability.tolist()
+        is_fraud = self.is_fraud.tolist()
+        risk_level = self.risk_level.tolist()
+        confidence = (np.abs(self.fraud_probability - 0.5) * 2).tolist()
+
+        records = []
+        for i, transaction_id in enumerate(self.transaction_ids):
+            if i in self.errors:
+                records.append(
+                    {
+                        "transaction_index": i,
+                        "transaction_id": transaction_id if transaction_id is not None else f"txn_{i}",
+                        "error": self.errors[i],
+                        "is_fraud": False,
+                        "fraud_probability": 0.0,
+                        "risk_level": "ERROR",
+                    }
+                )
+                continue
+
+            record = {
+                "is_fraud": is_fraud[i],
+                "fraud_probability": fraud_probability[i],
+                "risk_level": risk_level[i],
+                "model_used": self.model_used,
+                "confidence": confidence[i],
+                "prediction_timestamp": self.prediction_timestamp,
+                "transaction_index": i,
+            }
+            if transaction_id is not None:
+                record["transaction_id"] = transaction_id
+            records.append(record)
+
+        return records
 
 
 class BatchPredictor:
     """Handle batch predictions efficiently"""
 
-    def __init__(self, model_manager):
+    def __init__(self, model_manager, feature_processor: Optional[FeatureProcessor] = None):
         self.model_manager = model_manager
-        self.feature_processor = FeatureProcessor()
+        self.feature_processor = feature_processor if feature_processor is not None else FeatureProcessor()
 
     def predict_batch(
         self, transactions: List[Dict], model_name: Optional[str] = None
@@ -201,42 +303,78 @@ class BatchPredictor:
         Returns:
             List of prediction results
         """
+        return self.predict_batch_columnar(transactions, model_name).to_records()
+
+    def predict_batch_columnar(
+        self, transactions: List[Dict], model_name: Optional[str] = None
+    ) -> "BatchPredictionResult":
+        """
+        Score a batch with one feature matrix and one model call
+
+        Rows that fail validation or feature building are reported in errors
+        and the rest of the batch is still scored.
+        """
 
         if not self.model_manager.model_loaded:
             raise RuntimeError("Models not loaded")
 
-        results = []
-
+        n_rows = len(transactions)
+        errors: Dict[int, str] = {}
         for i, transaction in enumerate(transactions):
-            try:
-                # Process features
-                features = self.feature_processor.process_transaction_features(transaction)
-                features = features.reshape(1, -1)
+            is_valid, error_message = TransactionValidator.validate_transaction(transaction)
+            if not is_valid:
+                errors[i] = error_message
 
-                # Make prediction
-                prediction = self.model_manager.predict_fraud(features, model_name)
-                prediction["transaction_index"] = i
+        valid_rows = [i for i in range(n_rows) if i not in errors]
+        features, scored_rows = self._build_features(transactions, valid_rows, errors)
 
-                # Add transaction ID if provided
-                if "transaction_id" in transaction:
-                    prediction["transaction_id"] = transaction["transaction_id"]
-
-                results.append(prediction)
+        fraud_probability = np.zeros(n_rows)
+        is_fraud = np.zeros(n_rows, dtype=bool)
+        risk_level = np.full(n_rows, "ERROR", dtype=object)
+        model_used = model_name
 
+        if scored_rows:
+            try:
+                batch = self.model_manager.predict_fraud_batch(features, model_name)
+                fraud_probability[scored_rows] = batch["fraud_probability"]
+                is_fraud[scored_rows] = batch["is_fraud"]
+                risk_level[scored_rows] = batch["risk_level"]
+                model_used = batch["model_used"]
             except Exception as e:
-                logger.error(f"Failed to process transaction {i}: {e}")
-                results.append(
-                    {
-                        "transaction_index": i,
-                        "transaction_id": transaction.get("transaction_id", f"txn_{i}"),
-                        "error": str(e),
-                        "is_fraud": False,
-                        "fraud_probability": 0.0,
-                        "risk_level": "ERROR",
-                    }
-                )
-
-        return results
+                logger.error(f"Failed to score batch of {len(scored_rows)} transactions: {e}")
+                errors.update((i, str(e)) for i in scored_rows)
+
+        if errors:
+            logger.warning(f"{len(errors)} of {n_rows} transactions could not be scored")
+
+        return BatchPredictionResult(
+            transaction_ids=[transaction.get("transaction_id") for transaction in transactions],
+            fraud_probability=fraud_probability,
+            is_fraud=is_fraud,
+            risk_level=risk_level,
+            model_used=model_used,
+            errors=errors,
+            prediction_timestamp=datetime.now().isoformat(),
+        )
+
+    def _build_features(
+        self, transactions: List[Dict], rows: List[int], errors: Dict[int, str]
+    ) -> Tuple[np.ndarray, List[int]]:
+        """Feature matrix for the given rows, recording rows whose features cannot be built"""
+        try:
+            return self.feature_processor.build_feature_matrix([transactions[i] for i in rows]), rows
+        except (TypeError, ValueError):
+            # Build row by row to isolate the malformed transactions
+            built, built_rows = [], []
+            for i in rows:
+                try:
+                    built.append(self.feature_processor.build_feature_matrix([transactions[i]]))
+                    built_rows.append(i)
+                except (TypeError, ValueError) as e:
+                    errors[i] = str(e)
+            if not built:
+                return np.zeros((0, self.feature_processor.required_features)), []
+            return np.vstack(built), built_rows
 
     def analyze_batch_results(self, predictions: List[Dict]) -> Dict[str, Any]:
         """Analyze batch prediction results"""
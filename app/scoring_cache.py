@@ -0,0 +1,134 @@
+"""
+Scoring Cache for the Fraud Detection API
+LRU/TTL cache of stateless scoring results keyed on transaction content
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from numbers import Real
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_key(transaction: Dict[str, Any], fields: Iterable[str], namespace: str = "") -> str:
+    """
+    Hash of the listed fields of a transaction, independent of key order and
+    of other fields (ids, timestamps). Numbers are compared by value, so 100
+    and 100.0 give the same key; a missing field differs from one set to None.
+    """
+    canonical = {}
+    for field in fields:
+        if field in transaction:
+            value = transaction[field]
+            if isinstance(value, Real) and not isinstance(value, bool):
+                value = float(value)
+            canonical[field] = value
+
+    payload = json.dumps([namespace, canonical], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ScoringCache:
+    """
+    Bounded LRU cache with per-entry TTL for stateless scoring results
+
+    Holds at most max_entries entries; the least recently used is evicted
+    to make room, and entries older than ttl_seconds are treated as misses.
+    Every lookup carries the version of the models behind the cached values:
+    when it changes (models reloaded), the whole cache is dropped before the
+    lookup, so stale scores are never served. Cached values are shared
+    between callers and must not be mutated. Safe to use from the scoring
+    pool's threads.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[Hashable] = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self, version: Hashable) -> None:
+        """Drop every entry if the models changed since they were cached (lock held)"""
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"♻️ Scoring cache invalidated ({len(self._entries)} entries), "
+                            f"model version {self.version} -> {version}")
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: str, version: Hashable = None) -> Optional[Any]:
+        """Cached value for key, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, version: Hashable = None) -> None:
+        """Store value under key, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def get_metrics(self) -> Dict:
+        """Size, hit rate and eviction counts"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "model_version": self.version,
+        }
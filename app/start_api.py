@@ -8,6 +8,7 @@ import argparse
 import os
 import subprocess
 import sys
+import tempfile
 import time
 from pathlib import Path
 
@@ -53,7 +54,36 @@ def check_prerequisites():
     return True
 
 
-def start_api_server(host="0.0.0.0", port=8000, reload=True, workers=1):
+def start_velocity_stores(socket_path, stores=1):
+    """Start the shared velocity stores that all API workers record into"""
+    snapshot_path = os.getenv("VELOCITY_SNAPSHOT_PATH", "data/velocity_snapshot.bin")
+    socket_paths = [socket_path] if stores == 1 else [f"{socket_path}.{idx}" for idx in range(stores)]
+
+    processes = []
+    for idx, store_socket in enumerate(socket_paths):
+        cmd = [sys.executable, "src/velocity_store.py", "--socket", store_socket]
+        if snapshot_path:
+            Path(snapshot_path).parent.mkdir(parents=True, exist_ok=True)
+            cmd.extend(["--snapshot", snapshot_path if stores == 1 else f"{snapshot_path}.{idx}"])
+
+        print(f"🔌 Starting shared velocity store on {store_socket}")
+        processes.append(subprocess.Popen(cmd))
+
+    # Wait for the sockets so the first requests do not race the stores' startup
+    for _ in range(100):
+        if all(Path(store_socket).exists() for store_socket in socket_paths):
+            return processes, ",".join(socket_paths)
+        if any(process.poll() is not None for process in processes):
+            break
+        time.sleep(0.1)
+
+    for process in processes:
+        process.terminate()
+    raise RuntimeError("Shared velocity store failed to start")
+
+
+def start_api_server(host="0.0.0.0", port=8000, reload=True, workers=1,
+                     velocity_socket=None, velocity_stores=1):
     """Start the FastAPI server"""
 
     print("🚀 Starting Fraud Detection API...")
@@ -75,9 +105,19 @@ def start_api_server(host="0.0.0.0", port=8000, reload=True, workers=1):
 
     print(f"📋 Running command: {' '.join(cmd)}")
 
+    # Separate worker processes would each count only their own share of a
+    # customer's transactions, so they share one velocity store
+    env = os.environ.copy()
+    store_processes = []
+
     try:
+        if workers > 1 and velocity_socket:
+            store_processes, env["VELOCITY_STORE_SOCKET"] = start_velocity_stores(
+                velocity_socket, velocity_stores
+            )
+
         # Start the server
-        process = subprocess.run(cmd)
+        process = subprocess.run(cmd, env=env)
         return process.returncode == 0
     except KeyboardInterrupt:
         print("\n⏹️  Server stopped by user")
@@ -85,6 +125,10 @@ def start_api_server(host="0.0.0.0", port=8000, reload=True, workers=1):
     except Exception as e:
         print(f"❌ Failed to start server: {e}")
         return False
+    finally:
+        for store_process in store_processes:
+            store_process.terminate()
+            store_process.wait()
 
 
 def show_startup_info():
@@ -141,6 +185,17 @@ def main():
     parser.add_argument("--no-reload", action="store_true", help="Disable auto-reload")
     parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
     parser.add_argument("--skip-checks", action="store_true", help="Skip prerequisite checks")
+    parser.add_argument(
+        "--velocity-socket",
+        default=os.path.join(tempfile.gettempdir(), "fraud_velocity.sock"),
+        help="Unix socket of the velocity store shared by workers (empty to disable)",
+    )
+    parser.add_argument(
+        "--velocity-stores",
+        type=int,
+        default=1,
+        help="Velocity store processes to partition customers across",
+    )
 
     args = parser.parse_args()
 
@@ -165,7 +220,12 @@ def main():
 
     # Start the API server
     success = start_api_server(
-        host=args.host, port=args.port, reload=not args.no_reload, workers=args.workers
+        host=args.host,
+        port=args.port,
+        reload=not args.no_reload,
+        workers=args.workers,
+        velocity_socket=args.velocity_socket,
+        velocity_stores=args.velocity_stores,
     )
 
     if success:
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Batch Prediction Benchmark
+Compares row-by-row scoring (one predict_fraud call per transaction) with
+batched scoring (one feature matrix and one model call per batch)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.models import ModelManager
+from app.predictor import BatchPredictor
+
+
+def synthetic_model_manager(seed: int = 0) -> ModelManager:
+    """Small models fitted on synthetic data, used when models/ has no trained models"""
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(5000, 82))
+    X[:, 0] = rng.lognormal(4, 1, size=5000)
+    y = (X[:, 0] + rng.normal(0, 30, size=5000) > 150).astype(int)
+    scaler = StandardScaler().fit(X)
+
+    manager = ModelManager()
+    manager.scalers = {"standard": scaler}
+    manager.models = {
+        "logistic_regression": LogisticRegression(max_iter=1000).fit(scaler.transform(X), y),
+        "random_forest": RandomForestClassifier(n_estimators=100, max_depth=10, random_state=seed).fit(X, y),
+        "isolation_forest": IsolationForest(n_estimators=100, random_state=seed).fit(X),
+    }
+    manager.metadata = {"models": {name: {"threshold": 0.1} for name in manager.models}}
+    manager.best_model_name = "random_forest"
+    manager.model_loaded = True
+    return manager
+
+
+def generate_transactions(count: int, seed: int = 42) -> list:
+    """Synthetic API-style transactions"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "transaction_id": f"TXN_{idx}",
+            "transaction_amount": float(rng.lognormal(4, 1.5)),
+            "transaction_hour": int(rng.integers(0, 24)),
+            "merchant_risk_score": float(rng.random()),
+        }
+        for idx in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-by-row vs batched fraud scoring")
+    parser.add_argument("--transactions", type=int, default=10000, help="Transactions per batch")
+    parser.add_argument("--row-sample", type=int, default=1000,
+                        help="Rows scored one by one (extrapolated to the batch size)")
+    args = parser.parse_args()
+
+    print("📦 BATCH PREDICTION BENCHMARK")
+    print("=" * 70)
+
+    model_manager = ModelManager()
+    if not model_manager.load_models():
+        print("   No trained models found, using synthetic models")
+        model_manager = synthetic_model_manager()
+
+    predictor = BatchPredictor(model_manager)
+    transactions = generate_transactions(args.transactions)
+    row_sample = transactions[:args.row_sample]
+
+    print(f"   Batch size: {args.transactions:,}\n")
+    print(f"{'model':<22}{'row-by-row txn/s':>18}{'batched txn/s':>16}{'speedup':>10}")
+    for model_name in model_manager.models:
+        start = time.perf_counter()
+        for transaction in row_sample:
+            features = predictor.feature_processor.build_feature_matrix([transaction])
+            model_manager.predict_fraud(features, model_name)
+        row_rate = len(row_sample) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        predictor.predict_batch(transactions, model_name)
+        batch_rate = len(transactions) / (time.perf_counter() - start)
+
+        print(f"{model_name:<22}{row_rate:>18,.0f}{batch_rate:>16,.0f}{batch_rate / row_rate:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compiled Trees Benchmark
+Latency of the RandomForest and IsolationForest models through scikit-learn
+versus the flat node-array engine, at several batch sizes
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compiled_trees import compile_forest
+
+
+def fit_forests(n_estimators: int, max_depth, seed: int = 0) -> dict:
+    """Forests fitted on synthetic data, configured like model_training's grid"""
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(20000, 82))
+    X[:, 0] = rng.lognormal(4, 1, size=20000)
+    y = (X[:, 0] + rng.normal(0, 30, size=20000) > 150).astype(int)
+    return {
+        "random_forest": RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                                class_weight="balanced", random_state=seed).fit(X, y),
+        "isolation_forest": IsolationForest(n_estimators=n_estimators, max_features=0.8,
+                                            random_state=seed).fit(X),
+    }
+
+
+def time_call(fn, X: np.ndarray, min_seconds: float = 0.5) -> float:
+    """Median milliseconds per call of fn(X)"""
+    fn(X)
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or len(timings) < 5:
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled tree scoring against scikit-learn")
+    parser.add_argument("--n-estimators", type=int, default=200, help="Trees per forest")
+    parser.add_argument("--max-depth", type=int, default=None, help="Random forest max depth (default: none)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024], help="Rows per call")
+    args = parser.parse_args()
+
+    print("🌲 COMPILED TREES BENCHMARK")
+    print("=" * 70)
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(max(args.batch_sizes), 82))
+    X[:, 0] = rng.lognormal(4, 1, size=len(X))
+
+    print(f"{'model':<18}{'batch':>7}{'sklearn ms':>12}{'compiled ms':>13}{'speed-up':>10}{'max diff':>11}")
+    for model_name, model in fit_forests(args.n_estimators, args.max_depth).items():
+        compiled = compile_forest(model)
+        method = "predict_proba" if hasattr(model, "predict_proba") else "score_samples"
+        original_fn, compiled_fn = getattr(model, method), getattr(compiled, method)
+
+        for batch_size in args.batch_sizes:
+            batch = X[:batch_size]
+            difference = float(np.abs(original_fn(batch) - compiled_fn(batch)).max())
+            sklearn_ms = time_call(original_fn, batch)
+            compiled_ms = time_call(compiled_fn, batch)
+            print(f"{model_name:<18}{batch_size:>7}{sklearn_ms:>12.3f}{compiled_ms:>13.3f}"
+                  f"{sklearn_ms / compiled_ms:>9.1f}x{difference:>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
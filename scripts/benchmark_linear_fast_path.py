@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Linear Fast Path Benchmark
+Per-row latency of logistic regression through StandardScaler.transform and
+predict_proba versus the folded scaler + coefficients model
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_batch_prediction import synthetic_model_manager
+
+
+def time_per_call(fn, rows: np.ndarray) -> float:
+    """Mean microseconds per call of fn over the rows, one row per call"""
+    for row in rows[:100]:
+        fn(row)
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the logistic regression fast path")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows scored one at a time")
+    args = parser.parse_args()
+
+    print("⚡ LINEAR FAST PATH BENCHMARK")
+    print("=" * 70)
+
+    manager = synthetic_model_manager()
+    scaler = manager.scalers["standard"]
+    model = manager.get_model("logistic_regression")
+    fast = manager.get_model("logistic_regression_fast")
+
+    rng = np.random.default_rng(1)
+    rows = rng.normal(size=(args.rows, 82))
+    rows[:, 0] = rng.lognormal(4, 1, size=args.rows)
+
+    expected = model.predict_proba(scaler.transform(rows))[:, 1]
+    difference = np.abs(fast.predict_proba(rows)[:, 1] - expected).max()
+    print(f"   Max probability difference over {args.rows:,} rows: {difference:.1e}\n")
+
+    paths = {
+        "sklearn transform + predict_proba": lambda row: model.predict_proba(scaler.transform(row[None, :]))[0, 1],
+        "compiled predict_proba": lambda row: fast.predict_proba(row)[0, 1],
+        "compiled score_row": fast.score_row,
+        "predict_fraud (logistic_regression)": lambda row: manager.predict_fraud(row, "logistic_regression"),
+        "predict_fraud (logistic_regression_fast)":
+            lambda row: manager.predict_fraud(row, "logistic_regression_fast"),
+    }
+    print(f"{'path':<42}{'µs/row':>10}")
+    for name, fn in paths.items():
+        print(f"{name:<42}{time_per_call(fn, rows):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Model Loading Benchmark
+Startup time and per-worker memory for several API worker processes loading
+the same models: eager in-memory loading versus memory-mapped and lazy loading
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+MB = 1024 * 1024
+
+
+def save_synthetic_models(models_dir: Path, n_estimators: int, seed: int = 0) -> None:
+    """Fit models on synthetic data and save them uncompressed, as model_training does"""
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier, VotingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(20000, 82))
+    X[:, 0] = rng.lognormal(4, 1, size=20000)
+    y = (X[:, 0] + rng.normal(0, 30, size=20000) > 150).astype(int)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+
+    models = {
+        "random_forest": RandomForestClassifier(n_estimators=n_estimators, random_state=seed).fit(X, y),
+        "isolation_forest": IsolationForest(n_estimators=n_estimators, random_state=seed).fit(X),
+        "logistic_regression": LogisticRegression(max_iter=1000).fit(X_scaled, y),
+        "ensemble": VotingClassifier(
+            [("lr", LogisticRegression(max_iter=1000)),
+             ("rf", RandomForestClassifier(n_estimators=n_estimators // 2, random_state=seed))],
+            voting="soft",
+        ).fit(X_scaled, y),
+    }
+    for model_name, model in models.items():
+        joblib.dump(model, models_dir / f"{model_name}_model.pkl", compress=0)
+    joblib.dump({"standard": scaler}, models_dir / "scalers.pkl", compress=0)
+
+    f1_scores = {"random_forest": 0.9, "ensemble": 0.85, "logistic_regression": 0.8, "isolation_forest": 0.5}
+    (models_dir / "model_metadata.json").write_text(json.dumps({
+        "models": {name: {"threshold": 0.5, "file_path": f"{name}_model.pkl"} for name in models},
+        "performance_summary": {name: {"f1_score": score} for name, score in f1_scores.items()},
+    }))
+
+
+def worker(models_dir: str, mmap_mode, lazy: bool, barrier, results) -> None:
+    """One API worker: load the models, score a row, then report memory while all workers are up"""
+    import psutil
+    import sklearn.ensemble  # noqa: F401  (import cost is the same in every mode, keep it out of the numbers)
+    from app.models import ModelManager
+
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+
+    start = time.perf_counter()
+    manager = ModelManager(models_dir=models_dir, mmap_mode=mmap_mode, lazy=lazy)
+    manager.load_models()
+    manager.predict_fraud_batch(np.zeros((1, 82)))
+    startup = time.perf_counter() - start
+
+    # Every worker holds its models while memory is read, so shared pages show up in PSS
+    barrier.wait()
+    memory = process.memory_full_info()
+    results.put({
+        "startup": startup,
+        "loaded": len(manager.models),
+        "rss": memory.rss - baseline,
+        "uss": memory.uss,
+        "pss": memory.pss,
+    })
+    barrier.wait()
+
+
+def run(models_dir: str, mmap_mode, lazy: bool, workers: int) -> dict:
+    """Start workers processes loading the models and average what they report"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(models_dir, mmap_mode, lazy, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in range(workers)]
+    for process in processes:
+        process.join()
+    return {key: float(np.mean([report[key] for report in reports])) for key in reports[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model startup time and per-worker memory")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes loading the models")
+    parser.add_argument("--n-estimators", type=int, default=200, help="Trees in the synthetic forests")
+    parser.add_argument("--models-dir", default=None, help="Trained models directory (default: synthetic)")
+    args = parser.parse_args()
+
+    print("💾 MODEL LOADING BENCHMARK")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = args.models_dir
+        if models_dir is None:
+            models_dir = tmp
+            print(f"   Saving synthetic models ({args.n_estimators} trees per forest)...")
+            save_synthetic_models(Path(tmp), args.n_estimators)
+
+        on_disk = sum(path.stat().st_size for path in Path(models_dir).glob("*.pkl"))
+        print(f"   Model files: {on_disk / MB:.1f} MB, workers: {args.workers}, CPUs: {os.cpu_count()}\n")
+
+        modes = {
+            "eager, in memory": (None, False),
+            "eager, mmap": ("r", False),
+            "lazy, mmap": ("r", True),
+        }
+        print(f"{'mode':<20}{'startup':>10}{'models':>8}{'RSS delta':>12}{'USS':>10}{'PSS':>10}")
+        for mode, (mmap_mode, lazy) in modes.items():
+            result = run(models_dir, mmap_mode, lazy, args.workers)
+            print(f"{mode:<20}{result['startup']:>9.2f}s{result['loaded']:>8.0f}"
+                  f"{result['rss'] / MB:>10.1f}MB{result['uss'] / MB:>8.1f}MB{result['pss'] / MB:>8.1f}MB")
+
+    print("\n   RSS delta: growth from loading; USS: pages private to the worker;")
+    print("   PSS: worker's share of memory, with shared pages split between workers")
+
+
+if __name__ == "__main__":
+    main()
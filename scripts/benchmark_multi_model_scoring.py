@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Multi-Model Scoring Benchmark
+CPU time to score every model (base models plus ensemble) for the same rows:
+one predict_fraud_batch call per model with a refitted VotingClassifier
+ensemble, versus one predict_fraud_multi call with a soft-voting ensemble
+built from the base models' probabilities
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.models import ModelManager
+from soft_voting import SoftVotingEnsemble
+
+
+def build_managers(n_estimators: int, seed: int = 0):
+    """Managers with the same base models, differing only in how the ensemble is built"""
+    import xgboost as xgb
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(20000, 82))
+    X[:, 0] = rng.lognormal(4, 1, size=20000)
+    y = (X[:, 0] + rng.normal(0, 30, size=20000) > 150).astype(int)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+
+    base = {
+        "xgboost": xgb.XGBClassifier(n_estimators=n_estimators, max_depth=6, random_state=seed).fit(X, y),
+        "random_forest": RandomForestClassifier(n_estimators=n_estimators, max_depth=20,
+                                                random_state=seed).fit(X, y),
+        "logistic_regression": LogisticRegression(max_iter=1000).fit(X_scaled, y),
+    }
+    managers = {}
+    for name, ensemble in {
+        "refitted VotingClassifier": VotingClassifier(
+            [(member, clone(model)) for member, model in base.items()], voting="soft"
+        ).fit(X_scaled, y),
+        "SoftVotingEnsemble": SoftVotingEnsemble(list(base)),
+    }.items():
+        manager = ModelManager()
+        manager.scalers = {"standard": scaler}
+        manager.models = {**base, "ensemble": ensemble}
+        manager.best_model_name = "ensemble"
+        manager.model_loaded = True
+        managers[name] = manager
+    return managers
+
+
+def cpu_ms(fn, repeats: int) -> float:
+    """Mean process CPU milliseconds per call"""
+    fn()
+    start = time.process_time()
+    for _ in range(repeats):
+        fn()
+    return (time.process_time() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scoring every model for the same rows")
+    parser.add_argument("--n-estimators", type=int, default=200, help="Trees in the forest and booster")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024], help="Rows per call")
+    parser.add_argument("--repeats", type=int, default=20, help="Calls timed per measurement")
+    args = parser.parse_args()
+
+    print("🗳️  MULTI-MODEL SCORING BENCHMARK")
+    print("=" * 70)
+    print("   Fitting models...")
+    managers = build_managers(args.n_estimators)
+    model_names = ["xgboost", "random_forest", "logistic_regression", "ensemble"]
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(max(args.batch_sizes), 82))
+    X[:, 0] = rng.lognormal(4, 1, size=len(X))
+
+    refitted = managers["refitted VotingClassifier"]
+    fused = managers["SoftVotingEnsemble"]
+    print(f"\n{'batch':>7}{'per-model calls ms':>20}{'fused call ms':>15}{'CPU saved':>11}")
+    for batch_size in args.batch_sizes:
+        batch = X[:batch_size]
+        separate = cpu_ms(lambda: [refitted.predict_fraud_batch(batch, name) for name in model_names],
+                          args.repeats)
+        together = cpu_ms(lambda: fused.predict_fraud_multi(batch, model_names), args.repeats)
+        print(f"{batch_size:>7}{separate:>20.2f}{together:>15.2f}{1 - together / separate:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
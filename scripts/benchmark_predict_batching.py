@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Predict Micro-Batching Benchmark
+Throughput of concurrent prediction requests in one event loop, scored one
+request at a time versus coalesced by MicroBatcher
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.batching import MicroBatcher
+from app.models import ModelManager
+from app.predictor import FeatureProcessor
+from benchmark_batch_prediction import generate_transactions, synthetic_model_manager
+
+
+async def run_requests(submit, transactions: list, concurrency: int) -> float:
+    """Send every transaction from concurrency clients, returning requests per second"""
+    queue = iter(transactions)
+
+    async def client():
+        for transaction in queue:
+            await submit(transaction)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(transactions) / (time.perf_counter() - start)
+
+
+async def benchmark(score_batch, transactions: list, concurrency: int, max_batch_size: int,
+                    max_wait_ms: float) -> dict:
+    async def unbatched(transaction):
+        return score_batch([transaction])[0]
+
+    batcher = MicroBatcher(score_batch, max_batch_size, max_wait_ms)
+    await batcher.start()
+    try:
+        return {
+            "unbatched": await run_requests(unbatched, transactions, concurrency),
+            "batched": await run_requests(batcher.submit, transactions, concurrency),
+            "metrics": batcher.get_metrics(),
+        }
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /predict micro-batching")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests sent")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 256],
+                        help="Concurrent clients to test")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="MicroBatcher max batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="MicroBatcher max wait")
+    args = parser.parse_args()
+
+    print("📦 PREDICT MICRO-BATCHING BENCHMARK")
+    print("=" * 70)
+
+    model_manager = ModelManager()
+    if not model_manager.load_models():
+        print("   No trained models found, using synthetic models")
+        model_manager = synthetic_model_manager()
+    feature_processor = FeatureProcessor()
+
+    def score_batch(transactions):
+        features = feature_processor.build_feature_matrix(transactions)
+        return model_manager.predict_fraud_batch(features)["fraud_probability"].tolist()
+
+    transactions = generate_transactions(args.requests)
+    print(f"   Model: {model_manager.best_model_name}, max batch: {args.max_batch_size}, "
+          f"max wait: {args.max_wait_ms}ms\n")
+    print(f"{'clients':>8}{'unbatched req/s':>18}{'batched req/s':>16}{'avg batch':>11}{'p99 wait ms':>13}")
+    for concurrency in args.concurrency:
+        result = asyncio.run(benchmark(score_batch, transactions, concurrency,
+                                       args.max_batch_size, args.max_wait_ms))
+        metrics = result["metrics"]
+        print(f"{concurrency:>8}{result['unbatched']:>18,.0f}{result['batched']:>16,.0f}"
+              f"{metrics['avg_batch_size']:>11.1f}{metrics['queue_delay_ms']['p99']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Sanctions Screening Benchmark
+Builds, saves and reloads the sanctions automaton for a large synthetic name
+list, then compares per-transaction screening against the substring loop
+over every listed name that it replaces
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sanctions_screening import SanctionsAutomaton
+
+SYLLABLES = ["AL", "AN", "BA", "DE", "DI", "EL", "HA", "IV", "KA", "KO", "LI", "MA", "MI", "NA",
+             "OV", "RA", "RO", "SA", "SE", "TA", "US", "VA", "YA", "ZA"]
+
+
+def synthetic_names(count: int, seed: int = 42, syllables: list = SYLLABLES) -> list:
+    """Distinct 'GIVEN FAMILY' names built from random syllables"""
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < count:
+        parts = rng.choice(syllables, size=(count, 7))
+        lengths = rng.integers(2, 4, size=(count, 2))
+        for row, (given, family) in zip(parts, lengths):
+            names.add("".join(row[:given]) + " " + "".join(row[3:3 + family]) + "OV")
+    return sorted(names)[:count]
+
+
+def substring_screen(sanctions_list: list, customer_name: str, merchant_name: str, location: str) -> tuple:
+    """The per-entity loop check_sanctions_screening ran before the automaton"""
+    customer_name, merchant_name, location = customer_name.upper(), merchant_name.upper(), location.upper()
+    name_match = any(entity in customer_name or entity in merchant_name for entity in sanctions_list)
+    return name_match, any(entity in location for entity in sanctions_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sanctions screening with a large name list")
+    parser.add_argument("--names", type=int, default=100_000, help="Names in the synthetic sanctions list")
+    parser.add_argument("--transactions", type=int, default=2000, help="Transactions screened")
+    parser.add_argument("--hit-rate", type=float, default=0.05, help="Share of transactions naming a listed entity")
+    args = parser.parse_args()
+
+    print("🛂 SANCTIONS SCREENING BENCHMARK")
+    print("=" * 70)
+    names = synthetic_names(args.names)
+    print(f"   Sanctions list: {len(names):,} names")
+
+    start = time.perf_counter()
+    automaton = SanctionsAutomaton.build(names)
+    print(f"\n✅ Built automaton in {time.perf_counter() - start:.2f}s ({automaton.n_nodes:,} nodes)")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "sanctions.npz")
+        automaton.save(path)
+        start = time.perf_counter()
+        automaton = SanctionsAutomaton.load(path)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"✅ Loaded saved automaton ({size_mb:.1f} MB) in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(7)
+    clean_names = synthetic_names(args.transactions, seed=99)
+    transactions = []
+    for idx in range(args.transactions):
+        customer = names[rng.integers(len(names))] if rng.random() < args.hit_rate else clean_names[idx]
+        transactions.append((f"Mr {customer.title()}", f"MERCHANT {idx} TRADING LLC", "DOMESTIC"))
+
+    def screen_automaton(customer_name, merchant_name, location):
+        return (automaton.matches(customer_name) or automaton.matches(merchant_name),
+                automaton.matches(location))
+
+    results = {}
+    print(f"\n{'method':>12}{'transactions':>14}{'mean µs':>12}{'p99 µs':>12}")
+    for label, screen, sample in [("substring", lambda *fields: substring_screen(names, *fields), 200),
+                                  ("automaton", screen_automaton, args.transactions)]:
+        latencies = []
+        results[label] = []
+        for fields in transactions[:sample]:
+            start = time.perf_counter()
+            results[label].append(screen(*fields))
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1e6
+        print(f"{label:>12}{sample:>14,}{latencies.mean():>12.1f}{np.percentile(latencies, 99):>12.1f}")
+
+    agree = results["substring"] == results["automaton"][:len(results["substring"])]
+    hits = sum(name_match for name_match, _ in results["automaton"])
+    print(f"\n   Matches: {hits:,} of {args.transactions:,} transactions; "
+          f"{'agrees' if agree else 'DISAGREES'} with the substring loop")
+
+
+if __name__ == "__main__":
+    main()
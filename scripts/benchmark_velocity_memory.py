@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Velocity Storage Memory Benchmark
+Compares memory per customer of the standard deque layout against the
+compact array-backed storage mode of VelocityMonitor
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import VelocityMonitor
+
+
+def sample_transaction(customer_idx: int, txn_idx: int) -> dict:
+    """Build a transaction payload shaped like an API /predict request"""
+    return {
+        "transaction_id": f"TXN_{customer_idx}_{txn_idx}",
+        "customer_id": f"CUST_{customer_idx}",
+        "transaction_amount": float((customer_idx * 31 + txn_idx * 17) % 2000) + 0.99,
+        "transaction_hour": txn_idx % 24,
+        "merchant_category": "RETAIL",
+        "payment_method": "CARD",
+        "location": "US-NY",
+    }
+
+
+def measure_storage(storage_mode: str, customers: int, transactions_per_customer: int,
+                    amount_dtype: str = "float64",
+                    max_transactions: int = None) -> dict:
+    """Fill a monitor and measure the memory it holds per customer"""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    monitor = VelocityMonitor(storage_mode=storage_mode)
+    monitor._amount_typecode = VelocityMonitor.AMOUNT_TYPECODES[amount_dtype]
+    monitor._max_transactions_per_customer = max_transactions
+
+    start = time.perf_counter()
+    for customer_idx in range(customers):
+        customer_id = f"CUST_{customer_idx}"
+        for txn_idx in range(transactions_per_customer):
+            monitor.record_transaction(customer_id, sample_transaction(customer_idx, txn_idx))
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    retained = current - baseline
+    return {
+        "label": f"{storage_mode}/{amount_dtype}" + (f"/cap={max_transactions}" if max_transactions else ""),
+        "bytes_per_customer": retained / customers,
+        "bytes_per_transaction": retained / (customers * transactions_per_customer),
+        "peak_mb": (peak - baseline) / 1024 / 1024,
+        "records_per_second": customers * transactions_per_customer / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark velocity storage memory per customer")
+    parser.add_argument("--customers", type=int, default=2000, help="Number of customers")
+    parser.add_argument("--transactions", type=int, default=50,
+                        help="Transactions recorded per customer")
+    parser.add_argument("--cap", type=int, default=None,
+                        help="Compact mode retention cap per customer")
+    args = parser.parse_args()
+
+    print("📊 VELOCITY STORAGE MEMORY BENCHMARK")
+    print("=" * 70)
+    print(f"   Customers: {args.customers}, transactions/customer: {args.transactions}")
+
+    scenarios = [
+        ("standard", "float64", None),
+        ("compact", "float64", args.cap),
+        ("compact", "float32", args.cap),
+    ]
+    results = [
+        measure_storage(mode, args.customers, args.transactions, dtype, cap)
+        for mode, dtype, cap in scenarios
+    ]
+
+    print(f"\n{'layout':<28}{'bytes/customer':>16}{'bytes/txn':>12}{'peak MB':>10}{'records/s':>12}")
+    for result in results:
+        print(
+            f"{result['label']:<28}{result['bytes_per_customer']:>16,.0f}"
+            f"{result['bytes_per_transaction']:>12,.1f}{result['peak_mb']:>10.1f}"
+            f"{result['records_per_second']:>12,.0f}"
+        )
+
+    standard_bytes = results[0]["bytes_per_customer"]
+    print()
+    for result in results[1:]:
+        print(f"✅ {result['label']}: {standard_bytes / result['bytes_per_customer']:.1f}x "
+              f"less memory per customer than the standard layout")
+
+
+if __name__ == "__main__":
+    main()
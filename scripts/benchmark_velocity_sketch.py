@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Velocity Sketch Benchmark
+Compares memory, throughput and count error of the approximate (Count-Min)
+storage mode against exact compact storage on high-cardinality keys
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import VelocityMonitor
+
+
+def generate_keys(transactions: int, keys: int, seed: int = 42) -> list:
+    """Zipf-like key stream: a few very busy merchants/IPs and a long tail"""
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(1.3, size=transactions) % keys
+    return [f"KEY_{rank}" for rank in ranks]
+
+
+def run(storage_mode: str, key_stream: list, now: float) -> dict:
+    """Record the stream and measure memory, throughput and per-key minute counts"""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    monitor = VelocityMonitor(storage_mode=storage_mode, time_mode="event")
+    start = time.perf_counter()
+    for idx, key in enumerate(key_stream):
+        monitor.record_transaction(key, {"transaction_amount": 10.0}, now + idx * 1e-4)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "monitor": monitor,
+        "memory_mb": (current - baseline) / 1024 / 1024,
+        "records_per_second": len(key_stream) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark approximate velocity sketches")
+    parser.add_argument("--transactions", type=int, default=200000, help="Transactions recorded")
+    parser.add_argument("--keys", type=int, default=100000, help="Distinct key space")
+    parser.add_argument("--sample", type=int, default=2000, help="Keys checked for count error")
+    args = parser.parse_args()
+
+    print("🧮 VELOCITY SKETCH BENCHMARK")
+    print("=" * 70)
+    print(f"   Transactions: {args.transactions:,}, key space: {args.keys:,}")
+
+    now = 1_700_000_000.0
+    key_stream = generate_keys(args.transactions, args.keys)
+    exact_counts = Counter(key_stream)
+    print(f"   Distinct keys seen: {len(exact_counts):,}")
+
+    results = {mode: run(mode, key_stream, now) for mode in ("compact", "approximate")}
+
+    print(f"\n{'mode':<14}{'memory MB':>12}{'records/s':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<14}{result['memory_mb']:>12.1f}{result['records_per_second']:>12,.0f}")
+
+    approximate = results["approximate"]["monitor"]
+    query_time = now + args.transactions * 1e-4
+    sample = list(exact_counts)[:args.sample]
+    errors = np.array([
+        approximate.calculate_velocity_metrics(key, query_time)["day_window_count"] - exact_counts[key]
+        for key in sample
+    ])
+    bounds = approximate.sketch.error_bounds()
+
+    print(f"\n📏 Day-window count error over {len(sample):,} keys:")
+    print(f"   Undercounts: {int((errors < 0).sum())}")
+    print(f"   Mean overshoot: {errors.mean():.2f}, p99: {np.percentile(errors, 99):.0f}, "
+          f"max: {errors.max()}")
+    print(f"   Bound: <= {bounds['count_epsilon'] * args.transactions:.0f} "
+          f"with probability {1 - bounds['count_delta']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Velocity Snapshot Benchmark
+Measures how long it takes to write a velocity snapshot, restore it into a
+fresh monitor, and serve the first requests for restored customers
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import ShardedVelocityMonitor, VelocityMonitor
+from velocity_snapshot import VelocitySnapshot
+
+
+def synthetic_snapshot(customers: int, transactions_per_customer: int, seed: int = 42) -> VelocitySnapshot:
+    """Build a snapshot of recent activity without scoring every transaction through a monitor"""
+    rng = np.random.default_rng(seed)
+    total = customers * transactions_per_customer
+    now = time.time()
+
+    lengths = np.full(customers, transactions_per_customer, dtype=np.int64)
+    timestamps = np.sort(
+        now - rng.uniform(0, 86400, size=(customers, transactions_per_customer)), axis=1
+    ).ravel()
+    amounts = np.round(rng.lognormal(4.5, 1.2, size=total), 2)
+    customer_ids = [f"CUST_{idx}" for idx in range(customers)]
+
+    return VelocitySnapshot.build(customer_ids, lengths, timestamps, amounts,
+                                  metadata={"time_mode": "processing"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark velocity snapshot write and restore")
+    parser.add_argument("--customers", type=int, default=5_000_000, help="Customers in the snapshot")
+    parser.add_argument("--transactions", type=int, default=4,
+                        help="Transactions per customer")
+    parser.add_argument("--lookups", type=int, default=10000,
+                        help="Restored customers scored after startup")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Restore into a ShardedVelocityMonitor with this many shards")
+    args = parser.parse_args()
+
+    print("💾 VELOCITY SNAPSHOT BENCHMARK")
+    print("=" * 70)
+    print(f"   Customers: {args.customers:,}, transactions/customer: {args.transactions}")
+
+    start = time.perf_counter()
+    snapshot = synthetic_snapshot(args.customers, args.transactions)
+    print(f"\n   Built synthetic snapshot in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "velocity_snapshot.bin")
+
+        start = time.perf_counter()
+        snapshot.write(path)
+        write_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"✅ Wrote {size_mb:,.0f} MB in {write_seconds:.2f}s")
+
+        monitor = ShardedVelocityMonitor(num_shards=args.shards) if args.shards else VelocityMonitor()
+        start = time.perf_counter()
+        monitor.load_snapshot(path)
+        print(f"✅ Restored {args.customers:,} customers in {time.perf_counter() - start:.3f}s")
+
+        rng = np.random.default_rng(7)
+        lookups = rng.integers(0, args.customers, size=args.lookups)
+        latencies = []
+        for customer_idx in lookups:
+            start = time.perf_counter()
+            monitor.assess_velocity_risk(f"CUST_{customer_idx}", {"transaction_amount": 25.0})
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"✅ First-touch scoring of restored customers: "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+
+        start = time.perf_counter()
+        customers = monitor.save_snapshot(path)
+        print(f"✅ Re-snapshotted {customers:,} customers from the running monitor "
+              f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
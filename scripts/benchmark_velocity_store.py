@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Shared Velocity Store Benchmark
+Scores transactions from several worker processes against one shared
+velocity store and checks that no worker's transactions go uncounted
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_store import SharedVelocityMonitor, VelocityStoreServer
+
+
+def serve_store(socket_path: str) -> None:
+    """Store process: serve velocity windows until terminated"""
+    server = VelocityStoreServer(socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def score_transactions(socket_paths: list, worker_idx: int, transactions: int, customers: int,
+                       barrier) -> None:
+    """Worker process: assess transactions through the shared store"""
+    monitor = SharedVelocityMonitor(socket_paths)
+    barrier.wait()
+    for txn_idx in range(transactions):
+        customer_id = f"CUST_{(worker_idx + txn_idx) % customers}"
+        monitor.assess_velocity_risk(customer_id, {"transaction_amount": 1.0})
+
+
+def run(socket_dir: str, stores: int, workers: int, transactions: int, customers: int) -> dict:
+    """Score from several processes at once and verify the shared counts"""
+    socket_paths = [os.path.join(socket_dir, f"store{idx}.sock") for idx in range(stores)]
+    store_processes = [
+        multiprocessing.Process(target=serve_store, args=(socket_path,), daemon=True)
+        for socket_path in socket_paths
+    ]
+    for process in store_processes:
+        process.start()
+    while not all(os.path.exists(socket_path) for socket_path in socket_paths):
+        time.sleep(0.01)
+
+    try:
+        barrier = multiprocessing.Barrier(workers + 1)
+        processes = [
+            multiprocessing.Process(
+                target=score_transactions,
+                args=(socket_paths, idx, transactions, customers, barrier)
+            )
+            for idx in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        reader = SharedVelocityMonitor(socket_paths)
+        counted = sum(
+            reader.calculate_velocity_metrics(f"CUST_{idx}")["minute_window_count"]
+            for idx in range(customers)
+        )
+        return {
+            "throughput": workers * transactions / elapsed,
+            "expected": workers * transactions,
+            "counted": counted,
+        }
+    finally:
+        for process in store_processes:
+            process.terminate()
+            process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared velocity store across processes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="Worker process counts to test")
+    parser.add_argument("--transactions", type=int, default=5000,
+                        help="Transactions scored per worker")
+    parser.add_argument("--customers", type=int, default=200, help="Customers shared by the workers")
+    parser.add_argument("--stores", type=int, nargs="+", default=[1, 2],
+                        help="Store process counts to test")
+    args = parser.parse_args()
+
+    print("🔌 SHARED VELOCITY STORE BENCHMARK")
+    print("=" * 70)
+    print(f"   CPUs: {os.cpu_count()}, transactions/worker: {args.transactions}, "
+          f"customers: {args.customers}")
+
+    print(f"\n{'stores':>8}{'workers':>8}{'txn/s':>12}{'expected':>12}{'counted':>12}")
+    with tempfile.TemporaryDirectory(prefix="vs") as temp_dir:
+        for stores in args.stores:
+            for workers in args.workers:
+                result = run(temp_dir, stores, workers, args.transactions, args.customers)
+                status = "✅" if result["counted"] == result["expected"] else "❌"
+                print(f"{stores:>8}{workers:>8}{result['throughput']:>12,.0f}"
+                      f"{result['expected']:>12,}{result['counted']:>12,} {status}")
+
+    print("\nNote: each store is one process, so add stores (--velocity-stores in")
+    print("start_api.py) once workers outnumber the cores a single store can keep up with.")
+
+
+if __name__ == "__main__":
+    main()
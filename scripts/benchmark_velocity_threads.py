@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Velocity Monitor Threaded Benchmark
+Compares throughput and tail latency of the single-lock VelocityMonitor against
+ShardedVelocityMonitor as the number of scoring threads grows
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import ShardedVelocityMonitor, VelocityMonitor
+
+
+def build_monitor(kind: str, preload_customers: int, shards: int, cleanup_interval: float):
+    """Create a monitor with a populated buffer so cleanup sweeps have real work to do"""
+    if kind == "sharded":
+        monitor = ShardedVelocityMonitor(num_shards=shards)
+        targets = monitor.shards
+    else:
+        monitor = VelocityMonitor()
+        targets = [monitor]
+
+    for customer_idx in range(preload_customers):
+        monitor.record_transaction(f"PRELOAD_{customer_idx}", {"transaction_amount": 10.0})
+
+    # Sweep (or start an incremental pass) much more often than the 5 minute default
+    for target in targets:
+        target._cleanup_interval = cleanup_interval
+    return monitor
+
+
+def run_workers(monitor, workers: int, transactions_per_worker: int, customers: int) -> dict:
+    """Score transactions from several threads and collect per-call latencies"""
+    latencies = [[] for _ in range(workers)]
+    barrier = threading.Barrier(workers + 1)
+
+    def worker(worker_idx: int):
+        worker_latencies = latencies[worker_idx]
+        barrier.wait()
+        for txn_idx in range(transactions_per_worker):
+            customer_id = f"CUST_{(worker_idx * 7919 + txn_idx) % customers}"
+            transaction = {"transaction_amount": float(txn_idx % 500) + 1.0}
+            start = time.perf_counter()
+            monitor.assess_velocity_risk(customer_id, transaction)
+            worker_latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(latency for worker_latencies in latencies for latency in worker_latencies)
+    total = len(all_latencies)
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": all_latencies[total // 2] * 1000,
+        "p99_ms": all_latencies[min(total - 1, int(total * 0.99))] * 1000,
+        "max_ms": all_latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark velocity monitor thread scaling")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Worker thread counts to test")
+    parser.add_argument("--transactions", type=int, default=5000,
+                        help="Transactions scored per worker")
+    parser.add_argument("--customers", type=int, default=1000, help="Active customers")
+    parser.add_argument("--preload", type=int, default=20000,
+                        help="Idle customers preloaded into the buffer")
+    parser.add_argument("--shards", type=int, default=16, help="Shards for the sharded monitor")
+    parser.add_argument("--cleanup-interval", type=float, default=0.5,
+                        help="Seconds between cleanup passes")
+    args = parser.parse_args()
+
+    print("🧵 VELOCITY MONITOR THREADED BENCHMARK")
+    print("=" * 70)
+    print(f"   Preloaded customers: {args.preload}, active customers: {args.customers}")
+
+    print(f"\n{'monitor':<10}{'workers':>8}{'txn/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in ("single", "sharded"):
+        for workers in args.workers:
+            monitor = build_monitor(kind, args.preload, args.shards, args.cleanup_interval)
+            result = run_workers(monitor, workers, args.transactions, args.customers)
+            print(
+                f"{kind:<10}{workers:>8}{result['throughput']:>12,.0f}"
+                f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['max_ms']:>10.1f}"
+            )
+
+    print("\nNote: on a GIL build, pure-Python scoring is serialized, so the sharded monitor")
+    print("mainly removes the buffer-wide sweep stalls (max ms); throughput scales with")
+    print("workers on free-threaded Python builds.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Export Compiled Trees
+Converts the trained RandomForest and IsolationForest models in models/ into
+flat node arrays for the API, and checks they score like the originals
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compiled_trees import export_compiled_models
+
+
+def max_difference(original, compiled, X: np.ndarray) -> float:
+    """Largest difference between the original and compiled model outputs on X"""
+    if hasattr(original, "predict_proba"):
+        return float(np.abs(original.predict_proba(X) - compiled.predict_proba(X)).max())
+    return float(np.abs(original.score_samples(X) - compiled.score_samples(X)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile tree ensembles into flat node arrays")
+    parser.add_argument("--models-dir", default="models", help="Directory with model_metadata.json")
+    parser.add_argument("--check-rows", type=int, default=1000, help="Random rows used to check the export")
+    args = parser.parse_args()
+
+    print("🌲 EXPORT COMPILED TREES")
+    print("=" * 70)
+
+    models_dir = Path(args.models_dir)
+    exported = export_compiled_models(models_dir)
+    if not exported:
+        print("   No RandomForest or IsolationForest models found")
+        return
+
+    with open(models_dir / "model_metadata.json") as f:
+        metadata = json.load(f)
+
+    for model_name, compiled_file in exported.items():
+        original = joblib.load(models_dir / metadata["models"][model_name]["file_path"])
+        compiled = joblib.load(models_dir / compiled_file)
+        X = np.random.default_rng(0).normal(size=(args.check_rows, compiled.n_features_in_))
+        print(f"   ✅ {model_name}: {compiled.n_trees} trees, {compiled.n_nodes:,} nodes -> {compiled_file} "
+              f"(max difference {max_difference(original, compiled, X):.2e})")
+
+
+if __name__ == "__main__":
+    main()
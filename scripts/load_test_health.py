@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Health Latency Load Test
+Floods /predict from several client processes and measures /health
+latency at the same time, once per scoring mode (inline on the event loop
+versus the scoring pool)
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import requests
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def start_server(port: int, env_overrides: dict) -> subprocess.Popen:
+    """Start the API with uvicorn and wait until it answers"""
+    env = {**os.environ, "VELOCITY_SNAPSHOT_PATH": "", **env_overrides}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(300):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/healthz", timeout=0.5)
+            return process
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API did not start")
+
+
+def flood(port: int, threads: int, stop_at: float, counts) -> None:
+    """Client process: post /predict from several threads until stop_at"""
+    import threading
+
+    def client(idx: int):
+        session = requests.Session()
+        transaction = {"transaction_amount": 250.0 + idx, "transaction_hour": idx % 24,
+                       "customer_id": f"CUST_{idx % 50}", "merchant_category": "GAMBLING"}
+        while time.time() < stop_at:
+            status = session.post(f"http://127.0.0.1:{port}/predict", json=transaction).status_code
+            with counts.get_lock():
+                counts[0 if status == 200 else 1 if status == 429 else 2] += 1
+
+    workers = [threading.Thread(target=client, args=(idx,)) for idx in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run(port: int, env_overrides: dict, duration: float, clients: int, threads: int) -> dict:
+    """Flood /predict for duration seconds while probing /health"""
+    server = start_server(port, env_overrides)
+    try:
+        counts = multiprocessing.Array("i", 3)
+        stop_at = time.time() + duration
+        flooders = [
+            multiprocessing.Process(target=flood, args=(port, threads, stop_at, counts))
+            for _ in range(clients)
+        ]
+        for process in flooders:
+            process.start()
+
+        time.sleep(min(1.0, duration / 4))  # let the flood build up
+        session = requests.Session()
+        latencies = []
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            session.get(f"http://127.0.0.1:{port}/health")
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.02)
+
+        for process in flooders:
+            process.join()
+        return {
+            "health_p50": float(np.percentile(latencies, 50)),
+            "health_p99": float(np.percentile(latencies, 99)),
+            "predict_ok": counts[0],
+            "predict_429": counts[1],
+            "predict_other": counts[2],
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /health latency during a /predict flood")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the test server")
+    parser.add_argument("--duration", type=float, default=10.0, help="Flood duration in seconds")
+    parser.add_argument("--clients", type=int, default=2, help="Flooding client processes")
+    parser.add_argument("--threads", type=int, default=16, help="Threads per client process")
+    args = parser.parse_args()
+
+    print("🩺 HEALTH LATENCY UNDER LOAD")
+    print("=" * 70)
+    print(f"   CPUs: {os.cpu_count()}, flood: {args.clients} x {args.threads} clients "
+          f"for {args.duration:.0f}s\n")
+
+    modes = {
+        "inline": {"SCORING_POOL": "inline"},
+        "thread pool": {"SCORING_POOL": "thread"},
+        "thread pool + batching": {"SCORING_POOL": "thread", "PREDICT_BATCHING": "true"},
+    }
+    print(f"{'mode':<25}{'health p50':>12}{'health p99':>12}{'predict 200':>13}{'429':>8}{'other':>8}")
+    for mode, env_overrides in modes.items():
+        result = run(args.port, env_overrides, args.duration, args.clients, args.threads)
+        print(f"{mode:<25}{result['health_p50']:>10.1f}ms{result['health_p99']:>10.1f}ms"
+              f"{result['predict_ok']:>13,}{result['predict_429']:>8,}{result['predict_other']:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,18 @@ Implements real-world AML detection rules and risk scoring
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
 import json
+import time
+
+# Imported as part of the src package or, by scripts and tests, with src/ on sys.path
+try:
+    from .aml_history import AMLHistoryStore, history_arrays
+    from .sanctions_screening import FuzzyNameIndex, load_sanctions_automaton
+    from .timestamps import to_epoch_seconds
+except ImportError:
+    from aml_history import AMLHistoryStore, history_arrays
+    from sanctions_screening import FuzzyNameIndex, load_sanctions_automaton
+    from timestamps import to_epoch_seconds
 
 
 class AMLComplianceChecker:
@@ -16,6 +26,22 @@ class AMLComplianceChecker:
     Implements industry-standard AML rules and risk scoring
     """
     
+    # Every flag the rules can raise, in the order calculate_overall_aml_risk lists them;
+    # bit i of an aml_flags_mask from calculate_overall_aml_risk_frame is AML_FLAGS[i]
+    AML_FLAGS = (
+        "AMOUNT_NEAR_CTR_THRESHOLD", "MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD",
+        "LARGE_SINGLE_TRANSACTION", "ROUND_AMOUNT_TRANSACTION", "HIGH_FREQUENCY_TRANSACTIONS",
+        "UNUSUAL_TIMING", "HIGH_RISK_MERCHANT_CATEGORY", "HIGH_RISK_LOCATION", "REPEATED_DIGIT_AMOUNT",
+        "SANCTIONS_MATCH", "SANCTIONS_FUZZY_MATCH", "SANCTIONS_LOCATION",
+    )
+    HIGH_RISK_CATEGORIES = ("CASH_ADVANCE", "GAMBLING", "CRYPTOCURRENCY", "MONEY_TRANSFER")
+    HIGH_RISK_LOCATIONS = ("OFFSHORE", "SANCTIONS_COUNTRY", "HIGH_RISK_JURISDICTION")
+    
+    # Transaction fields read by the rules besides customer history (all of them when
+    # there is no history store and callers pass no history)
+    INPUT_FIELDS = ("transaction_amount", "transaction_hour", "merchant_category", "location",
+                    "customer_name", "merchant_name")
+    
     def __init__(self, config_path: Optional[str] = None):
         """Initialize AML checker with configurable rules"""
         self.config = self._load_config(config_path)
@@ -25,6 +51,61 @@ class AMLComplianceChecker:
             "velocity_threshold": 100000,
             "suspicious_pattern_threshold": 25000
         })
+        self.sanctions_automaton, self.fuzzy_sanctions_index = self._build_sanctions_screening()
+        
+        # Recent transactions per customer for the window rules when callers pass no history
+        history_config = self.config.get("history_store", {})
+        self.history_store = None
+        if history_config.get("enabled", True):
+            self.history_store = AMLHistoryStore(
+                retention_seconds=max(self.config["time_windows"].values()) * 3600,
+                max_transactions_per_customer=history_config.get("max_transactions_per_customer", 10000)
+            )
+        
+    @property
+    def stateless(self) -> bool:
+        """Whether an assessment depends only on the transaction (no history store to consult and update)"""
+        return self.history_store is None
+    
+    def reads_history(self, transaction_data: Dict) -> bool:
+        """Whether assessing this transaction consults the history store (it has a customer_id)"""
+        return self.history_store is not None and transaction_data.get("customer_id") is not None
+    
+    @property
+    def sanctions_version(self) -> str:
+        """Fingerprint of the sanctions list in use; changes when it is reloaded with other names"""
+        return self.sanctions_automaton.fingerprint
+    
+    def reload_sanctions(self, sanctions_list: Optional[List[str]] = None) -> int:
+        """
+        Rebuild the sanctions automaton from a new list (default: the configured one)
+        and swap it in; screening in progress finishes on the previous automaton
+        """
+        if sanctions_list is not None:
+            self.config["sanctions_list"] = list(sanctions_list)
+        self.sanctions_automaton, self.fuzzy_sanctions_index = self._build_sanctions_screening()
+        return len(self.sanctions_automaton)
+    
+    def _build_sanctions_screening(self) -> Tuple:
+        """Exact-match automaton and fuzzy index (None when disabled) for the configured sanctions list"""
+        automaton = load_sanctions_automaton(
+            self.config.get("sanctions_list", []), self.config.get("sanctions_automaton_path")
+        )
+        fuzzy_config = self.config.get("fuzzy_sanctions", {})
+        fuzzy_index = FuzzyNameIndex(automaton.patterns) if fuzzy_config.get("enabled", True) else None
+        return automaton, fuzzy_index
+    
+    def rescreen_names(self, names: List[str]) -> List[List[Dict]]:
+        """
+        Fuzzy sanctions matches for many names (e.g. the whole customer base after
+        a list update), without the per-transaction latency budget
+        """
+        if self.fuzzy_sanctions_index is None:
+            raise RuntimeError("Fuzzy sanctions screening is disabled")
+        fuzzy_config = self.config.get("fuzzy_sanctions", {})
+        return self.fuzzy_sanctions_index.search_batch(
+            names, fuzzy_config.get("threshold", 0.85), fuzzy_config.get("max_candidates", 50)
+        )
         
     def _load_config(self, config_path: Optional[str]) -> Dict:
         """Load AML configuration from file or use defaults"""
@@ -44,7 +125,22 @@ class AMLComplianceChecker:
                 # Simplified sanctions list - in production would be comprehensive
                 "SANCTIONED_ENTITY_1",
                 "BLOCKED_COUNTRY_CODE"
-            ]
+            ],
+            # Optional .npz cache of the sanctions automaton, rebuilt when the list changes
+            "sanctions_automaton_path": None,
+            # Per-customer history consulted by the window rules when callers pass none
+            "history_store": {
+                "enabled": True,
+                "max_transactions_per_customer": 10000
+            },
+            # Near matches of customer and merchant names (typos, transliterations), searched
+            # for at most budget_ms per transaction when there is no exact match
+            "fuzzy_sanctions": {
+                "enabled": True,
+                "threshold": 0.85,
+                "max_candidates": 50,
+                "budget_ms": 5.0
+            }
         }
         
         if config_path:
@@ -74,15 +170,13 @@ class AMLComplianceChecker:
             flags.append("AMOUNT_NEAR_CTR_THRESHOLD")
             
         # Check for multiple transactions in time window (if history available)
-        if transaction_history:
-            window_hours = self.config["time_windows"]["structuring_window_hours"]
-            recent_amounts = [
-                t["transaction_amount"] for t in transaction_history
-                if self._is_within_time_window(t.get("timestamp"), window_hours)
-            ]
+        window_hours = self.config["time_windows"]["structuring_window_hours"]
+        recent = self._recent_activity(transaction_data, transaction_history, window_hours)
+        if recent is not None:
+            recent_count, recent_total = recent
             
-            total_recent = sum(recent_amounts) + amount
-            if total_recent > ctr_threshold and len(recent_amounts) >= 3:
+            total_recent = recent_total + amount
+            if total_recent > ctr_threshold and recent_count >= 3:
                 risk_score += 0.6
                 flags.append("MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD")
                 
@@ -111,14 +205,12 @@ class AMLComplianceChecker:
             flags.append("ROUND_AMOUNT_TRANSACTION")
             
         # Check velocity if history available
-        if account_history:
-            window_hours = self.config["time_windows"]["rapid_movement_window_hours"]
-            recent_transactions = [
-                t for t in account_history
-                if self._is_within_time_window(t.get("timestamp"), window_hours)
-            ]
+        window_hours = self.config["time_windows"]["rapid_movement_window_hours"]
+        recent = self._recent_activity(transaction_data, account_history, window_hours)
+        if recent is not None:
+            recent_count, _ = recent
             
-            if len(recent_transactions) >= 5:
+            if recent_count >= 5:
                 risk_score += 0.4
                 flags.append("HIGH_FREQUENCY_TRANSACTIONS")
                 
@@ -145,14 +237,12 @@ class AMLComplianceChecker:
             flags.append("UNUSUAL_TIMING")
             
         # High-risk merchant categories
-        high_risk_categories = ["CASH_ADVANCE", "GAMBLING", "CRYPTOCURRENCY", "MONEY_TRANSFER"]
-        if merchant_category in high_risk_categories:
+        if merchant_category in self.HIGH_RISK_CATEGORIES:
             risk_score += 0.3
             flags.append("HIGH_RISK_MERCHANT_CATEGORY")
             
         # Geographic risk factors
-        high_risk_locations = ["OFFSHORE", "SANCTIONS_COUNTRY", "HIGH_RISK_JURISDICTION"]
-        if any(risk_loc in location.upper() for risk_loc in high_risk_locations):
+        if any(risk_loc in location.upper() for risk_loc in self.HIGH_RISK_LOCATIONS):
             risk_score += 0.4
             flags.append("HIGH_RISK_LOCATION")
             
@@ -171,45 +261,81 @@ class AMLComplianceChecker:
         """
         Screen against sanctions lists and PEP databases
         """
-        customer_name = transaction_data.get("customer_name", "").upper()
-        merchant_name = transaction_data.get("merchant_name", "").upper()
-        location = transaction_data.get("location", "").upper()
+        customer_name = transaction_data.get("customer_name", "")
+        merchant_name = transaction_data.get("merchant_name", "")
+        location = transaction_data.get("location", "")
         
         risk_score = 0.0
         flags = []
         
-        # Check against sanctions list
-        sanctions_list = self.config.get("sanctions_list", [])
+        # Check against sanctions list (one automaton scan per field, case-insensitive)
+        sanctions_automaton = self.sanctions_automaton
+        fuzzy_index = self.fuzzy_sanctions_index
+        matches = []
+        
+        if sanctions_automaton.matches(customer_name) or sanctions_automaton.matches(merchant_name):
+            risk_score = 1.0
+            flags.append("SANCTIONS_MATCH")
+            for field, value in (("customer_name", customer_name), ("merchant_name", merchant_name)):
+                matches.extend(
+                    {"field": field, "listed_name": listed_name, "matched_text": listed_name, "similarity": 1.0}
+                    for listed_name in sanctions_automaton.find_all(value)
+                )
         
-        for sanctioned_entity in sanctions_list:
-            if sanctioned_entity in customer_name or sanctioned_entity in merchant_name:
-                risk_score = 1.0
-                flags.append("SANCTIONS_MATCH")
-                break
+        elif fuzzy_index is not None:
+            # Near matches of the names, within the per-transaction latency budget
+            fuzzy_config = self.config.get("fuzzy_sanctions", {})
+            deadline = time.perf_counter() + fuzzy_config.get("budget_ms", 5.0) / 1000
+            for field, value in (("customer_name", customer_name), ("merchant_name", merchant_name)):
+                matches.extend(
+                    {"field": field, **match}
+                    for match in fuzzy_index.search(value, fuzzy_config.get("threshold", 0.85),
+                                                    fuzzy_config.get("max_candidates", 50), deadline)
+                )
+            if matches:
+                risk_score = 0.9 * max(match["similarity"] for match in matches)
+                flags.append("SANCTIONS_FUZZY_MATCH")
                 
         # Location-based sanctions check
-        if any(sanctions in location for sanctions in sanctions_list):
+        if sanctions_automaton.matches(location):
             risk_score = max(risk_score, 0.8)
             flags.append("SANCTIONS_LOCATION")
             
         return {
             "sanctions_risk_score": risk_score,
-            "sanctions_flags": flags
+            "sanctions_flags": flags,
+            "sanctions_matches": matches
         }
     
     def calculate_overall_aml_risk(self, transaction_data: Dict, 
                                  transaction_history: List[Dict] = None,
-                                 account_history: List[Dict] = None) -> Dict:
+                                 account_history: List[Dict] = None,
+                                 record: bool = False) -> Dict:
         """
         Calculate comprehensive AML risk score and generate report
+        With record, the transaction is added to the history store afterwards;
+        only the scoring path should record, so a transaction checked on several
+        endpoints is counted once
         """
         
+        # Parse caller-supplied history once for both window rules
+        if transaction_history:
+            parsed = history_arrays(transaction_history)
+            account_history = parsed if account_history is transaction_history else account_history
+            transaction_history = parsed
+        if account_history and not isinstance(account_history, tuple):
+            account_history = history_arrays(account_history)
+        
         # Run all AML checks
         structuring_result = self.check_structuring(transaction_data, transaction_history)
         rapid_movement_result = self.check_rapid_movement(transaction_data, account_history)
         pattern_result = self.check_suspicious_patterns(transaction_data)
         sanctions_result = self.check_sanctions_screening(transaction_data)
         
+        # Later checks see this transaction in the store
+        if record:
+            self.record_transaction(transaction_data)
+        
         # Calculate weighted overall risk score (more weight on patterns and sanctions)
         weights = {
             "structuring": 0.2,
@@ -257,21 +383,169 @@ class AMLComplianceChecker:
                 "suspicious_patterns": round(pattern_result["suspicious_pattern_risk_score"], 4),
                 "sanctions": round(sanctions_result["sanctions_risk_score"], 4)
             },
-            "requires_manual_review": overall_risk >= 0.7 or "SANCTIONS_MATCH" in all_flags
+            "aml_sanctions_matches": sanctions_result["sanctions_matches"],
+            "requires_manual_review": (overall_risk >= 0.7 or "SANCTIONS_MATCH" in all_flags
+                                       or "SANCTIONS_FUZZY_MATCH" in all_flags)
         }
     
-    def _is_within_time_window(self, timestamp: str, window_hours: int) -> bool:
-        """Check if timestamp is within specified time window"""
-        try:
-            if isinstance(timestamp, str):
-                trans_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            else:
-                trans_time = timestamp
-                
-            now = datetime.now()
-            return (now - trans_time).total_seconds() / 3600 <= window_hours
-        except:
+    def calculate_overall_aml_risk_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        calculate_overall_aml_risk for every row of a DataFrame as column operations
+        
+        Evaluates the per-transaction rules (CTR band, large and round amounts,
+        odd hours, high-risk categories and locations, repeated-digit amounts,
+        sanctions hits) and returns, indexed like df: aml_overall_risk_score,
+        aml_risk_level, the four component scores, aml_flags_mask (bit i set for
+        AML_FLAGS[i]), aml_flags_count and requires_manual_review. Each row
+        equals calculate_overall_aml_risk(row, [], []): the window rules need
+        customer history, which a frame of independent rows does not carry,
+        and the history store is neither read nor updated. Fuzzy sanctions
+        matching runs without the per-transaction latency budget.
+        """
+        n_rows = len(df)
+        
+        def column(name, default):
+            return df[name] if name in df.columns else pd.Series(default, index=df.index)
+        
+        amount = column("transaction_amount", 0).to_numpy(dtype=np.float64)
+        hour = column("transaction_hour", 12).to_numpy(dtype=np.float64)
+        flags = np.zeros(n_rows, dtype=np.uint16)
+        
+        def flag(name, mask):
+            flags[mask] |= np.uint16(1 << self.AML_FLAGS.index(name))
+            return mask
+        
+        # Structuring: amounts just below the CTR threshold
+        ctr_threshold = self.risk_thresholds["structuring_threshold"]
+        structuring = np.zeros(n_rows)
+        structuring += 0.4 * flag("AMOUNT_NEAR_CTR_THRESHOLD", (0.8 * ctr_threshold <= amount) & (amount < ctr_threshold))
+        structuring = np.minimum(structuring, 1.0)
+        
+        # Rapid movement: large and round amounts
+        rapid_movement = np.zeros(n_rows)
+        rapid_movement += 0.3 * flag("LARGE_SINGLE_TRANSACTION",
+                                     amount > self.risk_thresholds["rapid_movement_threshold"])
+        rapid_movement += 0.2 * flag("ROUND_AMOUNT_TRANSACTION", (np.mod(amount, 1000) == 0) & (amount >= 5000))
+        rapid_movement = np.minimum(rapid_movement, 1.0)
+        
+        # Suspicious patterns, string rules evaluated once per distinct value
+        patterns = np.zeros(n_rows)
+        patterns += 0.2 * flag("UNUSUAL_TIMING", (hour < 6) | (hour > 22))
+        patterns += 0.3 * flag("HIGH_RISK_MERCHANT_CATEGORY", _per_value(
+            column("merchant_category", "UNKNOWN"), lambda category: category in self.HIGH_RISK_CATEGORIES
+        ))
+        patterns += 0.4 * flag("HIGH_RISK_LOCATION", _per_value(
+            column("location", "UNKNOWN"),
+            lambda location: any(risk_loc in location.upper() for risk_loc in self.HIGH_RISK_LOCATIONS)
+        ))
+        patterns += 0.3 * flag("REPEATED_DIGIT_AMOUNT", _repeated_digit_amounts(amount))
+        patterns = np.minimum(patterns, 1.0)
+        
+        # Sanctions: exact name matches, else fuzzy ones, and the location
+        automaton = self.sanctions_automaton
+        customer_names, merchant_names = column("customer_name", ""), column("merchant_name", "")
+        name_match = flag("SANCTIONS_MATCH", _per_value(customer_names, automaton.matches) |
+                          _per_value(merchant_names, automaton.matches))
+        sanctions = np.where(name_match, 1.0, 0.0)
+        
+        if self.fuzzy_sanctions_index is not None and not name_match.all():
+            best_similarity = np.maximum(
+                self._fuzzy_similarity(customer_names, ~name_match),
+                self._fuzzy_similarity(merchant_names, ~name_match)
+            )
+            fuzzy_match = flag("SANCTIONS_FUZZY_MATCH", best_similarity > 0)
+            sanctions[fuzzy_match] = 0.9 * best_similarity[fuzzy_match]
+        
+        sanctions_location = flag("SANCTIONS_LOCATION", _per_value(column("location", ""), automaton.matches))
+        sanctions[sanctions_location] = np.maximum(sanctions[sanctions_location], 0.8)
+        
+        # Same weights and summation order as the scalar path, so scores match to the bit
+        overall_risk = (
+            structuring * 0.2 +
+            rapid_movement * 0.2 +
+            patterns * 0.35 +
+            sanctions * 0.25
+        )
+        risk_level = np.select(
+            [overall_risk >= 0.6, overall_risk >= 0.35, overall_risk >= 0.2],
+            ["HIGH", "MEDIUM", "LOW"], default="MINIMAL"
+        )
+        review_flags = np.uint16((1 << self.AML_FLAGS.index("SANCTIONS_MATCH")) |
+                                 (1 << self.AML_FLAGS.index("SANCTIONS_FUZZY_MATCH")))
+        
+        return pd.DataFrame({
+            "aml_overall_risk_score": _python_round(overall_risk, 4),
+            "aml_risk_level": risk_level,
+            "structuring": _python_round(structuring, 4),
+            "rapid_movement": _python_round(rapid_movement, 4),
+            "suspicious_patterns": _python_round(patterns, 4),
+            "sanctions": _python_round(sanctions, 4),
+            "aml_flags_mask": flags,
+            "aml_flags_count": sum((flags >> bit) & 1 for bit in range(len(self.AML_FLAGS))).astype(np.int64),
+            "requires_manual_review": (overall_risk >= 0.7) | ((flags & review_flags) != 0),
+        }, index=df.index)
+    
+    @classmethod
+    def decode_aml_flags(cls, mask: int) -> List[str]:
+        """Flag names of an aml_flags_mask, in the order calculate_overall_aml_risk lists them"""
+        return [name for bit, name in enumerate(cls.AML_FLAGS) if int(mask) >> bit & 1]
+    
+    def _fuzzy_similarity(self, names: pd.Series, rows: np.ndarray) -> np.ndarray:
+        """Best fuzzy sanctions similarity of each name (0.0 without a match), searched for the given rows only"""
+        fuzzy_config = self.config.get("fuzzy_sanctions", {})
+        codes, uniques = pd.factorize(names)
+        searched = np.unique(codes[rows & (codes >= 0)])
+        best = np.zeros(len(uniques) + 1)  # last slot for missing names (code -1)
+        for code, matches in zip(searched, self.fuzzy_sanctions_index.search_batch(
+                [str(uniques[code]) for code in searched],
+                fuzzy_config.get("threshold", 0.85), fuzzy_config.get("max_candidates", 50))):
+            if matches:
+                best[code] = max(match["similarity"] for match in matches)
+        return np.where(rows, best[codes], 0.0)
+    
+    def record_transaction(self, transaction_data: Dict) -> bool:
+        """
+        Add a transaction to its customer's history; False when there is no history
+        store or customer_id, or the transaction_id was recorded before (a retry)
+        """
+        customer_id = transaction_data.get("customer_id")
+        if self.history_store is None or customer_id is None:
             return False
+        return self.history_store.record(
+            customer_id, transaction_data.get("transaction_amount", 0),
+            self._transaction_time(transaction_data), transaction_data.get("transaction_id")
+        )
+    
+    def _recent_activity(self, transaction_data: Dict, history, window_hours: float) -> Optional[Tuple[int, float]]:
+        """
+        Count and total amount of the customer's transactions in the window ending at
+        the transaction's time: from the history passed in (a list of dicts, or
+        history_arrays of one), else from the history store; None without either
+        """
+        if history is not None and len(history):
+            timestamps, amounts = history if isinstance(history, tuple) else history_arrays(history)
+            end_time = self._transaction_time(transaction_data)
+            lo = np.searchsorted(timestamps, end_time - window_hours * 3600, side="left")
+            hi = np.searchsorted(timestamps, end_time, side="right")
+            return int(hi - lo), float(amounts[lo:hi].sum())
+        
+        customer_id = transaction_data.get("customer_id")
+        if history is not None or self.history_store is None or customer_id is None:
+            return None
+        return self.history_store.window(
+            customer_id, window_hours * 3600, self._transaction_time(transaction_data),
+            transaction_data.get("transaction_id")
+        )
+    
+    def _transaction_time(self, transaction_data: Dict) -> float:
+        """Epoch time of a transaction from its timestamp, or now when it has none"""
+        timestamp = transaction_data.get("timestamp")
+        if timestamp is not None:
+            try:
+                return to_epoch_seconds(timestamp)
+            except (TypeError, ValueError):
+                pass
+        return time.time()
     
     def _generate_recommendations(self, risk_score: float, flags: List[str]) -> List[str]:
         """Generate AML compliance recommendations based on risk assessment"""
@@ -289,6 +563,9 @@ class AMLComplianceChecker:
             recommendations.append("BLOCK_TRANSACTION_IMMEDIATELY")
             recommendations.append("REPORT_TO_COMPLIANCE_TEAM")
             
+        if "SANCTIONS_FUZZY_MATCH" in flags:
+            recommendations.append("VERIFY_POSSIBLE_SANCTIONS_MATCH")
+            
         if any("STRUCTURING" in flag for flag in flags):
             recommendations.append("MONITOR_CUSTOMER_PATTERN")
             recommendations.append("REVIEW_TRANSACTION_HISTORY")
@@ -299,6 +576,45 @@ class AMLComplianceChecker:
         return recommendations
 
 
+def _per_value(values: pd.Series, predicate) -> np.ndarray:
+    """predicate of every value, called once per distinct value; False for missing values"""
+    codes, uniques = pd.factorize(values)
+    results = np.array([bool(predicate(value)) for value in uniques] + [False])
+    return results[codes]
+
+
+def _repeated_digit_amounts(amount: np.ndarray) -> np.ndarray:
+    """
+    Rows whose whole amount is at least four repeats of one digit (5555, 77777.5),
+    the same test as len(set(str(int(amount)))) == 1 and len(str(int(amount))) >= 4
+    """
+    whole = np.trunc(amount)
+    result = np.zeros(len(amount), dtype=bool)
+    for digits in range(4, 16):
+        repunit = float((10 ** digits - 1) // 9)
+        in_range = (whole >= repunit) & (whole < 10.0 ** digits)
+        result |= in_range & (np.mod(whole, repunit) == 0)
+    
+    # Beyond the integers float64 holds exactly, fall back to the string test
+    huge = np.flatnonzero(np.isfinite(amount) & (np.abs(whole) >= 1e15))
+    for idx in huge:
+        amount_str = str(int(amount[idx]))
+        result[idx] = len(set(amount_str)) == 1 and len(amount_str) >= 4
+    return result
+
+
+def _python_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    round(value, ndigits) of every value: np.round agrees except where value
+    scaled by 10**ndigits is within float error of a half, so those use round()
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_half] = [round(float(values[idx]), ndigits) for idx in near_half]
+    return rounded
+
+
 def add_aml_features_to_transaction(transaction_data: Dict, 
                                    aml_checker: AMLComplianceChecker = None) -> Dict:
     """
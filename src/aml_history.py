@@ -0,0 +1,217 @@
+"""
+AML History Module
+Per-customer transaction history for the AML window rules, kept as
+time-ordered arrays with prefix sums so a window's count and total amount
+cost two binary searches
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Imported as part of the src package or, by scripts and tests, with src/ on sys.path
+try:
+    from .timestamps import parse_timestamp_string, to_epoch_seconds
+except ImportError:
+    from timestamps import parse_timestamp_string, to_epoch_seconds
+
+
+def history_arrays(history: Iterable[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (epoch timestamps, amounts) of caller-supplied history items, sorted by
+    time, so window rules take a cutoff with np.searchsorted instead of
+    parsing every item on every check. Items whose timestamp is missing or
+    unparseable are left out, as they fall in no window.
+    """
+    timestamps, amounts = [], []
+    for item in history:
+        timestamp = item.get("timestamp")
+        try:
+            timestamp = parse_timestamp_string(timestamp) if type(timestamp) is str else to_epoch_seconds(timestamp)
+        except (TypeError, ValueError):
+            continue
+        timestamps.append(timestamp)
+        amounts.append(item.get("transaction_amount", 0))
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], np.asarray(amounts, dtype=np.float64)[order]
+
+
+class CustomerHistory:
+    """
+    One customer's retained transactions in time order
+
+    prefix[i] is the total amount of the first i retained transactions, so
+    the total of positions lo..end is prefix[end] - prefix[lo]. Entries
+    before start have expired; they are dropped in bulk once they make up
+    half of the arrays, and the prefix sums are recomputed then.
+    transaction_ids is aligned with the arrays; seen_ids maps each retained
+    id to its (timestamp, amount).
+    """
+
+    __slots__ = ("timestamps", "amounts", "prefix", "transaction_ids", "seen_ids", "start")
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.amounts = array("d")
+        self.prefix = array("d", [0.0])
+        self.transaction_ids: List[Optional[str]] = []
+        self.seen_ids: Dict[str, Tuple[float, float]] = {}
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps) - self.start
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.timestamps[-1] if len(self) else float("-inf")
+
+    def append(self, timestamp: float, amount: float, transaction_id: Optional[str] = None) -> bool:
+        """Add a transaction; False when transaction_id is already retained (a retry)"""
+        if transaction_id is not None:
+            if transaction_id in self.seen_ids:
+                return False
+            self.seen_ids[transaction_id] = (timestamp, amount)
+
+        if not len(self) or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.amounts.append(amount)
+            self.transaction_ids.append(transaction_id)
+            self.prefix.append(self.prefix[-1] + amount)
+            return True
+
+        # Out-of-order arrival: insert in place and redo the prefix sums after it
+        position = bisect_right(self.timestamps, timestamp, self.start)
+        self.timestamps.insert(position, timestamp)
+        self.amounts.insert(position, amount)
+        self.transaction_ids.insert(position, transaction_id)
+        self.prefix.append(0.0)
+        for idx in range(position, len(self.amounts)):
+            self.prefix[idx + 1] = self.prefix[idx] + self.amounts[idx]
+        return True
+
+    def window(self, start_time: float, end_time: float,
+               exclude_id: Optional[str] = None) -> Tuple[int, float]:
+        """
+        Count and total amount of transactions with start_time <= timestamp <= end_time,
+        leaving out transaction exclude_id (the one being assessed, if recorded before)
+        """
+        lo = bisect_left(self.timestamps, start_time, self.start)
+        hi = bisect_right(self.timestamps, end_time, lo)
+        count, total = hi - lo, self.prefix[hi] - self.prefix[lo]
+
+        excluded = self.seen_ids.get(exclude_id) if exclude_id is not None else None
+        if excluded is not None and start_time <= excluded[0] <= end_time:
+            count, total = count - 1, total - excluded[1]
+        return count, total
+
+    def evict(self, cutoff_time: float, max_transactions: Optional[int] = None) -> None:
+        """Expire transactions before cutoff_time, and the oldest beyond max_transactions"""
+        start = bisect_left(self.timestamps, cutoff_time, self.start)
+        if max_transactions is not None:
+            start = max(start, len(self.timestamps) - max_transactions)
+        if start == self.start:
+            return
+
+        if self.seen_ids:
+            for transaction_id in self.transaction_ids[self.start:start]:
+                self.seen_ids.pop(transaction_id, None)
+        self.start = start
+
+        if self.start * 2 >= len(self.timestamps):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop expired entries from the arrays and rebase the prefix sums"""
+        self.timestamps = self.timestamps[self.start:]
+        self.amounts = self.amounts[self.start:]
+        self.transaction_ids = self.transaction_ids[self.start:]
+        self.prefix = array("d", [0.0])
+        for amount in self.amounts:
+            self.prefix.append(self.prefix[-1] + amount)
+        self.start = 0
+
+
+class AMLHistoryStore:
+    """
+    Recent transactions of every customer, for the structuring and rapid
+    movement window rules when callers pass no history of their own
+
+    Memory is bounded by retention: transactions older than
+    retention_seconds (the longest AML window) are expired as customers
+    transact, customers idle for longer are dropped by a periodic sweep,
+    and each customer keeps at most max_transactions_per_customer. A
+    transaction_id seen again within retention (a client retry) is not
+    counted twice. Thread-safe.
+    """
+
+    SWEEP_EVERY = 10000
+
+    def __init__(self, retention_seconds: float = 24 * 3600,
+                 max_transactions_per_customer: Optional[int] = 10000):
+        self.retention_seconds = retention_seconds
+        self.max_transactions_per_customer = max_transactions_per_customer
+        self.customers: "OrderedDict[str, CustomerHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._appends_since_sweep = 0
+
+    def __len__(self) -> int:
+        return len(self.customers)
+
+    def record(self, customer_id: str, amount: float, timestamp: Optional[float] = None,
+               transaction_id: Optional[str] = None) -> bool:
+        """Add a transaction to the customer's history; False for a retried transaction_id"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            history = self.customers.get(customer_id)
+            if history is None:
+                history = self.customers[customer_id] = CustomerHistory()
+            else:
+                self.customers.move_to_end(customer_id)
+
+            added = history.append(timestamp, float(amount), transaction_id)
+            history.evict(history.last_timestamp - self.retention_seconds, self.max_transactions_per_customer)
+
+            self._appends_since_sweep += 1
+            if self._appends_since_sweep >= self.SWEEP_EVERY:
+                self._sweep(timestamp)
+            return added
+
+    def window(self, customer_id: str, window_seconds: float, end_time: Optional[float] = None,
+               exclude_id: Optional[str] = None) -> Tuple[int, float]:
+        """
+        Count and total amount of the customer's transactions in
+        [end_time - window_seconds, end_time], without transaction exclude_id
+        """
+        end_time = time.time() if end_time is None else end_time
+        with self._lock:
+            history = self.customers.get(customer_id)
+            if history is None:
+                return 0, 0.0
+            return history.window(end_time - window_seconds, end_time, exclude_id)
+
+    def _sweep(self, current_time: float) -> None:
+        """Drop customers whose latest transaction is past retention (lock held)"""
+        self._appends_since_sweep = 0
+        cutoff = current_time - self.retention_seconds
+        # Customers are in order of last activity, so idle ones are at the front
+        while self.customers:
+            customer_id, history = next(iter(self.customers.items()))
+            if history.last_timestamp >= cutoff:
+                break
+            del self.customers[customer_id]
+
+    def get_metrics(self) -> Dict:
+        """Customers and transactions retained"""
+        with self._lock:
+            return {
+                "customers": len(self.customers),
+                "transactions": sum(len(history) for history in self.customers.values()),
+                "retention_seconds": self.retention_seconds,
+            }
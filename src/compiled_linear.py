@@ -0,0 +1,66 @@
+"""
+Compiled Linear Module
+Logistic regression with its StandardScaler folded into the coefficients,
+scored as one dot product and a sigmoid without scikit-learn validation
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class CompiledLinearModel:
+    """
+    Binary logistic regression over raw (unscaled) features
+
+    StandardScaler followed by LogisticRegression computes
+    ((x - mean) / scale) . w + b, which is x . (w / scale) + (b - mean . (w / scale)).
+    Folding the scaler in once at load time leaves a single coefficient vector
+    and intercept, so a row costs one dot product plus a sigmoid. Probabilities
+    match the scaler + model pipeline up to float rounding.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: float, classes: np.ndarray):
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.classes_ = classes
+        self.n_features_in_ = len(self.coef_)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler: Optional[object] = None) -> "CompiledLinearModel":
+        """Fold a fitted binary LogisticRegression and optional StandardScaler"""
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] != 1:
+            raise ValueError(f"Only binary linear models can be compiled, got {coef.shape[0]} coefficient rows")
+        coef = coef[0]
+        intercept = float(np.ravel(model.intercept_)[0])
+
+        if scaler is not None:
+            scale = getattr(scaler, "scale_", None)
+            mean = getattr(scaler, "mean_", None) if getattr(scaler, "with_mean", True) else None
+            if scale is not None:
+                coef = coef / scale
+            if mean is not None:
+                intercept -= float(mean @ coef)
+
+        return cls(coef, intercept, np.asarray(model.classes_))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return np.atleast_2d(X) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(X)
+        probabilities = np.empty((len(scores), 2))
+        # Scores below -700 clip to a probability of ~1e-304 instead of overflowing exp
+        np.divide(1.0, 1.0 + np.exp(-np.maximum(scores, -700.0)), out=probabilities[:, 1])
+        np.subtract(1.0, probabilities[:, 1], out=probabilities[:, 0])
+        return probabilities
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    def score_row(self, row) -> float:
+        """Fraud probability of one feature row (any 1-D sequence)"""
+        z = max(float(np.dot(self.coef_, row)) + self.intercept_, -700.0)
+        return 1.0 / (1.0 + math.exp(-z))
@@ -0,0 +1,278 @@
+"""
+Compiled Trees Module
+Flattens trained RandomForest and IsolationForest models into plain NumPy
+node arrays and scores them with a vectorized traversal, so the request path
+needs neither scikit-learn nor its per-call validation overhead
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Tuple
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LEAF = -1
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful BST search over n samples, c(n) in the iForest paper"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    n = n_samples[large]
+    lengths[large] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return lengths
+
+
+def _node_depths(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """Depth of every node of one tree, root at 0, one vectorized step per level"""
+    depths = np.zeros(len(children_left), dtype=np.int64)
+    level = np.array([0])
+    depth = 0
+    while len(level):
+        depths[level] = depth
+        level = level[children_left[level] != LEAF]
+        level = np.concatenate([children_left[level], children_right[level]])
+        depth += 1
+    return depths
+
+
+class CompiledForest:
+    """
+    Tree ensemble as flat node arrays with a vectorized batch traversal
+
+    All trees share one set of arrays, indexed by global node id:
+    - feature, threshold: split of each node (a row goes left when
+      x[feature] <= threshold); feature is -1 at leaves
+    - children: (nodes, 2) next node for the left and right branch; a leaf
+      points at itself, so traversal runs a fixed number of steps
+    - value: (outputs, nodes) leaf outputs, zero for split nodes
+    - roots: root node id of each tree
+
+    Features are compared as float32, the same rounding scikit-learn applies
+    before traversing its trees, so rows land in the same leaves. The arrays
+    are plain ndarrays: saved uncompressed with joblib they load memory-mapped
+    and stay shared between worker processes.
+    """
+
+    # Traversal steps between sweeps that drop lanes already sitting on a leaf
+    COMPACT_EVERY = 4
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        # Largest float32 not above each threshold: x <= threshold32 exactly when x <= threshold
+        # for float32 x, so traversal compares in float32 without changing any decision
+        threshold32 = threshold.astype(np.float32)
+        above = threshold32.astype(np.float64) > threshold
+        threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        self.threshold32 = threshold32
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node id reached by each row in each tree, shape (rows, trees)"""
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+
+        # One lane per (tree, row); row_offset turns a feature index into a flat index into X
+        n_rows = len(X)
+        leaves = np.repeat(self.roots, n_rows)
+        row_offset = np.tile(np.arange(n_rows) * X.shape[1], self.n_trees)
+        flat_X = X.ravel()
+        flat_children = self.children.ravel()
+
+        active = np.arange(len(leaves))
+        current = leaves
+        for step in range(self.max_depth):
+            # Leaves point at themselves, so finished lanes are only swept out every few steps
+            if step % self.COMPACT_EVERY == self.COMPACT_EVERY - 1:
+                descending = self.feature[current] != LEAF
+                remaining = np.count_nonzero(descending)
+                if not remaining:
+                    break
+                if remaining * 4 <= len(current) * 3:
+                    leaves[active] = current
+                    active, current, row_offset = active[descending], current[descending], row_offset[descending]
+
+            go_right = flat_X[row_offset + self.feature[current]] > self.threshold32[current]
+            current = flat_children[2 * current + go_right]
+
+        leaves[active] = current
+        return leaves.reshape(self.n_trees, n_rows).T
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Sum of the leaf values over the trees, shape (rows, outputs)"""
+        leaves = self.apply(X)
+        return np.stack([output[leaves].sum(axis=1) for output in self.value], axis=1)
+
+    @staticmethod
+    def _flatten(estimators, feature_maps, leaf_values) -> Tuple[np.ndarray, ...]:
+        """Concatenate the trees' node arrays, renumbering nodes globally"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree_model, feature_map, value in zip(estimators, feature_maps, leaf_values):
+            tree = tree_model.tree_
+            is_leaf = tree.children_left == LEAF
+            node_ids = np.arange(tree.node_count)
+
+            # Trees fitted on a feature subset index into it; map back to input columns
+            feature = np.where(is_leaf, LEAF, tree.feature)
+            if feature_map is not None:
+                feature = np.where(is_leaf, LEAF, np.asarray(feature_map)[np.where(is_leaf, 0, tree.feature)])
+
+            features.append(feature.astype(np.intp))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.stack([
+                np.where(is_leaf, node_ids, tree.children_left) + offset,
+                np.where(is_leaf, node_ids, tree.children_right) + offset,
+            ], axis=1).astype(np.intp))
+            values.append(np.where(is_leaf[:, None], value, 0.0))
+            roots.append(offset)
+            offset += tree.node_count
+
+        return (
+            np.concatenate(features),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(children),
+            np.ascontiguousarray(np.concatenate(values).T, dtype=np.float64),
+            np.array(roots, dtype=np.intp),
+        )
+
+
+class CompiledForestClassifier(CompiledForest):
+    """RandomForestClassifier replacement: predict_proba averages the trees' leaf class fractions"""
+
+    def __init__(self, classes: np.ndarray, **arrays):
+        super().__init__(**arrays)
+        self.classes_ = classes
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForestClassifier":
+        leaf_values = []
+        for tree_model in model.estimators_:
+            value = tree_model.tree_.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            leaf_values.append(value / np.where(totals == 0, 1.0, totals))
+
+        feature, threshold, children, value, roots = cls._flatten(
+            model.estimators_, [None] * len(model.estimators_), leaf_values
+        )
+        return cls(
+            classes=np.asarray(model.classes_), feature=feature, threshold=threshold, children=children,
+            value=value, roots=roots, max_depth=max(est.tree_.max_depth for est in model.estimators_),
+            n_features=model.n_features_in_,
+        )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_values(X) / self.n_trees
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class CompiledIsolationForest(CompiledForest):
+    """
+    IsolationForest replacement: each leaf holds its depth plus c(leaf size),
+    so the summed leaf values are the path lengths behind score_samples
+    """
+
+    def __init__(self, offset: float, normalizer: float, **arrays):
+        super().__init__(**arrays)
+        self.offset_ = offset
+        self.normalizer = normalizer
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledIsolationForest":
+        leaf_values, feature_maps = [], []
+        for tree_model, features in zip(model.estimators_, model.estimators_features_):
+            tree = tree_model.tree_
+            depths = _node_depths(tree.children_left, tree.children_right)
+            leaf_values.append((depths + average_path_length(tree.n_node_samples))[:, None])
+            # scikit-learn only indexes columns when the trees were fitted on a subset
+            feature_maps.append(features if len(features) != model.n_features_in_ else None)
+
+        feature, threshold, children, value, roots = cls._flatten(model.estimators_, feature_maps, leaf_values)
+        max_samples = getattr(model, "_max_samples", model.max_samples_)
+        return cls(
+            offset=float(model.offset_),
+            normalizer=float(len(model.estimators_) * average_path_length([max_samples])[0]),
+            feature=feature, threshold=threshold, children=children, value=value, roots=roots,
+            max_depth=max(est.tree_.max_depth for est in model.estimators_), n_features=model.n_features_in_,
+        )
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        depths = self.leaf_values(X)[:, 0]
+        if self.normalizer == 0:
+            return -np.ones_like(depths)
+        return -(2.0 ** (-depths / self.normalizer))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+def compile_forest(model) -> CompiledForest:
+    """Compile a fitted RandomForestClassifier or IsolationForest"""
+    name = type(model).__name__
+    if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        return CompiledForestClassifier.from_sklearn(model)
+    if name == "IsolationForest":
+        return CompiledIsolationForest.from_sklearn(model)
+    raise ValueError(f"Cannot compile {name}: only RandomForestClassifier and IsolationForest are supported")
+
+
+def export_compiled_models(models_dir: str = "models") -> Dict[str, str]:
+    """
+    Compile every supported model listed in model_metadata.json
+
+    Each compiled model is saved uncompressed next to the original as
+    <model>_compiled.pkl and recorded as compiled_file_path in the metadata,
+    which ModelManager loads in preference to the scikit-learn file.
+    Returns the compiled file name of each exported model.
+    """
+    models_dir = Path(models_dir)
+    metadata_path = models_dir / "model_metadata.json"
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+
+    exported = {}
+    for model_name, model_info in metadata.get("models", {}).items():
+        model_path = models_dir / model_info["file_path"]
+        if not model_path.exists():
+            continue
+        try:
+            compiled = compile_forest(joblib.load(model_path))
+        except ValueError:
+            continue
+
+        compiled_file = f"{model_name}_compiled.pkl"
+        joblib.dump(compiled, models_dir / compiled_file, compress=0)
+        model_info["compiled_file_path"] = compiled_file
+        exported[model_name] = compiled_file
+        logger.info(f"Compiled {model_name}: {compiled.n_trees} trees, {compiled.n_nodes:,} nodes")
+
+    if exported:
+        with open(metadata_path, "w") as f:
+            json.dump(metadata, f, indent=2, default=str)
+    return exported
@@ -3,12 +3,28 @@ Feature Engineering for Fraud Detection System
 Enhanced implementation with AML compliance and velocity monitoring features
 """
 
+import time
+
 import numpy as np
 import pandas as pd
 from .aml_compliance import AMLComplianceChecker, add_aml_features_to_transaction
 from .velocity_monitoring import VelocityMonitor, add_velocity_features_to_transaction
 
 
+def _epoch_seconds_column(values, n_rows: int) -> np.ndarray:
+    """Epoch seconds of a timestamp column (epoch numbers or date strings); missing values are now"""
+    now = time.time()
+    if values is None:
+        return np.full(n_rows, now)
+    if pd.api.types.is_numeric_dtype(values):
+        seconds = values.to_numpy(dtype=float)
+    else:
+        # Naive times are taken as UTC, as the velocity monitor reads single timestamps
+        parsed = pd.to_datetime(values, utc=True, format="ISO8601")
+        seconds = (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+    return np.where(np.isnan(seconds), now, seconds)
+
+
 class FeatureEngineer:
     """Enhanced feature engineering for fraud detection with AML compliance and velocity monitoring"""
 
@@ -28,54 +44,76 @@ class FeatureEngineer:
                 int
             )
 
-        # Add AML compliance and velocity monitoring features for each transaction
-        enhanced_features = []
-        for _, row in df.iterrows():
-            transaction_data = row.to_dict()
-            
-            # Get AML features
-            aml_result = self.aml_checker.calculate_overall_aml_risk(transaction_data)
-            
-            # Get velocity features
-            customer_id = transaction_data.get("customer_id", "UNKNOWN")
-            velocity_result = self.velocity_monitor.assess_velocity_risk(customer_id, transaction_data)
-            
-            # Combine features
-            features = {
-                # AML features
-                'aml_risk_score': aml_result['aml_overall_risk_score'],
-                'aml_risk_level': aml_result['aml_risk_level'],
-                'aml_flags_count': len(aml_result['aml_flags']),
-                'requires_manual_review': int(aml_result['requires_manual_review']),
-                'structuring_risk': aml_result['aml_component_scores']['structuring'],
-                'rapid_movement_risk': aml_result['aml_component_scores']['rapid_movement'],
-                'suspicious_patterns_risk': aml_result['aml_component_scores']['suspicious_patterns'],
-                'sanctions_risk': aml_result['aml_component_scores']['sanctions'],
-                
-                # Velocity features
-                'velocity_risk_score': velocity_result['velocity_risk_score'],
-                'velocity_risk_level': velocity_result['velocity_risk_level'],
-                'velocity_flags_count': len(velocity_result['velocity_flags']),
-                'requires_velocity_review': int(velocity_result['requires_velocity_review']),
-                'frequency_risk': velocity_result['velocity_component_scores']['frequency_risk'],
-                'volume_risk': velocity_result['velocity_component_scores']['volume_risk'],
-                'pattern_risk': velocity_result['velocity_component_scores']['pattern_risk'],
-                
-                # Velocity metrics
-                'transactions_last_minute': velocity_result['velocity_metrics'].get('minute_window_count', 0),
-                'transactions_last_hour': velocity_result['velocity_metrics'].get('hour_window_count', 0),
-                'transactions_last_day': velocity_result['velocity_metrics'].get('day_window_count', 0),
-                'amount_last_minute': velocity_result['velocity_metrics'].get('minute_window_total_amount', 0),
-                'amount_last_hour': velocity_result['velocity_metrics'].get('hour_window_total_amount', 0),
-                'amount_last_day': velocity_result['velocity_metrics'].get('day_window_total_amount', 0),
-                'avg_amount_last_hour': velocity_result['velocity_metrics'].get('hour_window_avg_amount', 0),
-                'transaction_rate_last_hour': velocity_result['velocity_metrics'].get('hour_window_rate', 0)
-            }
+        # Velocity features for the whole frame in one vectorized pass, at the frame's own
+        # timestamps when it has them and otherwise at the current time. Rows are scored
+        # against the frame's history, then recorded so the monitor keeps feeding later calls
+        customer_ids = (
+            df["customer_id"].astype(str).to_numpy()
+            if "customer_id" in df.columns
+            else np.full(len(df), "UNKNOWN")
+        )
+        amounts = (
+            df["transaction_amount"].to_numpy(dtype=float)
+            if "transaction_amount" in df.columns
+            else np.zeros(len(df))
+        )
+        timestamp_field = self.velocity_monitor._timestamp_field
+        timestamps = _epoch_seconds_column(
+            df[timestamp_field] if timestamp_field in df.columns else None, len(df)
+        )
+
+        # The batch path needs each customer's rows in time order
+        order = np.argsort(timestamps, kind="stable")
+        velocity = {}
+        for key, values in self.velocity_monitor.assess_velocity_risk_batch(
+            customer_ids[order], timestamps[order], amounts[order]
+        ).items():
+            velocity[key] = np.empty_like(values)
+            velocity[key][order] = values
+        for idx in order:
+            self.velocity_monitor.record_transaction(
+                customer_ids[idx],
+                {"transaction_amount": amounts[idx], timestamp_field: timestamps[idx]},
+                timestamps[idx],
+            )
+
+        def velocity_metric(key):
+            return velocity.get(key, np.zeros(len(df)))
+
+        # AML compliance features for the whole frame as column operations
+        aml = self.aml_checker.calculate_overall_aml_risk_frame(df)
+        enhanced_df = pd.DataFrame({
+            # AML features
+            'aml_risk_score': aml['aml_overall_risk_score'],
+            'aml_risk_level': aml['aml_risk_level'],
+            'aml_flags_count': aml['aml_flags_count'],
+            'requires_manual_review': aml['requires_manual_review'].astype(int),
+            'structuring_risk': aml['structuring'],
+            'rapid_movement_risk': aml['rapid_movement'],
+            'suspicious_patterns_risk': aml['suspicious_patterns'],
+            'sanctions_risk': aml['sanctions'],
+        }).reset_index(drop=True)
+        velocity_df = pd.DataFrame({
+            # Velocity features
+            'velocity_risk_score': velocity['velocity_risk_score'],
+            'velocity_risk_level': velocity['velocity_risk_level'],
+            'velocity_flags_count': velocity['velocity_flags_count'],
+            'requires_velocity_review': velocity['requires_velocity_review'].astype(int),
+            'frequency_risk': velocity['frequency_risk'],
+            'volume_risk': velocity['volume_risk'],
+            'pattern_risk': velocity['pattern_risk'],
             
-            enhanced_features.append(features)
-        
-        enhanced_df = pd.DataFrame(enhanced_features)
-        df = pd.concat([df, enhanced_df], axis=1)
+            # Velocity metrics
+            'transactions_last_minute': velocity_metric('minute_window_count'),
+            'transactions_last_hour': velocity_metric('hour_window_count'),
+            'transactions_last_day': velocity_metric('day_window_count'),
+            'amount_last_minute': velocity_metric('minute_window_total_amount'),
+            'amount_last_hour': velocity_metric('hour_window_total_amount'),
+            'amount_last_day': velocity_metric('day_window_total_amount'),
+            'avg_amount_last_hour': velocity_metric('hour_window_avg_amount'),
+            'transaction_rate_last_hour': velocity_metric('hour_window_rate')
+        })
+        df = pd.concat([df, enhanced_df, velocity_df], axis=1)
 
         return df
 
@@ -18,7 +18,7 @@ import xgboost as xgb
 from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import Pipeline as ImbPipeline
 from plotly.subplots import make_subplots
-from sklearn.ensemble import IsolationForest, RandomForestClassifier, VotingClassifier
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
     accuracy_score,
@@ -35,6 +35,14 @@ from sklearn.metrics import (
 from sklearn.model_selection import GridSearchCV, StratifiedKFold, cross_val_score, train_test_split
 from sklearn.preprocessing import StandardScaler
 
+# Imported as part of the src package or, by scripts and tests, with src/ on sys.path
+try:
+    from .compiled_trees import export_compiled_models
+    from .soft_voting import SoftVotingEnsemble
+except ImportError:
+    from compiled_trees import export_compiled_models
+    from soft_voting import SoftVotingEnsemble
+
 warnings.filterwarnings("ignore")
 
 # Core ML imports
@@ -130,9 +138,7 @@ class AdvancedFraudDetectionTrainer:
         # Load data
         df = pd.read_csv(data_path)
         logger.info(
-            f"Loaded {
-                len(df)} transactions with {
-                df.columns.size} features"
+            f"Loaded {len(df)} transactions with {df.columns.size} features"
         )
 
         # Separate features and target
@@ -150,9 +156,7 @@ class AdvancedFraudDetectionTrainer:
         X = X.fillna(X.median())
 
         logger.info(
-            f"Prepared dataset: {
-                X.shape} features, {
-                y.value_counts().to_dict()} class distribution"
+            f"Prepared dataset: {X.shape} features, {y.value_counts().to_dict()} class distribution"
         )
 
         return X.values, y.values
@@ -237,12 +241,10 @@ class AdvancedFraudDetectionTrainer:
                     model = grid_search.best_estimator_
 
                     logger.info(
-                        f"Best params for {model_name}: {
-                            grid_search.best_params_}"
+                        f"Best params for {model_name}: {grid_search.best_params_}"
                     )
                     logger.info(
-                        f"Best CV score: {
-                            grid_search.best_score_:.4f}"
+                        f"Best CV score: {grid_search.best_score_:.4f}"
                     )
 
                 trained_models[model_name] = model
@@ -326,14 +328,13 @@ class AdvancedFraudDetectionTrainer:
             logger.warning("Not enough models for ensemble, using best single model")
             return trained_models.get("xgboost", list(trained_models.values())[0])
 
-        # Create voting classifier
-        ensemble = VotingClassifier(
-            estimators=voting_models, voting="soft", n_jobs=-1  # Use predicted probabilities
-        )
-
-        # Train ensemble
-        train_X = self.scalers["standard"].transform(X_train)
-        ensemble.fit(train_X, y_train)
+        # Soft vote over the trained models themselves, each with its own preprocessing,
+        # rather than copies refitted on standard-scaled features: scoring the ensemble
+        # alongside its members then reuses the members' probabilities instead of running
+        # every model twice. The members are no longer refitted, but the tree models split
+        # the same way on per-column scaled features and logistic regression was already
+        # fitted on them, so the ensemble's probabilities match the refitted VotingClassifier
+        ensemble = SoftVotingEnsemble([name for name, _ in voting_models])
 
         logger.info(f"✅ Ensemble created with {len(voting_models)} models")
         return ensemble
@@ -355,8 +356,14 @@ class AdvancedFraudDetectionTrainer:
                     X_test_eval = X_test
 
                 # Make predictions
-                if hasattr(model, "predict_proba"):
-                    y_pred_proba = model.predict_proba(X_test_eval)[:, 1]
+                if isinstance(model, SoftVotingEnsemble) or hasattr(model, "predict_proba"):
+                    if isinstance(model, SoftVotingEnsemble):
+                        # Members are evaluated first, so their test probabilities are reused
+                        y_pred_proba = model.combine({
+                            member: evaluation_results[member]["probabilities"] for member in model.members
+                        })
+                    else:
+                        y_pred_proba = model.predict_proba(X_test_eval)[:, 1]
 
                     # Optimize threshold for best F1 score
                     thresholds = np.arange(0.1, 0.9, 0.1)
@@ -449,13 +456,14 @@ class AdvancedFraudDetectionTrainer:
         # Save individual models
         for model_name, results in evaluation_results.items():
             model_path = self.models_dir / f"{model_name}_model.pkl"
-            joblib.dump(results["model"], model_path)
+            # Uncompressed, so ModelManager can memory-map the NumPy arrays inside
+            joblib.dump(results["model"], model_path, compress=0)
             logger.info(f"Saved {model_name} to {model_path}")
 
         # Save scalers
         if self.scalers:
             scaler_path = self.models_dir / "scalers.pkl"
-            joblib.dump(self.scalers, scaler_path)
+            joblib.dump(self.scalers, scaler_path, compress=0)
             logger.info(f"Saved scalers to {scaler_path}")
 
         # Create model metadata
@@ -486,6 +494,10 @@ class AdvancedFraudDetectionTrainer:
 
         logger.info(f"Saved metadata to {metadata_path}")
 
+        # Flat node-array copies of the forests, which the API scores without scikit-learn
+        for model_name, compiled_file in export_compiled_models(self.models_dir).items():
+            metadata["models"][model_name]["compiled_file_path"] = compiled_file
+
         return metadata
 
     def generate_performance_report(self, evaluation_results: Dict) -> str:
@@ -496,8 +508,7 @@ class AdvancedFraudDetectionTrainer:
         report.append("# FRAUD DETECTION MODEL PERFORMANCE REPORT")
         report.append("=" * 60)
         report.append(
-            f"Generated: {
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
         report.append("")
 
@@ -528,8 +539,7 @@ class AdvancedFraudDetectionTrainer:
         report.append("-" * 30)
         report.append(f"Best Model: {best_model}")
         report.append(
-            f"Recall (Fraud Detection): {
-                best_metrics['recall']:.4f}"
+            f"Recall (Fraud Detection): {best_metrics['recall']:.4f}"
         )
         report.append(f"Precision: {best_metrics['precision']:.4f}")
         report.append(f"F1-Score: {best_metrics['f1_score']:.4f}")
@@ -553,14 +563,10 @@ class AdvancedFraudDetectionTrainer:
         report.append(f"Fraud Detection Rate: {fraud_caught:.1%}")
         report.append(f"False Positive Rate: {false_positive_rate:.1%}")
         report.append(
-            f"Estimated Annual Savings: ${
-                fraud_caught *
-                1000000:.0f}"
+            f"Estimated Annual Savings: ${fraud_caught * 1000000:.0f}"
         )
         report.append(
-            f"Estimated False Positive Cost: ${
-                false_positive_rate *
-                500000:.0f}"
+            f"Estimated False Positive Cost: ${false_positive_rate * 500000:.0f}"
         )
 
         # Save report
@@ -623,8 +629,7 @@ class AdvancedFraudDetectionTrainer:
 
         logger.info("✅ TRAINING PIPELINE COMPLETED SUCCESSFULLY!")
         logger.info(
-            f"🎯 Best Model: {max(evaluation_results.keys(),
-                                         key=lambda x: evaluation_results[x]['metrics']['f1_score'])}"
+            f"🎯 Best Model: {max(evaluation_results.keys(), key=lambda x: evaluation_results[x]['metrics']['f1_score'])}"
         )
 
         return {
@@ -0,0 +1,373 @@
+"""
+Sanctions Screening Module
+Aho-Corasick automaton over a sanctions/PEP name list, so screening a
+transaction scans each name field once instead of once per listed entity,
+and a trigram index for fuzzy matches (typos, transliterations)
+"""
+
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NO_MATCH = -1
+# Joins the pattern list in saved files and fingerprints (ASCII unit separator)
+PATTERN_SEPARATOR = "\x1f"
+
+
+def normalize_patterns(patterns: Iterable[str]) -> List[str]:
+    """Uppercased patterns in list order, without empty entries and duplicates"""
+    return [pattern for pattern in dict.fromkeys(str(pattern).upper() for pattern in patterns) if pattern]
+
+
+class SanctionsAutomaton:
+    """
+    Multi-pattern substring matcher (Aho-Corasick) over UTF-8 bytes
+
+    Patterns are uppercased, as screened fields are, and matched as
+    substrings: matches(text) is True exactly when some pattern is `in`
+    text.upper(). UTF-8 is self-synchronizing, so byte substrings and
+    character substrings agree. Scanning is linear in the length of the text
+    plus the number of matches, whatever the number of patterns.
+
+    The trie is stored in breadth-first order as flat arrays:
+    - labels, offsets: the edge bytes of node i are labels[offsets[i]:offsets[i + 1]],
+      sorted, with the child of edge j at targets[j]
+    - fail: longest proper suffix of the node's path that is also a trie path
+    - output: index of the pattern ending at the node, or -1
+    - output_link: nearest node on the fail chain whose output is set, or -1
+
+    Edge lookups are bytes.find calls bounded to the node's slice. The arrays
+    save to a single .npz file and load back without rebuilding the trie.
+    """
+
+    def __init__(self, patterns: List[str], labels: bytes, offsets: array, targets: array,
+                 fail: array, output: array, output_link: array):
+        self.patterns = patterns
+        self.labels = labels
+        self.offsets = offsets
+        self.targets = targets
+        self.fail = fail
+        self.output = output
+        self.output_link = output_link
+        self.fingerprint = hashlib.blake2b(PATTERN_SEPARATOR.join(patterns).encode(), digest_size=8).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.fail)
+
+    @classmethod
+    def build(cls, patterns: Iterable[str]) -> "SanctionsAutomaton":
+        """Build the automaton; empty and duplicate patterns (after uppercasing) are dropped"""
+        unique = normalize_patterns(patterns)
+
+        # Trie with one dict of byte -> child per node
+        children: List[Dict[int, int]] = [{}]
+        ends = [NO_MATCH]
+        for index, pattern in enumerate(unique):
+            node = 0
+            for byte in pattern.encode("utf-8"):
+                child = children[node].get(byte)
+                if child is None:
+                    child = len(children)
+                    children[node][byte] = child
+                    children.append({})
+                    ends.append(NO_MATCH)
+                node = child
+            ends[node] = index
+
+        # Renumber breadth-first, so every node's fail target is numbered before it
+        order = [0]
+        for node in order:
+            order.extend(children[node][byte] for byte in sorted(children[node]))
+        new_id = array("i", bytes(4 * len(order)))
+        for position, node in enumerate(order):
+            new_id[node] = position
+
+        labels = bytearray()
+        offsets = array("i", [0])
+        targets = array("i")
+        output = array("i")
+        for node in order:
+            for byte in sorted(children[node]):
+                labels.append(byte)
+                targets.append(new_id[children[node][byte]])
+            offsets.append(len(labels))
+            output.append(ends[node])
+
+        automaton = cls(unique, bytes(labels), offsets, targets, array("i", bytes(4 * len(order))),
+                        output, array("i", [NO_MATCH]) * len(order))
+        automaton._link_failures()
+        return automaton
+
+    def _link_failures(self) -> None:
+        """Fill fail and output_link level by level from the root"""
+        fail, output, output_link = self.fail, self.output, self.output_link
+        queue = deque()
+        for edge in range(self.offsets[0], self.offsets[1]):
+            queue.append(self.targets[edge])  # depth-1 nodes fail to the root
+
+        while queue:
+            node = queue.popleft()
+            for edge in range(self.offsets[node], self.offsets[node + 1]):
+                child = self.targets[edge]
+                fail[child] = self._step(fail[node], self.labels[edge])
+                suffix = fail[child]
+                output_link[child] = suffix if output[suffix] != NO_MATCH else output_link[suffix]
+                queue.append(child)
+
+    def _step(self, node: int, byte: int) -> int:
+        """State after reading byte in state node, following fail links on a miss"""
+        labels, offsets, targets, fail = self.labels, self.offsets, self.targets, self.fail
+        while True:
+            edge = labels.find(byte, offsets[node], offsets[node + 1])
+            if edge >= 0:
+                return targets[edge]
+            if node == 0:
+                return 0
+            node = fail[node]
+
+    def find_all(self, text: str) -> List[str]:
+        """Every pattern occurring in text (once each, in order of first occurrence end)"""
+        found: Dict[int, None] = {}
+        output, output_link = self.output, self.output_link
+        node = 0
+        for byte in text.upper().encode("utf-8"):
+            node = self._step(node, byte)
+            match = node if output[node] != NO_MATCH else output_link[node]
+            while match != NO_MATCH:
+                found[output[match]] = None
+                match = output_link[match]
+        return [self.patterns[index] for index in found]
+
+    def matches(self, text: str) -> bool:
+        """Whether any pattern occurs in text, stopping at the first match"""
+        output, output_link = self.output, self.output_link
+        node = 0
+        for byte in text.upper().encode("utf-8"):
+            node = self._step(node, byte)
+            if output[node] != NO_MATCH or output_link[node] != NO_MATCH:
+                return True
+        return False
+
+    def save(self, path: str) -> None:
+        """Write the automaton arrays to an uncompressed .npz file"""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                patterns=np.frombuffer(PATTERN_SEPARATOR.join(self.patterns).encode("utf-8"), dtype=np.uint8),
+                labels=np.frombuffer(self.labels, dtype=np.uint8),
+                **{name: np.frombuffer(getattr(self, name), dtype=np.int32)
+                   for name in ("offsets", "targets", "fail", "output", "output_link")},
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "SanctionsAutomaton":
+        """Read an automaton written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {
+                name: array("i", data[name].astype(np.int32).tobytes())
+                for name in ("offsets", "targets", "fail", "output", "output_link")
+            }
+            text = data["patterns"].tobytes().decode("utf-8")
+            labels = data["labels"].tobytes()
+        return cls(text.split(PATTERN_SEPARATOR) if text else [], labels, **arrays)
+
+
+def load_sanctions_automaton(patterns: Iterable[str], automaton_path: Optional[str] = None) -> SanctionsAutomaton:
+    """
+    Automaton for patterns, read from automaton_path when that file was saved
+    from the same list, otherwise built (and saved there when a path is given)
+    """
+    patterns = list(patterns)
+    if automaton_path:
+        try:
+            automaton = SanctionsAutomaton.load(automaton_path)
+            if automaton.patterns == normalize_patterns(patterns):
+                return automaton
+            logger.info(f"Sanctions automaton at {automaton_path} is for another list, rebuilding")
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"Sanctions automaton at {automaton_path} not loaded ({e}), rebuilding")
+
+    automaton = SanctionsAutomaton.build(patterns)
+    if automaton_path:
+        try:
+            automaton.save(automaton_path)
+        except OSError as e:
+            logger.warning(f"Could not save sanctions automaton to {automaton_path}: {e}")
+    return automaton
+
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9A-Z]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Uppercase ASCII form of a name for fuzzy matching: accents stripped
+    (MÜLLER -> MULLER), punctuation and runs of whitespace folded to one space
+    """
+    decomposed = unicodedata.normalize("NFKD", str(name).upper())
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALPHANUMERIC.sub(" ", ascii_name).strip()
+
+
+def _trigrams(key: str) -> set:
+    """Character trigrams of a normalized name, padded so short names and word edges count"""
+    padded = f"  {key} "
+    return {padded[idx:idx + 3] for idx in range(len(padded) - 2)}
+
+
+def edit_similarity(a: str, b: str, min_similarity: float = 0.0) -> float:
+    """
+    1 - Levenshtein distance / length of the longer string; 0.0 as soon as the
+    result is known to fall below min_similarity
+    """
+    if a == b:
+        return 1.0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return 0.0
+
+    # Every row of the DP table holds the running distance, so stop once its minimum is too large
+    max_distance = int((1.0 - min_similarity) * len(a) + 1e-9)
+    if len(a) - len(b) > max_distance:
+        return 0.0
+
+    previous = list(range(len(b) + 1))
+    for row, char_a in enumerate(a, 1):
+        current = [row]
+        for col, char_b in enumerate(b, 1):
+            current.append(min(previous[col] + 1, current[col - 1] + 1,
+                               previous[col - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return 0.0
+        previous = current
+    similarity = 1.0 - previous[-1] / len(a)
+    return similarity if similarity >= min_similarity else 0.0
+
+
+class FuzzyNameIndex:
+    """
+    Character trigram inverted index over normalized sanctions names
+
+    search() finds listed names within an edit-similarity threshold of a
+    name field in two steps:
+    - candidates: names sharing enough trigrams with the field, counted with
+      one np.bincount over the postings of the field's trigrams. An edit
+      changes at most 3 trigrams, so a name at similarity t keeps about
+      1 - 3 * (1 - t) of its trigrams; names below that cannot match.
+    - rescoring: edit_similarity between the listed name and each run of the
+      field's words of about the same word count ("MR IVAN PETROV" against
+      "IWAN PETROV"), best candidates first, until the deadline passes.
+
+    Postings are stored as CSR arrays (offsets, postings) by trigram id.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.keys = [normalize_name(name) for name in self.names]
+        self.word_counts = np.array([len(key.split()) for key in self.keys], dtype=np.int32)
+        self.budget_exhausted = 0
+
+        postings: Dict[str, List[int]] = {}
+        gram_counts = np.zeros(len(self.keys), dtype=np.int32)
+        for index, key in enumerate(self.keys):
+            if not key:
+                continue
+            grams = _trigrams(key)
+            gram_counts[index] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+
+        self.gram_ids = {gram: gram_id for gram_id, gram in enumerate(postings)}
+        self.gram_counts = gram_counts
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices in postings.values()], out=self.offsets[1:])
+        self.postings = np.fromiter(
+            (index for indices in postings.values() for index in indices), dtype=np.int32, count=self.offsets[-1]
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, name: str, threshold: float = 0.85, max_candidates: int = 50,
+               deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Listed names at edit similarity >= threshold to name, best first, as
+        {"listed_name", "matched_text", "similarity"} dicts. Rescoring stops
+        at deadline (a time.perf_counter() value), returning the matches
+        found so far; budget_exhausted counts such cut-short searches.
+        """
+        key = normalize_name(name)
+        gram_ids = [self.gram_ids[gram] for gram in _trigrams(key) if gram in self.gram_ids] if key else []
+        if not gram_ids:
+            return []
+
+        hits = np.concatenate([self.postings[self.offsets[gram_id]:self.offsets[gram_id + 1]]
+                               for gram_id in gram_ids])
+        overlap = np.bincount(hits, minlength=len(self.keys))
+        min_overlap = np.maximum(1.0, (1.0 - 3.0 * (1.0 - threshold)) * self.gram_counts)
+        candidates = np.flatnonzero(overlap >= min_overlap)
+        if len(candidates) == 0:
+            return []
+
+        # Best candidates first, so a deadline cuts the least likely ones
+        containment = overlap[candidates] / self.gram_counts[candidates]
+        if len(candidates) > max_candidates:
+            best = np.argpartition(-containment, max_candidates - 1)[:max_candidates]
+            candidates, containment = candidates[best], containment[best]
+        candidates = candidates[np.argsort(-containment, kind="stable")]
+
+        words = key.split()
+        matches = []
+        for index in candidates.tolist():
+            if deadline is not None and time.perf_counter() > deadline:
+                self.budget_exhausted += 1
+                break
+            similarity, matched_text = self._best_window(words, index, threshold)
+            if similarity >= threshold:
+                matches.append({"listed_name": self.names[index], "matched_text": matched_text,
+                                "similarity": round(similarity, 4)})
+
+        matches.sort(key=lambda match: -match["similarity"])
+        return matches
+
+    def _best_window(self, words: List[str], index: int, threshold: float):
+        """Highest edit similarity (0.0 below threshold) between listed name index and a run of about as many words"""
+        listed_key = self.keys[index]
+        word_count = int(self.word_counts[index])
+        best = (0.0, "")
+        for width in sorted({max(1, min(len(words), width)) for width in (word_count - 1, word_count, word_count + 1)}):
+            for start in range(len(words) - width + 1):
+                window = " ".join(words[start:start + width])
+                similarity = edit_similarity(window, listed_key, max(threshold, best[0]))
+                if similarity > best[0]:
+                    best = (similarity, window)
+        return best
+
+    def search_batch(self, names: Iterable[str], threshold: float = 0.85,
+                     max_candidates: int = 50) -> List[List[Dict]]:
+        """
+        search() for many names without a deadline, e.g. rescreening every
+        customer after a list update; names normalizing alike are searched once
+        """
+        results: Dict[str, List[Dict]] = {}
+        output = []
+        for name in names:
+            key = normalize_name(name)
+            if key not in results:
+                results[key] = self.search(key, threshold, max_candidates)
+            output.append(results[key])
+        return output
@@ -0,0 +1,40 @@
+"""
+Soft Voting Module
+Ensemble that averages the fraud probabilities of base models served on
+their own, so scoring several models computes each base model once
+"""
+
+from typing import List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+class SoftVotingEnsemble:
+    """
+    Soft vote over named base models
+
+    Unlike VotingClassifier, the ensemble holds no fitted copies of its
+    members: it names them, and the caller supplies each member's fraud
+    probabilities (computed with that member's own preprocessing). The
+    ensemble probability is their weighted mean, which is what a soft
+    VotingClassifier's positive-class column would be for the same members.
+    """
+
+    def __init__(self, members: Sequence[str], weights: Optional[Sequence[float]] = None):
+        if not members:
+            raise ValueError("A soft voting ensemble needs at least one member")
+        if weights is not None and len(weights) != len(members):
+            raise ValueError(f"Got {len(weights)} weights for {len(members)} members")
+
+        self.members: List[str] = list(members)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+
+    def combine(self, member_probabilities: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Ensemble fraud probabilities from each member's fraud probabilities"""
+        stacked = np.stack([
+            np.asarray(member_probabilities[member], dtype=np.float64) for member in self.members
+        ])
+        return np.average(stacked, axis=0, weights=self.weights)
+
+    def __repr__(self) -> str:
+        return f"SoftVotingEnsemble(members={self.members!r}, weights={self.weights!r})"
@@ -0,0 +1,45 @@
+"""
+Timestamps Module
+Single parser from the timestamp formats transactions arrive with to epoch
+seconds, shared by velocity monitoring and the AML history
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from numbers import Real
+
+
+def to_epoch_seconds(value) -> float:
+    """
+    Epoch seconds from epoch seconds, a numeric string, an ISO 8601 string
+    ('Z' suffix allowed) or a datetime; naive times are taken as UTC so
+    replays do not depend on the host timezone
+    """
+    if isinstance(value, str):
+        return parse_timestamp_string(value)
+
+    if isinstance(value, Real):
+        return float(value)
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    raise ValueError(f"Unsupported timestamp: {value!r}")
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp_string(value: str) -> float:
+    """
+    to_epoch_seconds of a string, memoized: callers resend overlapping history
+    lists, so most timestamps have been parsed before
+    """
+    # ISO strings are the common case, so try them before numeric strings
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return float(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
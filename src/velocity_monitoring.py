@@ -3,32 +3,488 @@ Transaction Velocity Monitoring Module
 Implements real-time velocity tracking and risk scoring for payment transactions
 """
 
-from typing import Dict, List, Optional
-from datetime import datetime
-from collections import defaultdict, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Mapping
+from itertools import islice
+from pathlib import Path
+import csv
 import json
+import math
 import threading
 import time
+import zlib
+
+import numpy as np
+
+# Imported as part of the src package or, by scripts and tests, with src/ on sys.path
+try:
+    from .timestamps import to_epoch_seconds
+    from .velocity_sketches import SlidingCountMinSketch
+    from .velocity_snapshot import SnapshotBackedBuffer, VelocitySnapshot
+except ImportError:
+    from timestamps import to_epoch_seconds
+    from velocity_sketches import SlidingCountMinSketch
+    from velocity_snapshot import SnapshotBackedBuffer, VelocitySnapshot
+
+
+def _compensated_add(total: float, compensation: float, value: float) -> Tuple[float, float]:
+    """Neumaier summation step: add value to total, carrying the rounding error in compensation"""
+    new_total = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - new_total) + value
+    else:
+        compensation += (value - new_total) + total
+    return new_total, compensation
+
+
+class SlidingWindowAggregate:
+    """
+    Running aggregates for a single velocity time window
+    Tracks the window as a start index into the customer's shared timestamp and
+    amount deques instead of holding its own copy of the entries. Keeps count,
+    sum, max (monotonic deque of indices) and first/last timestamps up to date
+    on insert and eviction so reads are O(1) and eviction is amortized O(1)
+    """
+
+    __slots__ = ("timestamps", "amounts", "window_seconds", "start", "_sum", "_compensation",
+                 "_evicted", "_max_indices", "_cutoff")
+
+    # Evictions after which the running sum is recomputed exactly (at least once per window length)
+    RESUM_EVERY = 256
+
+    def __init__(self, timestamps: deque, amounts: deque, window_seconds: float):
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.window_seconds = window_seconds
+        self.start = len(timestamps)
+        # Compensated running sum, so adding and evicting amounts does not drift from sum()
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._evicted = 0
+        # Indices of entries with strictly decreasing amounts; the front is the window max
+        self._max_indices = deque()
+        self._cutoff = float("-inf")
+
+    @property
+    def count(self) -> int:
+        return len(self.timestamps) - self.start
+
+    @property
+    def total(self) -> float:
+        return self._sum + self._compensation
+
+    def add(self, amount: float) -> None:
+        """Extend the window with the entry just appended to the shared deques"""
+        self._sum, self._compensation = _compensated_add(self._sum, self._compensation, amount)
+
+        amounts = self.amounts
+        max_indices = self._max_indices
+        while max_indices and amounts[max_indices[-1]] <= amount:
+            max_indices.pop()
+        max_indices.append(len(amounts) - 1)
+
+    def evict(self, cutoff_time: float) -> None:
+        """Drop entries with a timestamp older than cutoff_time"""
+        timestamps = self.timestamps
+        amounts = self.amounts
+        end = len(timestamps)
+        start = self.start
+
+        while start < end and timestamps[start] < cutoff_time:
+            self._sum, self._compensation = _compensated_add(self._sum, self._compensation, -amounts[start])
+            start += 1
+        self._evicted += start - self.start
+        self.start = start
+
+        max_indices = self._max_indices
+        while max_indices and max_indices[0] < start:
+            max_indices.popleft()
+
+        if start == end:
+            self._sum = self._compensation = 0.0
+            self._evicted = 0
+        elif self._evicted >= max(self.count, self.RESUM_EVERY):
+            self._sum = math.fsum(islice(reversed(amounts), end - start))
+            self._compensation = 0.0
+            self._evicted = 0
+
+        self._cutoff = max(self._cutoff, cutoff_time)
+
+    def shift(self, dropped: int) -> None:
+        """Re-index after the owner dropped that many entries, all before the window, from the deques"""
+        if dropped:
+            self.start -= dropped
+            self._max_indices = deque(index - dropped for index in self._max_indices)
+
+    def can_evaluate(self, cutoff_time: float) -> bool:
+        """Eviction is one-way, so only cutoffs at or after the last one are answerable"""
+        return cutoff_time >= self._cutoff
+
+    @property
+    def first_timestamp(self) -> Optional[float]:
+        return self.timestamps[self.start] if self.count else None
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        return self.timestamps[-1] if self.count else None
+
+    @property
+    def max_amount(self) -> float:
+        return self.amounts[self._max_indices[0]] if self._max_indices else 0
+
+    def metrics(self, window_name: str) -> Dict:
+        """Return this window's entries of the velocity metrics dict"""
+        count = self.count
+        if not count:
+            return {
+                f"{window_name}_count": 0,
+                f"{window_name}_total_amount": 0,
+                f"{window_name}_avg_amount": 0,
+                f"{window_name}_max_amount": 0,
+                f"{window_name}_rate": 0,
+            }
+
+        total = self.total
+        time_span = self.last_timestamp - self.first_timestamp
+        return {
+            f"{window_name}_count": count,
+            f"{window_name}_total_amount": total,
+            f"{window_name}_avg_amount": total / count,
+            f"{window_name}_max_amount": self.max_amount,
+            f"{window_name}_rate": count / max(time_span, 1) if time_span > 0 else count,
+        }
+
+
+class CompactWindowAggregate:
+    """
+    Running aggregates for one time window over a CompactVelocityHistory
+    Tracks the window as a range of sequence numbers into the shared history
+    arrays instead of holding its own copy of the entries
+    """
+
+    __slots__ = ("history", "window_seconds", "start", "_sum", "_compensation", "_evicted",
+                 "_max_seqs", "_cutoff")
+
+    RESUM_EVERY = SlidingWindowAggregate.RESUM_EVERY
+
+    def __init__(self, history: "CompactVelocityHistory", window_seconds: float):
+        self.history = history
+        self.window_seconds = window_seconds
+        self.start = history.start
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._evicted = 0
+        # Sequence numbers with strictly decreasing amounts; the first is the window max.
+        # Usually a handful of entries, so a list is cheaper per customer than a deque
+        self._max_seqs = []
+        self._cutoff = float("-inf")
+
+    @property
+    def count(self) -> int:
+        return self.history.end - self.start
+
+    @property
+    def total(self) -> float:
+        return self._sum + self._compensation
+
+    def add(self, seq: int, amount: float) -> None:
+        """Extend the window with the entry just appended at seq"""
+        self._sum, self._compensation = _compensated_add(self._sum, self._compensation, amount)
+
+        history = self.history
+        max_seqs = self._max_seqs
+        while max_seqs and history.amount_at(max_seqs[-1]) <= amount:
+            max_seqs.pop()
+        max_seqs.append(seq)
+
+    def drop_first(self) -> None:
+        """Drop the oldest entry of the window"""
+        seq = self.start
+        history = self.history
+        self._sum, self._compensation = _compensated_add(self._sum, self._compensation, -history.amount_at(seq))
+        if self._max_seqs and self._max_seqs[0] == seq:
+            del self._max_seqs[0]
+        self.start = seq + 1
+        self._evicted += 1
+
+        if self.start == history.end:
+            self._sum = self._compensation = 0.0
+            self._evicted = 0
+        elif self._evicted >= max(self.count, self.RESUM_EVERY):
+            self._sum = math.fsum(history.amount_at(seq) for seq in range(self.start, history.end))
+            self._compensation = 0.0
+            self._evicted = 0
+
+    def evict(self, cutoff_time: float) -> None:
+        """Drop entries with a timestamp older than cutoff_time"""
+        history = self.history
+        while self.start < history.end and history.timestamp_at(self.start) < cutoff_time:
+            self.drop_first()
+
+        self._cutoff = max(self._cutoff, cutoff_time)
+
+    def can_evaluate(self, cutoff_time: float) -> bool:
+        """Eviction is one-way, so only cutoffs at or after the last one are answerable"""
+        return cutoff_time >= self._cutoff
+
+    def metrics(self, window_name: str) -> Dict:
+        """Return this window's entries of the velocity metrics dict"""
+        count = self.count
+        if not count:
+            return {
+                f"{window_name}_count": 0,
+                f"{window_name}_total_amount": 0,
+                f"{window_name}_avg_amount": 0,
+                f"{window_name}_max_amount": 0,
+                f"{window_name}_rate": 0,
+            }
+
+        history = self.history
+        total = self.total
+        time_span = history.timestamp_at(history.end - 1) - history.timestamp_at(self.start)
+        return {
+            f"{window_name}_count": count,
+            f"{window_name}_total_amount": total,
+            f"{window_name}_avg_amount": total / count,
+            f"{window_name}_max_amount": history.amount_at(self._max_seqs[0]),
+            f"{window_name}_rate": count / max(time_span, 1) if time_span > 0 else count,
+        }
+
+
+class CompactVelocityHistory:
+    """
+    Columnar per-customer velocity history backed by fixed-dtype arrays
+    Keeps only timestamps (float64) and amounts (float64 or float32) in a ring
+    buffer that grows by doubling up to an optional retention cap; raw
+    transaction payloads are not retained
+    """
+
+    __slots__ = ("timestamps", "amounts", "max_transactions", "start", "end", "windows")
+
+    INITIAL_CAPACITY = 8
+
+    def __init__(self, time_windows: Dict[str, float], amount_typecode: str = "d",
+                 max_transactions: Optional[int] = None):
+        capacity = self.INITIAL_CAPACITY
+        if max_transactions is not None:
+            capacity = max(1, min(capacity, max_transactions))
+
+        self.timestamps = array("d", [0.0]) * capacity
+        self.amounts = array(amount_typecode, [0.0]) * capacity
+        self.max_transactions = max_transactions
+
+        # Monotonic sequence numbers of the oldest retained entry and the next entry
+        self.start = 0
+        self.end = 0
+
+        self.windows = {
+            window_name: CompactWindowAggregate(self, window_seconds)
+            for window_name, window_seconds in time_windows.items()
+        }
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def timestamp_at(self, seq: int) -> float:
+        return self.timestamps[seq % len(self.timestamps)]
+
+    def amount_at(self, seq: int) -> float:
+        return self.amounts[seq % len(self.amounts)]
+
+    def append(self, timestamp: float, amount: float) -> None:
+        """Append a transaction, growing the ring or dropping the oldest entry when full"""
+        capacity = len(self.timestamps)
+        if len(self) == capacity:
+            if self.max_transactions is None or capacity < self.max_transactions:
+                self._grow()
+            else:
+                self._drop_oldest()
+
+        seq = self.end
+        position = seq % len(self.timestamps)
+        self.timestamps[position] = timestamp
+        self.amounts[position] = amount
+        self.end = seq + 1
+
+        # Read back so float32 storage and the running sums agree
+        stored_amount = self.amounts[position]
+        for window in self.windows.values():
+            window.add(seq, stored_amount)
+
+    def _grow(self) -> None:
+        """Double the ring capacity (bounded by max_transactions), keeping sequence numbers"""
+        old_capacity = len(self.timestamps)
+        new_capacity = old_capacity * 2
+        if self.max_transactions is not None:
+            new_capacity = min(new_capacity, self.max_transactions)
+
+        timestamps = array("d", [0.0]) * new_capacity
+        amounts = array(self.amounts.typecode, [0.0]) * new_capacity
+        for seq in range(self.start, self.end):
+            timestamps[seq % new_capacity] = self.timestamps[seq % old_capacity]
+            amounts[seq % new_capacity] = self.amounts[seq % old_capacity]
+
+        self.timestamps = timestamps
+        self.amounts = amounts
+
+    def _drop_oldest(self) -> None:
+        """Drop the oldest retained entry to make room under the retention cap"""
+        for window in self.windows.values():
+            if window.start == self.start:
+                window.drop_first()
+        self.start += 1
+
+    def evict(self, current_time: float) -> None:
+        """Evict each window up to current_time and release entries no window covers"""
+        for window in self.windows.values():
+            window.evict(current_time - window.window_seconds)
+
+        if self.windows:
+            self.start = min(window.start for window in self.windows.values())
+
+    def history(self) -> Tuple[List[float], List[float]]:
+        """Return the retained (timestamps, amounts) in arrival order"""
+        seqs = range(self.start, self.end)
+        return [self.timestamp_at(seq) for seq in seqs], [self.amount_at(seq) for seq in seqs]
+
+
+def iter_transaction_file(path: str) -> Iterator[Dict]:
+    """Stream transactions from a CSV or JSON Lines file without loading it into memory"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise ValueError(f"Unsupported transaction file type: {suffix}")
+    
+    with open(path, 'r', newline='') as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _segmented_searchsorted(values: np.ndarray, lows: np.ndarray, highs: np.ndarray,
+                            targets: np.ndarray) -> np.ndarray:
+    """
+    np.searchsorted(side="left") of each target within its own sorted slice
+    values[lows[i]:highs[i]], run as one vectorized binary search over all rows
+    """
+    lo = lows.copy()
+    hi = highs.copy()
+    active = np.nonzero(lo < hi)[0]
+    
+    while len(active):
+        mid = (lo[active] + hi[active]) // 2
+        go_right = values[mid] < targets[active]
+        lo[active] = np.where(go_right, mid + 1, lo[active])
+        hi[active] = np.where(go_right, hi[active], mid)
+        active = active[lo[active] < hi[active]]
+    
+    return lo
+
+
+def _segmented_cumsum(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Cumulative sum of values restarting at each segment values[starts[i]:starts[i] + lengths[i]],
+    so a segment's sums carry no rounding from the segments before it. Segments of
+    equal length are summed together as the rows of one 2-D block
+    """
+    result = np.empty_like(values)
+    for length in np.unique(lengths):
+        rows = starts[lengths == length][:, None] + np.arange(length)
+        result[rows] = np.cumsum(values[rows], axis=1)
+    return result
+
+
+def _range_max(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Maximum of values[starts[i]:ends[i] + 1] for every row
+    Builds a sparse table one level at a time, answering the rows whose range
+    length needs that level, so memory stays O(n)
+    """
+    result = np.zeros(len(starts), dtype=values.dtype)
+    if not len(starts):
+        return result
+    
+    lengths = ends - starts + 1
+    levels = np.frexp(lengths.astype(np.float64))[1] - 1  # floor(log2(length))
+    
+    table = values
+    width = 1
+    for level in range(int(levels.max()) + 1):
+        rows = np.nonzero(levels == level)[0]
+        if len(rows):
+            result[rows] = np.maximum(table[starts[rows]], table[ends[rows] - width + 1])
+        table = np.maximum(table[:-width], table[width:])
+        width *= 2
+    
+    return result
 
 
 class VelocityMonitor:
     """
     Real-time transaction velocity monitoring and risk assessment
-    Tracks transaction frequency and volume across multiple time windows
+    Tracks transaction frequency and volume across multiple time windows.
+    Risk scoring reaches the window state only through record_transaction,
+    calculate_velocity_metrics and record_and_calculate, which subclasses
+    override to keep it elsewhere (ShardedVelocityMonitor, SharedVelocityMonitor)
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    STORAGE_MODES = ("standard", "compact", "approximate")
+    SNAPSHOT_CHUNK_SIZE = 10000  # Customers copied per lock hold while snapshotting
+    AMOUNT_TYPECODES = {"float64": "d", "float32": "f"}
+    TIME_MODES = ("processing", "event")
+    
+    def __init__(self, config_path: Optional[str] = None, storage_mode: Optional[str] = None,
+                 time_mode: Optional[str] = None):
         """Initialize velocity monitor with configurable thresholds"""
         self.config = self._load_config(config_path)
         self.velocity_thresholds = self.config.get("velocity_thresholds", {})
         self.time_windows = self.config.get("time_windows", {})
         
+        storage_config = self.config.get("storage", {})
+        self.storage_mode = storage_mode or storage_config.get("mode", "standard")
+        if self.storage_mode not in self.STORAGE_MODES:
+            raise ValueError(f"Unknown velocity storage mode: {self.storage_mode}")
+        
+        amount_dtype = storage_config.get("amount_dtype", "float64")
+        if amount_dtype not in self.AMOUNT_TYPECODES:
+            raise ValueError(f"Unsupported amount dtype: {amount_dtype}")
+        self._amount_typecode = self.AMOUNT_TYPECODES[amount_dtype]
+        self._max_transactions_per_customer = storage_config.get("max_transactions_per_customer")
+        
+        # Approximate mode keeps every key in one fixed-size sketch instead of per-key buffers
+        self.sketch: Optional[SlidingCountMinSketch] = None
+        sketch_config = self.config.get("sketch", {})
+        self._distinct_field = sketch_config.get("distinct_field")
+        if self.storage_mode == "approximate":
+            self.sketch = SlidingCountMinSketch(
+                self.time_windows,
+                width=sketch_config.get("width", 2048),
+                depth=sketch_config.get("depth", 4),
+                buckets_per_window=sketch_config.get("buckets_per_window", 12),
+                distinct_windows=sketch_config.get("distinct_windows", []) if self._distinct_field else [],
+                hll_registers=sketch_config.get("hll_registers", 32),
+                seed=sketch_config.get("seed", 0),
+            )
+        
+        # Processing time stamps transactions with the wall clock; event time reads the
+        # transaction's own timestamp and evicts behind a watermark
+        time_config = self.config.get("time", {})
+        self.time_mode = time_mode or time_config.get("mode", "processing")
+        if self.time_mode not in self.TIME_MODES:
+            raise ValueError(f"Unknown velocity time mode: {self.time_mode}")
+        self._timestamp_field = time_config.get("timestamp_field", "timestamp")
+        self._allowed_lateness = float(time_config.get("allowed_lateness_seconds", 0))
+        self._event_clock = float("-inf")
+        self._watermark = float("-inf")
+        self.late_event_count = 0
+        
         # In-memory transaction storage for velocity calculations
-        self.transaction_buffer = defaultdict(lambda: {
-            'transactions': deque(),
-            'amounts': deque(),
-            'timestamps': deque()
-        })
+        self.transaction_buffer = defaultdict(self._create_customer_buffer)
         
         # Thread lock for concurrent access
         self._lock = threading.Lock()
@@ -37,6 +493,15 @@ class VelocityMonitor:
         self._last_cleanup = time.time()
         self._cleanup_interval = 300  # 5 minutes
         
+        # When set, cleanup evicts the recorded customer plus this many queued customers
+        # per record instead of sweeping the whole buffer under the lock
+        self._cleanup_batch_size: Optional[int] = None
+        self._cleanup_queue = deque()
+        
+        # Event mode: customers in order of last activity, so idle customers expire
+        # from the front as the watermark advances instead of by periodic sweeps
+        self._last_activity: "OrderedDict[str, float]" = OrderedDict()
+        
     def _load_config(self, config_path: Optional[str]) -> Dict:
         """Load velocity monitoring configuration"""
         default_config = {
@@ -66,6 +531,51 @@ class VelocityMonitor:
                 "frequency_weight": 0.4,   # Weight for transaction frequency
                 "volume_weight": 0.4,      # Weight for transaction volume
                 "pattern_weight": 0.2      # Weight for pattern anomalies
+            },
+            "storage": {
+                "mode": "standard",        # "standard" deques, "compact" arrays or "approximate" sketch
+                "amount_dtype": "float64", # Compact mode only: "float64" or "float32"
+                "max_transactions_per_customer": None  # Compact mode retention cap
+            },
+            "sketch": {
+                # Approximate mode only; see SlidingCountMinSketch for the error bounds
+                "width": 2048,             # Count overshoot <= e/width of window traffic...
+                "depth": 4,                # ...with probability >= 1 - exp(-depth)
+                "buckets_per_window": 12,  # Time resolution: window length / buckets
+                "distinct_field": None,    # e.g. "card_number" for distinct cards per merchant
+                "distinct_windows": ["hour_window", "day_window"],
+                "hll_registers": 32,       # Distinct count std error ~1.04/sqrt(registers)
+                "seed": 0
+            },
+            "dimension_thresholds": {
+                # Approximate per-entity limits used by DimensionVelocityMonitor; keys not
+                # listed fall back to velocity_thresholds
+                "merchant_id": {
+                    "max_transactions_per_minute": 600,
+                    "max_transactions_per_hour": 20000,
+                    "max_transactions_per_day": 200000,
+                    "max_amount_per_minute": 1000000,
+                    "max_amount_per_hour": 20000000,
+                    "max_amount_per_day": 200000000
+                },
+                "device_id": {},
+                "ip_address": {
+                    "max_transactions_per_minute": 30,
+                    "max_transactions_per_hour": 300
+                },
+                "card_bin": {
+                    "max_transactions_per_minute": 2000,
+                    "max_transactions_per_hour": 50000,
+                    "max_transactions_per_day": 500000,
+                    "max_amount_per_minute": 5000000,
+                    "max_amount_per_hour": 100000000,
+                    "max_amount_per_day": 1000000000
+                }
+            },
+            "time": {
+                "mode": "processing",      # "processing" (wall clock) or "event"
+                "timestamp_field": "timestamp",  # Event mode: epoch seconds or ISO 8601
+                "allowed_lateness_seconds": 0    # Event mode: watermark lag behind max event time
             }
         }
         
@@ -79,60 +589,253 @@ class VelocityMonitor:
                 
         return default_config
     
-    def record_transaction(self, customer_id: str, transaction_data: Dict) -> None:
-        """Record a new transaction for velocity tracking"""
+    def _create_customer_buffer(self):
+        """Create an empty per-customer buffer for the configured storage mode"""
+        if self.storage_mode == "compact":
+            return CompactVelocityHistory(
+                self.time_windows,
+                amount_typecode=self._amount_typecode,
+                max_transactions=self._max_transactions_per_customer
+            )
+        
+        # Every window reads the same timestamp and amount deques
+        timestamps, amounts = deque(), deque()
+        return {
+            'transactions': deque(),
+            'amounts': amounts,
+            'timestamps': timestamps,
+            'windows': {
+                window_name: SlidingWindowAggregate(timestamps, amounts, window_seconds)
+                for window_name, window_seconds in self.time_windows.items()
+            }
+        }
+    
+    @staticmethod
+    def _buffer_windows(customer_buffer) -> Dict:
+        """Return the window aggregates of a customer buffer in either storage mode"""
+        if isinstance(customer_buffer, CompactVelocityHistory):
+            return customer_buffer.windows
+        return customer_buffer['windows']
+    
+    @staticmethod
+    def _buffer_history(customer_buffer) -> Tuple[List[float], List[float]]:
+        """Return the (timestamps, amounts) of a customer buffer in either storage mode"""
+        if isinstance(customer_buffer, CompactVelocityHistory):
+            return customer_buffer.history()
+        return list(customer_buffer['timestamps']), list(customer_buffer['amounts'])
+    
+    def _now(self) -> float:
+        """Current time: the wall clock, or the latest event time seen in event mode"""
+        if self.time_mode == "event":
+            return self._event_clock
+        return time.time()
+    
+    def _eviction_time(self, current_time: float) -> float:
+        """Time up to which expired transactions may be evicted"""
+        if self.time_mode == "event":
+            return self._watermark
+        return current_time
+    
+    def event_time(self, transaction_data: Dict) -> float:
+        """Read a transaction's event timestamp as epoch seconds"""
+        value = transaction_data.get(self._timestamp_field)
+        if value is None:
+            raise ValueError(f"Transaction has no '{self._timestamp_field}' for event time")
+        return to_epoch_seconds(value)
+    
+    def _activity_hour(self, transaction_data: Dict) -> int:
+        """Hour of day used for off-hours checks (UTC event hour in event mode)"""
+        if self.time_mode == "event":
+            return datetime.fromtimestamp(self.event_time(transaction_data), tz=timezone.utc).hour
+        return datetime.now().hour
+    
+    def record_transaction(self, customer_id: str, transaction_data: Dict,
+                           timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Record a new transaction for velocity tracking
+        Returns the timestamp it was recorded at, or None for an event-time
+        transaction dropped for arriving behind the watermark
+        """
         with self._lock:
-            current_time = time.time()
+            if timestamp is None:
+                timestamp = (
+                    self.event_time(transaction_data) if self.time_mode == "event" else time.time()
+                )
+            current_time = timestamp
             amount = float(transaction_data.get("transaction_amount", 0))
             
+            customer_buffer = self.transaction_buffer.get(customer_id)
+            if self.time_mode == "event":
+                if current_time < self._watermark:
+                    self.late_event_count += 1
+                    return None
+                
+                self._event_clock = max(self._event_clock, current_time)
+                self._watermark = self._event_clock - self._allowed_lateness
+                
+                # Windows assume per-customer time order, so an event that is late but
+                # within the allowed lateness is recorded at the customer's latest time
+                if customer_buffer is not None:
+                    current_time = max(current_time, self._last_timestamp(customer_buffer))
+            
+            if self.sketch is not None:
+                distinct_value = transaction_data.get(self._distinct_field) if self._distinct_field else None
+                self.sketch.add(customer_id, current_time, amount, distinct_value)
+                return current_time
+            
             # Add transaction to buffer
-            customer_buffer = self.transaction_buffer[customer_id]
-            customer_buffer['transactions'].append(transaction_data)
-            customer_buffer['amounts'].append(amount)
-            customer_buffer['timestamps'].append(current_time)
+            if customer_buffer is None:
+                customer_buffer = self.transaction_buffer[customer_id]
+            if self.storage_mode == "compact":
+                customer_buffer.append(current_time, amount)
+            else:
+                self._append_standard(customer_buffer, transaction_data, current_time, amount)
             
             # Cleanup old transactions if needed
-            if current_time - self._last_cleanup > self._cleanup_interval:
+            eviction_time = self._eviction_time(current_time)
+            if self.time_mode == "event":
+                self._last_activity[customer_id] = current_time
+                self._last_activity.move_to_end(customer_id)
+                self._evict_customer(customer_id, eviction_time)
+                self._evict_idle_customers(eviction_time)
+            elif self._cleanup_batch_size:
+                self._evict_customer(customer_id, eviction_time)
+                self._cleanup_incrementally(eviction_time)
+            elif current_time - self._last_cleanup > self._cleanup_interval:
                 self._cleanup_old_transactions()
                 self._last_cleanup = current_time
+            
+            return current_time
+    
+    @staticmethod
+    def _last_timestamp(customer_buffer) -> float:
+        """Timestamp of a customer's most recently recorded transaction"""
+        if isinstance(customer_buffer, CompactVelocityHistory):
+            if not len(customer_buffer):
+                return float("-inf")
+            return customer_buffer.timestamp_at(customer_buffer.end - 1)
+        timestamps = customer_buffer['timestamps']
+        return timestamps[-1] if timestamps else float("-inf")
+    
+    @staticmethod
+    def _append_standard(customer_buffer: Dict, transaction_data: Dict,
+                         current_time: float, amount: float) -> None:
+        """Append a transaction to a standard (deque-backed) customer buffer"""
+        customer_buffer['transactions'].append(transaction_data)
+        customer_buffer['amounts'].append(amount)
+        customer_buffer['timestamps'].append(current_time)
+        
+        # Update running window aggregates
+        for window in customer_buffer['windows'].values():
+            window.add(amount)
     
     def _cleanup_old_transactions(self) -> None:
         """Remove transactions older than the longest time window"""
-        current_time = time.time()
+        current_time = self._eviction_time(self._now())
+        
+        for customer_id in list(self.transaction_buffer.keys()):
+            self._evict_customer(customer_id, current_time)
+        self._expire_snapshot_customers(current_time)
+    
+    def _cleanup_incrementally(self, current_time: float) -> None:
+        """Evict a bounded batch of customers, starting a new pass once per cleanup interval"""
+        if not self._cleanup_queue:
+            if current_time - self._last_cleanup <= self._cleanup_interval:
+                return
+            self._cleanup_queue = deque(self.transaction_buffer.keys())
+            self._last_cleanup = current_time
+            self._expire_snapshot_customers(current_time)
+        
+        for _ in range(min(self._cleanup_batch_size, len(self._cleanup_queue))):
+            self._evict_customer(self._cleanup_queue.popleft(), current_time)
+    
+    def _expire_snapshot_customers(self, current_time: float) -> None:
+        """Drop restored-but-untouched snapshot customers whose history has fully expired"""
+        if isinstance(self.transaction_buffer, SnapshotBackedBuffer):
+            self.transaction_buffer.expire_pending(current_time - max(self.time_windows.values()))
+    
+    def _evict_idle_customers(self, watermark: float) -> None:
+        """Drop customers whose latest transaction fell out of every window before the watermark"""
+        cutoff_time = watermark - max(self.time_windows.values())
+        while self._last_activity:
+            customer_id, last_activity = next(iter(self._last_activity.items()))
+            if last_activity >= cutoff_time:
+                break
+            del self._last_activity[customer_id]
+            self.transaction_buffer.pop(customer_id, None)
+    
+    def _evict_customer(self, customer_id: str, current_time: float) -> None:
+        """Remove one customer's transactions older than the longest time window"""
+        customer_buffer = self.transaction_buffer.get(customer_id)
+        if customer_buffer is None:
+            return
+        
+        # Remove empty buffers
+        if self._evict_buffer(customer_buffer, current_time):
+            del self.transaction_buffer[customer_id]
+    
+    def _evict_buffer(self, customer_buffer, current_time: float) -> bool:
+        """Evict expired transactions from a customer buffer, returning True once it is empty"""
+        if isinstance(customer_buffer, CompactVelocityHistory):
+            customer_buffer.evict(current_time)
+            return not len(customer_buffer)
+        
         max_window = max(self.time_windows.values())
         cutoff_time = current_time - max_window
         
-        for customer_id in list(self.transaction_buffer.keys()):
-            customer_buffer = self.transaction_buffer[customer_id]
-            
-            # Remove old transactions
-            while (customer_buffer['timestamps'] and 
-                   customer_buffer['timestamps'][0] < cutoff_time):
-                customer_buffer['transactions'].popleft()
-                customer_buffer['amounts'].popleft()
-                customer_buffer['timestamps'].popleft()
-            
-            # Remove empty buffers
-            if not customer_buffer['timestamps']:
-                del self.transaction_buffer[customer_id]
+        windows = customer_buffer['windows'].values()
+        for window in windows:
+            window.evict(current_time - window.window_seconds)
+        
+        # Remove old transactions; every window has already moved past them
+        dropped = 0
+        while (customer_buffer['timestamps'] and 
+               customer_buffer['timestamps'][0] < cutoff_time):
+            customer_buffer['transactions'].popleft()
+            customer_buffer['amounts'].popleft()
+            customer_buffer['timestamps'].popleft()
+            dropped += 1
+        for window in windows:
+            window.shift(dropped)
+        
+        return not customer_buffer['timestamps']
     
     def calculate_velocity_metrics(self, customer_id: str, current_time: Optional[float] = None) -> Dict:
-        """Calculate velocity metrics for a customer"""
+        """Calculate velocity metrics for a customer from the running window aggregates"""
         if current_time is None:
-            current_time = time.time()
-            
-        customer_buffer = self.transaction_buffer.get(customer_id, {
-            'transactions': deque(),
-            'amounts': deque(),
-            'timestamps': deque()
-        })
-        
-        timestamps = list(customer_buffer['timestamps'])
-        amounts = list(customer_buffer['amounts'])
-        
-        if not timestamps:
-            return self._empty_velocity_metrics()
+            current_time = self._now()
         
+        with self._lock:
+            if self.sketch is not None:
+                return self.sketch.metrics(customer_id, current_time)
+            
+            customer_buffer = self.transaction_buffer.get(customer_id)
+            
+            if customer_buffer is None:
+                return self._empty_velocity_metrics()
+            
+            windows = self._buffer_windows(customer_buffer)
+            
+            # Aggregates only move forward in time; answer earlier points from the raw history
+            if not all(
+                window.can_evaluate(current_time - window.window_seconds)
+                for window in windows.values()
+            ):
+                timestamps, amounts = self._buffer_history(customer_buffer)
+                if not timestamps:
+                    return self._empty_velocity_metrics()
+                return self._scan_velocity_metrics(timestamps, amounts, current_time)
+            
+            velocity_metrics = {}
+            for window_name, window in windows.items():
+                window.evict(current_time - window.window_seconds)
+                velocity_metrics.update(window.metrics(window_name))
+            
+            return velocity_metrics
+    
+    def _scan_velocity_metrics(self, timestamps: List[float], amounts: List[float],
+                               current_time: float) -> Dict:
+        """Calculate velocity metrics by rescanning the customer's full history"""
         velocity_metrics = {}
         
         # Calculate metrics for each time window
@@ -178,14 +881,25 @@ class VelocityMonitor:
             metrics[f"{window_name}_rate"] = 0
         return metrics
     
-    def assess_velocity_risk(self, customer_id: str, transaction_data: Dict) -> Dict:
-        """Assess velocity-based risk for a transaction"""
+    def record_and_calculate(self, customer_id: str, transaction_data: Dict) -> Dict:
+        """Record a transaction and return the customer's velocity metrics including it"""
+        if self.time_mode == "event":
+            event_time = self.event_time(transaction_data)
+            recorded_time = self.record_transaction(customer_id, transaction_data, event_time)
+            
+            # Evaluate windows at the transaction's own time, not the wall clock
+            return self.calculate_velocity_metrics(
+                customer_id, event_time if recorded_time is None else recorded_time
+            )
         
-        # Record the current transaction for velocity tracking
         self.record_transaction(customer_id, transaction_data)
+        return self.calculate_velocity_metrics(customer_id)
+    
+    def assess_velocity_risk(self, customer_id: str, transaction_data: Dict) -> Dict:
+        """Assess velocity-based risk for a transaction"""
         
-        # Calculate current velocity metrics
-        velocity_metrics = self.calculate_velocity_metrics(customer_id)
+        # Record the current transaction and calculate current velocity metrics
+        velocity_metrics = self.record_and_calculate(customer_id, transaction_data)
         
         # Calculate risk scores for different aspects
         frequency_risk = self._calculate_frequency_risk(velocity_metrics)
@@ -231,6 +945,158 @@ class VelocityMonitor:
             "requires_velocity_review": overall_risk >= 0.7
         }
     
+    def assess_velocity_risk_batch(self, customer_ids, timestamps, amounts) -> Dict[str, np.ndarray]:
+        """
+        Vectorized velocity assessment for many transactions at once
+        
+        Each row is scored as assess_velocity_risk would score it if the rows were
+        recorded in input order into an empty monitor at the given timestamps, so
+        timestamps must be non-decreasing within each customer. The monitor's own
+        buffer is neither read nor updated.
+        
+        Returns columns aligned with the input: the velocity metrics keys, the
+        component and overall scores, risk level, flag count and review flag.
+        """
+        customer_ids = np.asarray(customer_ids)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        amounts = np.nan_to_num(np.asarray(amounts, dtype=np.float64))
+        n = len(timestamps)
+        if len(customer_ids) != n or len(amounts) != n:
+            raise ValueError("customer_ids, timestamps and amounts must have the same length")
+        
+        # Group rows by customer, keeping input order within each customer
+        _, customer_codes = np.unique(customer_ids, return_inverse=True)
+        order = np.argsort(customer_codes.reshape(-1), kind="stable")
+        codes = customer_codes.reshape(-1)[order]
+        sorted_timestamps = timestamps[order]
+        sorted_amounts = amounts[order]
+        
+        rows = np.arange(n)
+        new_group = np.ones(n, dtype=bool)
+        new_group[1:] = codes[1:] != codes[:-1]
+        group_starts = np.maximum.accumulate(np.where(new_group, rows, 0))
+        
+        if np.any((np.diff(sorted_timestamps) < 0) & ~new_group[1:]):
+            raise ValueError("timestamps must be non-decreasing within each customer")
+        
+        # Running totals per customer, so one customer's amounts never round another's windows
+        segment_starts = np.nonzero(new_group)[0]
+        cumulative_amounts = _segmented_cumsum(
+            sorted_amounts, segment_starts, np.diff(np.append(segment_starts, n))
+        )
+        
+        velocity_metrics = {}
+        for window_name, window_seconds in self.time_windows.items():
+            window_starts = _segmented_searchsorted(
+                sorted_timestamps, group_starts, rows + 1, sorted_timestamps - window_seconds
+            )
+            count = rows - window_starts + 1
+            total = cumulative_amounts - np.where(
+                window_starts > group_starts, cumulative_amounts[np.maximum(window_starts - 1, 0)], 0.0
+            )
+            time_span = sorted_timestamps - sorted_timestamps[window_starts]
+            
+            window_metrics = {
+                f"{window_name}_count": count,
+                f"{window_name}_total_amount": total,
+                f"{window_name}_avg_amount": total / count,
+                f"{window_name}_max_amount": _range_max(sorted_amounts, window_starts, rows),
+                f"{window_name}_rate": np.where(
+                    time_span > 0, count / np.maximum(time_span, 1), count
+                ),
+            }
+            for key, values in window_metrics.items():
+                unsorted = np.empty_like(values)
+                unsorted[order] = values
+                velocity_metrics[key] = unsorted
+        
+        zeros = np.zeros(n)
+        
+        def metric(key: str) -> np.ndarray:
+            return velocity_metrics.get(key, zeros)
+        
+        thresholds = self.velocity_thresholds
+        
+        frequency_risk = np.zeros(n)
+        volume_risk = np.zeros(n)
+        flags_count = np.zeros(n, dtype=np.int64)
+        for period, default_count, default_amount in (
+            ("minute", 10, 50000), ("hour", 100, 200000), ("day", 500, 1000000)
+        ):
+            max_count = thresholds.get(f"max_transactions_per_{period}", default_count)
+            max_amount = thresholds.get(f"max_amount_per_{period}", default_amount)
+            count = metric(f"{period}_window_count")
+            total = metric(f"{period}_window_total_amount")
+            
+            high_frequency = count > max_count
+            high_volume = total > max_amount
+            frequency_risk = np.where(
+                high_frequency,
+                np.maximum(frequency_risk, np.minimum(count / max_count, 2.0) / 2.0),
+                frequency_risk
+            )
+            volume_risk = np.where(
+                high_volume,
+                np.maximum(volume_risk, np.minimum(total / max_amount, 2.0) / 2.0),
+                volume_risk
+            )
+            flags_count += high_frequency.astype(np.int64) + high_volume.astype(np.int64)
+        
+        frequency_risk = np.minimum(frequency_risk, 1.0)
+        volume_risk = np.minimum(volume_risk, 1.0)
+        
+        # Pattern risk, adding the same increments in the same order as the scalar path
+        minute_count = metric("minute_window_count")
+        hour_count = metric("hour_window_count")
+        minute_avg = metric("minute_window_avg_amount")
+        hour_avg = metric("hour_window_avg_amount")
+        if self.time_mode == "event":
+            hours = np.floor(timestamps / 3600) % 24
+            off_hours = (hours < 6) | (hours > 22)
+        else:
+            current_hour = datetime.now().hour
+            off_hours = np.full(n, current_hour < 6 or current_hour > 22)
+        
+        pattern_risk = np.zeros(n)
+        burst_ratio = minute_count / np.maximum(hour_count / 60, 1)
+        pattern_risk += np.where((minute_count > 0) & (hour_count > 0) & (burst_ratio > 5), 0.3, 0.0)
+        pattern_risk += np.where(off_hours & (minute_count > 3), 0.2, 0.0)
+        pattern_risk += np.where((minute_avg > 0) & (amounts > minute_avg * 3), 0.2, 0.0)
+        pattern_risk += np.where((hour_avg > 0) & (minute_avg > hour_avg * 2), 0.3, 0.0)
+        pattern_risk = np.minimum(pattern_risk, 1.0)
+        
+        flags_count += (minute_count >= 5).astype(np.int64)
+        flags_count += (off_hours & (minute_count > 0)).astype(np.int64)
+        flags_count += (metric("minute_window_rate") > 0.5).astype(np.int64)
+        
+        weights = self.config["risk_weights"]
+        overall_risk = (
+            frequency_risk * weights["frequency_weight"] +
+            volume_risk * weights["volume_weight"] +
+            pattern_risk * weights["pattern_weight"]
+        )
+        
+        risk_level = np.select(
+            [
+                overall_risk >= thresholds.get("high_velocity_threshold", 0.8),
+                overall_risk >= thresholds.get("medium_velocity_threshold", 0.5),
+                overall_risk >= thresholds.get("low_velocity_threshold", 0.3),
+            ],
+            ["HIGH", "MEDIUM", "LOW"],
+            default="MINIMAL"
+        )
+        
+        return {
+            **velocity_metrics,
+            "velocity_risk_score": np.round(overall_risk, 4),
+            "velocity_risk_level": risk_level,
+            "frequency_risk": np.round(frequency_risk, 4),
+            "volume_risk": np.round(volume_risk, 4),
+            "pattern_risk": np.round(pattern_risk, 4),
+            "velocity_flags_count": flags_count,
+            "requires_velocity_review": overall_risk >= 0.7,
+        }
+    
     def _calculate_frequency_risk(self, velocity_metrics: Dict) -> float:
         """Calculate risk score based on transaction frequency"""
         thresholds = self.velocity_thresholds
@@ -295,7 +1161,7 @@ class VelocityMonitor:
                 risk_score += 0.3
         
         # Check for unusual timing patterns
-        current_hour = datetime.now().hour
+        current_hour = self._activity_hour(transaction_data)
         if current_hour < 6 or current_hour > 22:  # Off-hours activity
             if minute_count > 3:  # Multiple transactions during off-hours
                 risk_score += 0.2
@@ -343,7 +1209,7 @@ class VelocityMonitor:
         if minute_count >= 5:
             flags.append("BURST_PATTERN")
         
-        current_hour = datetime.now().hour
+        current_hour = self._activity_hour(transaction_data)
         if (current_hour < 6 or current_hour > 22) and minute_count > 0:
             flags.append("OFF_HOURS_ACTIVITY")
         
@@ -404,6 +1270,250 @@ class VelocityMonitor:
         }
         
         return summary
+    
+    def save_snapshot(self, path: str) -> int:
+        """
+        Write the velocity history of every customer to a binary snapshot file
+        Copies customers in chunks so scoring threads are never blocked for long
+        """
+        if self.sketch is not None:
+            raise ValueError("Snapshots hold per-key histories; the approximate mode has none")
+        
+        customer_ids, lengths, timestamps, amounts = self._collect_snapshot_histories()
+        snapshot = VelocitySnapshot.build(
+            customer_ids, lengths, timestamps, amounts, metadata=self._snapshot_metadata()
+        )
+        snapshot.write(path)
+        return len(snapshot)
+    
+    def load_snapshot(self, path: str) -> int:
+        """
+        Restore velocity history from a snapshot file written by save_snapshot
+        The file is memory-mapped and customers are rebuilt on first access
+        """
+        if self.sketch is not None:
+            raise ValueError("Snapshots hold per-key histories; the approximate mode has none")
+        
+        snapshot = VelocitySnapshot.load(path)
+        with self._lock:
+            self._attach_snapshot(snapshot)
+            self._restore_snapshot_clock(snapshot.metadata)
+        return len(snapshot)
+    
+    def _snapshot_metadata(self) -> Dict:
+        return {
+            "created_at": time.time(),
+            "time_mode": self.time_mode,
+            "event_clock": self._event_clock if np.isfinite(self._event_clock) else None,
+        }
+    
+    def _collect_snapshot_histories(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Copy (customer_ids, lengths, timestamps, amounts) of all customers, restored or not"""
+        with self._lock:
+            customer_ids = list(self.transaction_buffer.keys())
+            pending = None
+            if isinstance(self.transaction_buffer, SnapshotBackedBuffer):
+                snapshot = self.transaction_buffer.snapshot
+                pending = self.transaction_buffer.pending_indices()
+        
+        collected_ids, lengths = [], []
+        timestamps, amounts = array("d"), array("d")
+        for chunk_start in range(0, len(customer_ids), self.SNAPSHOT_CHUNK_SIZE):
+            with self._lock:
+                for customer_id in customer_ids[chunk_start:chunk_start + self.SNAPSHOT_CHUNK_SIZE]:
+                    # dict.get so a customer deleted meanwhile is not recreated or restored
+                    customer_buffer = dict.get(self.transaction_buffer, customer_id)
+                    if customer_buffer is None:
+                        continue
+                    buffer_timestamps, buffer_amounts = self._buffer_history(customer_buffer)
+                    if not buffer_timestamps:
+                        continue
+                    collected_ids.append(customer_id)
+                    lengths.append(len(buffer_timestamps))
+                    timestamps.extend(buffer_timestamps)
+                    amounts.extend(buffer_amounts)
+        
+        lengths = np.array(lengths, dtype=np.int64)
+        timestamps = np.frombuffer(timestamps, dtype=np.float64)
+        amounts = np.frombuffer(amounts, dtype=np.float64)
+        
+        # Customers never touched since the last restore are carried over from its snapshot
+        if pending is not None and len(pending):
+            pending_ids, pending_lengths, pending_timestamps, pending_amounts = snapshot.gather(pending)
+            collected_ids.extend(pending_ids)
+            lengths = np.concatenate((lengths, pending_lengths))
+            timestamps = np.concatenate((timestamps, pending_timestamps))
+            amounts = np.concatenate((amounts, pending_amounts.astype(np.float64)))
+        
+        return collected_ids, lengths, timestamps, amounts
+    
+    def _attach_snapshot(self, snapshot: VelocitySnapshot, owned: Optional[np.ndarray] = None) -> None:
+        """Back the customer buffers with a snapshot; customers already in memory take precedence"""
+        previous_buffer = self.transaction_buffer
+        self.transaction_buffer = SnapshotBackedBuffer(
+            self._create_customer_buffer, snapshot, self._restore_customer_buffer, owned
+        )
+        for customer_id, customer_buffer in previous_buffer.items():
+            self.transaction_buffer.claim(customer_id)
+            self.transaction_buffer[customer_id] = customer_buffer
+    
+    def _restore_snapshot_clock(self, metadata: Dict) -> None:
+        """Resume the event clock and watermark from an event-time snapshot"""
+        event_clock = metadata.get("event_clock")
+        if self.time_mode == "event" and event_clock is not None:
+            self._event_clock = max(self._event_clock, event_clock)
+            self._watermark = self._event_clock - self._allowed_lateness
+    
+    def _restore_customer_buffer(self, timestamps: np.ndarray, amounts: np.ndarray):
+        """Rebuild a customer buffer from snapshot history, or None if all of it has expired"""
+        customer_buffer = self._create_customer_buffer()
+        for timestamp, amount in zip(timestamps.tolist(), amounts.tolist()):
+            if self.storage_mode == "compact":
+                customer_buffer.append(timestamp, amount)
+            else:
+                self._append_standard(customer_buffer, {"transaction_amount": amount}, timestamp, amount)
+        
+        if self._evict_buffer(customer_buffer, self._eviction_time(self._now())):
+            return None
+        return customer_buffer
+    
+    def replay(self, transactions: Iterable[Dict], customer_field: str = "customer_id") -> Iterator[Dict]:
+        """
+        Stream past transactions through the monitor in event time at full CPU speed
+        Yields each transaction's velocity assessment in input order
+        """
+        if self.time_mode != "event":
+            raise ValueError("replay requires the 'event' time mode")
+        
+        for transaction_data in transactions:
+            customer_id = str(transaction_data.get(customer_field, "UNKNOWN"))
+            yield self.assess_velocity_risk(customer_id, transaction_data)
+
+
+class ShardedBufferView(Mapping):
+    """Read-only view of the per-customer buffers across all shards of a ShardedVelocityMonitor"""
+    
+    def __init__(self, monitor: "ShardedVelocityMonitor"):
+        self._monitor = monitor
+    
+    def __getitem__(self, customer_id: str):
+        customer_buffer = self._monitor.shard_for(customer_id).transaction_buffer.get(customer_id)
+        if customer_buffer is None:
+            raise KeyError(customer_id)
+        return customer_buffer
+    
+    def __iter__(self):
+        for shard in self._monitor.shards:
+            yield from list(shard.transaction_buffer.keys())
+    
+    def __len__(self) -> int:
+        return sum(len(shard.transaction_buffer) for shard in self._monitor.shards)
+
+
+class ShardedVelocityMonitor(VelocityMonitor):
+    """
+    Lock-striped velocity monitor for multi-threaded scoring
+    Hashes customer_id to one of N independently locked VelocityMonitor shards
+    and evicts incrementally, so no request stalls on a buffer-wide sweep
+    """
+    
+    def __init__(self, config_path: Optional[str] = None, storage_mode: Optional[str] = None,
+                 num_shards: int = 16, cleanup_batch_size: int = 64,
+                 time_mode: Optional[str] = None):
+        """Initialize shards sharing the same configuration"""
+        super().__init__(config_path, storage_mode, time_mode)
+        if self.storage_mode == "approximate":
+            raise ValueError("The approximate mode is already fixed-size; use a single VelocityMonitor")
+        
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        
+        # In event mode each shard keeps its own watermark over the events it owns
+        self.shards = [
+            VelocityMonitor(config_path, storage_mode, time_mode) for _ in range(num_shards)
+        ]
+        for shard in self.shards:
+            shard._cleanup_batch_size = cleanup_batch_size
+        
+        self.transaction_buffer = ShardedBufferView(self)
+    
+    def shard_for(self, customer_id: str) -> VelocityMonitor:
+        """Return the shard owning a customer (stable across processes, unlike hash())"""
+        return self.shards[zlib.crc32(str(customer_id).encode("utf-8")) % len(self.shards)]
+    
+    def record_transaction(self, customer_id: str, transaction_data: Dict,
+                           timestamp: Optional[float] = None) -> Optional[float]:
+        """Record a transaction under the owning shard's lock only"""
+        return self.shard_for(customer_id).record_transaction(customer_id, transaction_data, timestamp)
+    
+    def calculate_velocity_metrics(self, customer_id: str, current_time: Optional[float] = None) -> Dict:
+        """Calculate velocity metrics under the owning shard's lock only"""
+        return self.shard_for(customer_id).calculate_velocity_metrics(customer_id, current_time)
+    
+    def load_snapshot(self, path: str) -> int:
+        """Restore a snapshot, giving each shard the customers that route to it"""
+        snapshot = VelocitySnapshot.load(path)
+        owners = np.fromiter(
+            (zlib.crc32(customer_id) % len(self.shards) for customer_id in snapshot.customer_ids.tolist()),
+            dtype=np.int64, count=len(snapshot)
+        )
+        for shard_index, shard in enumerate(self.shards):
+            with shard._lock:
+                shard._attach_snapshot(snapshot, owners == shard_index)
+                shard._restore_snapshot_clock(snapshot.metadata)
+        return len(snapshot)
+    
+    def _snapshot_metadata(self) -> Dict:
+        metadata = super()._snapshot_metadata()
+        event_clocks = [shard._event_clock for shard in self.shards if np.isfinite(shard._event_clock)]
+        metadata["event_clock"] = max(event_clocks) if event_clocks else None
+        return metadata
+    
+    def _collect_snapshot_histories(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Collect every shard's histories, holding one shard lock at a time"""
+        customer_ids, lengths, timestamps, amounts = [], [], [], []
+        for shard in self.shards:
+            shard_ids, shard_lengths, shard_timestamps, shard_amounts = shard._collect_snapshot_histories()
+            customer_ids.extend(shard_ids)
+            lengths.append(shard_lengths)
+            timestamps.append(shard_timestamps)
+            amounts.append(shard_amounts)
+        return customer_ids, np.concatenate(lengths), np.concatenate(timestamps), np.concatenate(amounts)
+    
+    def _cleanup_old_transactions(self) -> None:
+        """Sweep every shard, holding one shard lock at a time"""
+        for shard in self.shards:
+            with shard._lock:
+                shard._cleanup_old_transactions()
+
+
+class DimensionVelocityMonitor:
+    """
+    Approximate velocity limits on entities other than the customer
+    Runs one approximate-mode VelocityMonitor per transaction field (merchant,
+    device, IP address, card BIN), each with its own thresholds, so memory stays
+    fixed no matter how many distinct merchants, devices or IPs are seen
+    """
+    
+    DEFAULT_DIMENSIONS = ("merchant_id", "device_id", "ip_address", "card_bin")
+    
+    def __init__(self, config_path: Optional[str] = None, dimensions: Optional[List[str]] = None,
+                 time_mode: Optional[str] = None):
+        """Initialize one sketch-backed monitor per dimension"""
+        self.monitors = {}
+        for dimension in dimensions or self.DEFAULT_DIMENSIONS:
+            monitor = VelocityMonitor(config_path, storage_mode="approximate", time_mode=time_mode)
+            overrides = monitor.config.get("dimension_thresholds", {}).get(dimension, {})
+            monitor.velocity_thresholds = {**monitor.velocity_thresholds, **overrides}
+            self.monitors[dimension] = monitor
+    
+    def assess_velocity_risk(self, transaction_data: Dict) -> Dict[str, Dict]:
+        """Assess velocity risk for every dimension present on the transaction"""
+        return {
+            dimension: monitor.assess_velocity_risk(str(transaction_data[dimension]), transaction_data)
+            for dimension, monitor in self.monitors.items()
+            if transaction_data.get(dimension) not in (None, "")
+        }
 
 
 def add_velocity_features_to_transaction(transaction_data: Dict, 
@@ -0,0 +1,238 @@
+"""
+Velocity Sketches Module
+Fixed-memory, approximate sliding-window velocity aggregates for
+high-cardinality keys such as merchant, device, IP address and card BIN
+"""
+
+import hashlib
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+def _hll_alpha(registers: int) -> float:
+    """HyperLogLog bias correction constant for m registers"""
+    if registers == 16:
+        return 0.673
+    if registers == 32:
+        return 0.697
+    if registers == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / registers)
+
+
+class SlidingCountMinSketch:
+    """
+    Time-bucketed Count-Min sketch of per-key transaction velocity
+
+    Each window is a ring of buckets_per_window time buckets, and each bucket
+    is a depth x width Count-Min sketch holding the transaction count, amount
+    sum, amount max and first/last timestamp of the keys hashed to each cell.
+    A window estimate merges the buckets it covers and takes the tightest row.
+    Memory is fixed by the configuration, whatever the number of keys.
+
+    Error bounds, for a window holding N transactions and amount total A:
+    - count and total amount are never underestimated. They overshoot by more
+      than e / width * N (or A) with probability at most exp(-depth).
+    - max amount is never underestimated either. It is exact unless the key
+      collides, in every row, with a key that made a larger transaction.
+    - Windows move in whole buckets. A window covers between
+      (1 - 1 / buckets_per_window) and 1 times its nominal length, so up to one
+      bucket of the oldest activity can be missed.
+    - Distinct counts are per-cell HyperLogLogs, merged across buckets. Their
+      relative standard error is about 1.04 / sqrt(hll_registers), plus the
+      same one-sided collision overshoot as the counts.
+    """
+
+    # Per-cell fields, stored together so one gather reads a key's whole cell
+    COUNT, TOTAL, MAX, LAST, FIRST = range(5)
+
+    def __init__(self, time_windows: Dict[str, float], width: int = 2048, depth: int = 4,
+                 buckets_per_window: int = 12, distinct_windows: Iterable[str] = (),
+                 hll_registers: int = 32, seed: int = 0):
+        if not 1 <= depth <= 8:
+            raise ValueError("Sketch depth must be between 1 and 8")
+        if hll_registers < 16 or hll_registers & (hll_registers - 1):
+            raise ValueError("hll_registers must be a power of two of at least 16")
+
+        self.width = width
+        self.depth = depth
+        self.buckets_per_window = buckets_per_window
+        self.hll_registers = hll_registers
+        self._hash_key = seed.to_bytes(8, "little")
+        self._rows = np.arange(depth)
+
+        # Window rings are laid out back to back: window i owns slots
+        # [i * buckets_per_window, (i + 1) * buckets_per_window)
+        self.window_names = list(time_windows)
+        self.bucket_seconds = [
+            time_windows[window_name] / buckets_per_window for window_name in self.window_names
+        ]
+        slots = len(self.window_names) * buckets_per_window
+        self._slot_bucket_seconds = np.repeat(self.bucket_seconds, buckets_per_window)
+        self._slot_windows = np.repeat(np.arange(len(self.window_names)), buckets_per_window)
+
+        self.bucket_ids = np.full(slots, np.iinfo(np.int64).min, dtype=np.int64)
+        self._empty_bucket = np.zeros((depth, width, 5))
+        self._empty_bucket[..., self.LAST] = -np.inf
+        self._empty_bucket[..., self.FIRST] = np.inf
+        self.cells = np.repeat(self._empty_bucket[None], slots, axis=0)
+
+        # Distinct-value registers only for the windows that need them
+        self.distinct_windows = {}
+        for window_name in distinct_windows:
+            if window_name not in time_windows:
+                raise ValueError(f"Unknown distinct window: {window_name}")
+            self.distinct_windows[self.window_names.index(window_name)] = (
+                len(self.distinct_windows) * buckets_per_window
+            )
+        self.registers = np.zeros(
+            (len(self.distinct_windows) * buckets_per_window, depth, width, hll_registers), dtype=np.uint8
+        )
+        self._register_bits = hll_registers.bit_length() - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.bucket_ids.nbytes + self.cells.nbytes + self.registers.nbytes
+
+    def error_bounds(self) -> Dict:
+        """Documented error bounds of this configuration"""
+        return {
+            "count_epsilon": math.e / self.width,
+            "count_delta": math.exp(-self.depth),
+            "window_coverage": 1 - 1 / self.buckets_per_window,
+            "distinct_relative_std_error": 1.04 / math.sqrt(self.hll_registers),
+        }
+
+    def _hash(self, value, size: int) -> bytes:
+        return hashlib.blake2b(str(value).encode("utf-8"), digest_size=size, key=self._hash_key).digest()
+
+    def _columns(self, key) -> np.ndarray:
+        """One cell column per row for a key"""
+        return (np.frombuffer(self._hash(key, 8 * self.depth), dtype=np.uint64)
+                % np.uint64(self.width)).astype(np.intp)
+
+    def _slot(self, window_index: int, timestamp: float) -> Optional[int]:
+        """Ring slot of the bucket holding timestamp, starting a new bucket when it has rotated"""
+        bucket_id = math.floor(timestamp / self.bucket_seconds[window_index])
+        position = bucket_id % self.buckets_per_window
+        slot = window_index * self.buckets_per_window + position
+
+        current_id = self.bucket_ids[slot]
+        if bucket_id < current_id:
+            return None  # Older than the ring still covers
+        if bucket_id > current_id:
+            self.bucket_ids[slot] = bucket_id
+            self.cells[slot] = self._empty_bucket
+            if window_index in self.distinct_windows:
+                self.registers[self.distinct_windows[window_index] + position] = 0
+        return slot
+
+    def add(self, key, timestamp: float, amount: float, distinct_value=None) -> None:
+        """Record one transaction for key"""
+        columns = self._columns(key)
+        rows = self._rows
+
+        slots = []
+        register_slots = []
+        for window_index in range(len(self.window_names)):
+            slot = self._slot(window_index, timestamp)
+            if slot is None:
+                continue
+            slots.append(slot)
+            if window_index in self.distinct_windows:
+                register_slots.append(
+                    self.distinct_windows[window_index] + slot % self.buckets_per_window
+                )
+
+        if not slots:
+            return
+
+        cells = (np.array(slots)[:, None], rows, columns)
+        block = self.cells[cells]
+        block[..., self.COUNT] += 1
+        block[..., self.TOTAL] += amount
+        np.maximum(block[..., self.MAX], amount, out=block[..., self.MAX])
+        np.maximum(block[..., self.LAST], timestamp, out=block[..., self.LAST])
+        np.minimum(block[..., self.FIRST], timestamp, out=block[..., self.FIRST])
+        self.cells[cells] = block
+
+        if register_slots and distinct_value is not None:
+            hashed = int.from_bytes(self._hash(distinct_value, 8), "little")
+            register = hashed & (self.hll_registers - 1)
+            remaining_bits = 64 - self._register_bits
+            rank = remaining_bits - (hashed >> self._register_bits).bit_length() + 1
+
+            register_cells = (np.array(register_slots)[:, None], rows, columns, register)
+            self.registers[register_cells] = np.maximum(self.registers[register_cells], rank)
+
+    def _distinct_estimate(self, registers: np.ndarray) -> float:
+        """HyperLogLog estimate per row of a (depth, m) register block, tightest row wins"""
+        registers_count = self.hll_registers
+        raw = _hll_alpha(registers_count) * registers_count ** 2 / np.sum(
+            np.exp2(-registers.astype(np.float64)), axis=1
+        )
+        zeros = np.count_nonzero(registers == 0, axis=1)
+        small = (raw <= 2.5 * registers_count) & (zeros > 0)
+        estimates = np.where(
+            small, registers_count * np.log(registers_count / np.maximum(zeros, 1)), raw
+        )
+        return float(estimates.min())
+
+    def metrics(self, key, current_time: float) -> Dict:
+        """Estimated velocity metrics for key, with the same keys as the exact windows"""
+        columns = self._columns(key)
+        rows = self._rows
+
+        # Buckets every window covers at current_time, gathered in one read
+        current_ids = np.floor(current_time / self._slot_bucket_seconds)
+        covered_slots = np.nonzero(
+            (self.bucket_ids > current_ids - self.buckets_per_window) & (self.bucket_ids <= current_ids)
+        )[0]
+
+        estimates = {}
+        if len(covered_slots):
+            block = self.cells[(covered_slots[:, None], rows, columns)]
+            slot_windows = self._slot_windows[covered_slots]
+            starts = np.concatenate(([0], np.nonzero(np.diff(slot_windows))[0] + 1))
+
+            # Merge buckets per window, then take the tightest of the depth rows
+            sums = np.add.reduceat(block[..., self.COUNT:self.TOTAL + 1], starts, axis=0).min(axis=1)
+            highs = np.maximum.reduceat(block[..., self.MAX:self.LAST + 1], starts, axis=0).min(axis=1)
+            firsts = np.minimum.reduceat(block[..., self.FIRST], starts, axis=0).max(axis=1)
+            for window_index, (count, total), (max_amount, last), first in zip(
+                slot_windows[starts].tolist(), sums.tolist(), highs.tolist(), firsts.tolist()
+            ):
+                estimates[window_index] = (int(count), total, max_amount, last - first)
+
+        velocity_metrics = {}
+        for window_index, window_name in enumerate(self.window_names):
+            count, total, max_amount, time_span = estimates.get(window_index, (0, 0, 0, 0))
+            if not count:
+                velocity_metrics.update({
+                    f"{window_name}_count": 0,
+                    f"{window_name}_total_amount": 0,
+                    f"{window_name}_avg_amount": 0,
+                    f"{window_name}_max_amount": 0,
+                    f"{window_name}_rate": 0,
+                })
+            else:
+                velocity_metrics.update({
+                    f"{window_name}_count": count,
+                    f"{window_name}_total_amount": total,
+                    f"{window_name}_avg_amount": total / count,
+                    f"{window_name}_max_amount": max_amount,
+                    f"{window_name}_rate": count / max(time_span, 1) if time_span > 0 else count,
+                })
+
+            if window_index in self.distinct_windows:
+                distinct = 0.0
+                if count:
+                    positions = covered_slots[self._slot_windows[covered_slots] == window_index]
+                    register_slots = self.distinct_windows[window_index] + positions % self.buckets_per_window
+                    merged = self.registers[(register_slots[:, None], rows, columns)].max(axis=0)
+                    distinct = self._distinct_estimate(merged)
+                velocity_metrics[f"{window_name}_distinct_count"] = int(round(distinct))
+
+        return velocity_metrics
@@ -0,0 +1,280 @@
+"""
+Velocity Snapshot Module
+Binary, memory-mappable snapshots of per-customer velocity history so a
+restarted API process does not begin with every customer's windows empty
+"""
+
+import json
+import logging
+import mmap
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"VELSNAP1"
+SNAPSHOT_VERSION = 1
+_HEADER_PREFIX = 16  # magic + little-endian uint64 header length
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class VelocitySnapshot:
+    """
+    Per-customer (timestamp, amount) histories stored as flat arrays
+    customer_ids is sorted, so a customer is found by binary search and its
+    history is timestamps/amounts[offsets[i]:offsets[i + 1]]. Loaded snapshots
+    are views over a read-only mmap, so opening one costs no parsing or copying
+    """
+
+    ARRAY_NAMES = ("customer_ids", "offsets", "timestamps", "amounts")
+
+    def __init__(self, customer_ids: np.ndarray, offsets: np.ndarray, timestamps: np.ndarray,
+                 amounts: np.ndarray, metadata: Optional[Dict] = None):
+        self.customer_ids = customer_ids
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.metadata = metadata or {}
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    @property
+    def transaction_count(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def build(cls, customer_ids: List[str], lengths: np.ndarray, timestamps: np.ndarray,
+              amounts: np.ndarray, metadata: Optional[Dict] = None) -> "VelocitySnapshot":
+        """
+        Build a snapshot from histories concatenated in customer_ids order
+        lengths[i] is the number of transactions belonging to customer_ids[i]
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        amounts = np.asarray(amounts)
+        if (len(lengths) != len(customer_ids) or lengths.sum() != len(timestamps)
+                or len(timestamps) != len(amounts)):
+            raise ValueError("Snapshot customer lengths do not match the history arrays")
+
+        encoded_ids = np.array([str(customer_id).encode("utf-8") for customer_id in customer_ids],
+                               dtype=bytes)
+        if not len(encoded_ids):
+            encoded_ids = np.empty(0, dtype="S1")
+        order = np.argsort(encoded_ids, kind="stable")
+        if len(order) > 1 and np.any(encoded_ids[order][1:] == encoded_ids[order][:-1]):
+            raise ValueError("Snapshot customer ids must be unique")
+
+        # Gather each customer's history into sorted-id order
+        source_offsets = np.concatenate(([0], np.cumsum(lengths)))
+        sorted_lengths = lengths[order]
+        offsets = np.concatenate(([0], np.cumsum(sorted_lengths))).astype(np.int64)
+        positions = (
+            np.repeat(source_offsets[:-1][order] - offsets[:-1], sorted_lengths)
+            + np.arange(offsets[-1], dtype=np.int64)
+        )
+
+        return cls(encoded_ids[order], offsets, timestamps[positions], amounts[positions], metadata)
+
+    def index_of(self, customer_id: str) -> Optional[int]:
+        """Position of a customer in the snapshot, or None if it is not present"""
+        key = str(customer_id).encode("utf-8")
+        if len(key) > self.customer_ids.dtype.itemsize:
+            return None
+
+        index = int(np.searchsorted(self.customer_ids, key))
+        if index < len(self.customer_ids) and self.customer_ids[index] == key:
+            return index
+        return None
+
+    def history(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (timestamps, amounts) arrays of the customer at index"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.timestamps[start:end], self.amounts[start:end]
+
+    def last_timestamps(self) -> np.ndarray:
+        """Most recent timestamp of every customer (-inf for an empty history)"""
+        last = np.full(len(self), -np.inf)
+        non_empty = self.offsets[1:] > self.offsets[:-1]
+        last[non_empty] = self.timestamps[self.offsets[1:][non_empty] - 1]
+        return last
+
+    def gather(self, indices: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Return (customer_ids, lengths, timestamps, amounts) for a subset of customers"""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1], dtype=np.int64)
+
+        customer_ids = [customer_id.decode("utf-8") for customer_id in self.customer_ids[indices]]
+        return customer_ids, lengths, self.timestamps[positions], self.amounts[positions]
+
+    def write(self, path: str) -> None:
+        """Write the snapshot atomically: readers see the old file or the complete new one"""
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in self.ARRAY_NAMES}
+
+        layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            layout[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+            offset = _aligned(offset + values.nbytes)
+
+        header = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "arrays": layout,
+            "metadata": self.metadata,
+        }).encode("utf-8")
+        data_start = _aligned(_HEADER_PREFIX + len(header))
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, values in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(values.tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "VelocitySnapshot":
+        """Open a snapshot as read-only views over a memory map of the file"""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a velocity snapshot: {path}")
+        header_length = int.from_bytes(buffer[len(SNAPSHOT_MAGIC):_HEADER_PREFIX], "little")
+        header = json.loads(buffer[_HEADER_PREFIX:_HEADER_PREFIX + header_length])
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported velocity snapshot version: {header.get('version')}")
+
+        data_start = _aligned(_HEADER_PREFIX + header_length)
+        arrays = {}
+        for name in cls.ARRAY_NAMES:
+            spec = header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            arrays[name] = np.frombuffer(
+                buffer, dtype=dtype, count=count, offset=data_start + spec["offset"]
+            ).reshape(spec["shape"])
+
+        return cls(metadata=header.get("metadata", {}), **arrays)
+
+
+class SnapshotBackedBuffer(defaultdict):
+    """
+    Per-customer buffer dict that restores customers from a snapshot on first access
+    Loading a snapshot is then O(1); each customer is rebuilt by the restore
+    callback the first time it is read or written. Iteration and len() cover
+    customers already restored; pending_count gives the ones not yet touched
+    """
+
+    def __init__(self, default_factory: Callable, snapshot: VelocitySnapshot,
+                 restore: Callable[[np.ndarray, np.ndarray], Optional[object]],
+                 owned: Optional[np.ndarray] = None):
+        super().__init__(default_factory)
+        self.snapshot = snapshot
+        self._restore = restore
+        # Snapshot customers already restored, expired or owned by another buffer
+        self._claimed = np.zeros(len(snapshot), dtype=bool) if owned is None else ~owned
+        self.pending_count = int(len(snapshot) - self._claimed.sum())
+        self._claim_lock = threading.Lock()
+
+    def claim(self, customer_id) -> Optional[int]:
+        """Mark a pending customer as taken, returning its snapshot position"""
+        index = self.snapshot.index_of(customer_id)
+        if index is None:
+            return None
+
+        with self._claim_lock:
+            if self._claimed[index]:
+                return None
+            self._claimed[index] = True
+            self.pending_count -= 1
+        return index
+
+    def _take(self, customer_id):
+        """Restore a pending customer, or return None if the snapshot has nothing for it"""
+        index = self.claim(customer_id)
+        if index is None:
+            return None
+
+        customer_buffer = self._restore(*self.snapshot.history(index))
+        if customer_buffer is not None:
+            self[customer_id] = customer_buffer
+        return customer_buffer
+
+    def __missing__(self, customer_id):
+        customer_buffer = self._take(customer_id)
+        if customer_buffer is None:
+            return super().__missing__(customer_id)
+        return customer_buffer
+
+    def get(self, customer_id, default=None):
+        if dict.__contains__(self, customer_id):
+            return dict.__getitem__(self, customer_id)
+        customer_buffer = self._take(customer_id)
+        return default if customer_buffer is None else customer_buffer
+
+    def __contains__(self, customer_id) -> bool:
+        if dict.__contains__(self, customer_id):
+            return True
+        index = self.snapshot.index_of(customer_id)
+        return index is not None and not self._claimed[index]
+
+    def pending_indices(self) -> np.ndarray:
+        """Snapshot positions of customers not restored yet"""
+        with self._claim_lock:
+            return np.nonzero(~self._claimed)[0]
+
+    def expire_pending(self, cutoff_time: float) -> int:
+        """Drop pending customers whose latest transaction is older than cutoff_time"""
+        with self._claim_lock:
+            expired = ~self._claimed & (self.snapshot.last_timestamps() < cutoff_time)
+            self._claimed |= expired
+            count = int(expired.sum())
+            self.pending_count -= count
+        return count
+
+
+class PeriodicSnapshotWriter(threading.Thread):
+    """Background thread that snapshots a monitor every interval_seconds and once on stop"""
+
+    def __init__(self, monitor, path: str, interval_seconds: float = 60.0):
+        super().__init__(name="velocity-snapshot-writer", daemon=True)
+        self.monitor = monitor
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            self.write_snapshot()
+
+    def write_snapshot(self) -> None:
+        try:
+            customers = self.monitor.save_snapshot(self.path)
+            logger.info(f"💾 Wrote velocity snapshot of {customers} customers to {self.path}")
+        except Exception as e:
+            logger.error(f"Error writing velocity snapshot: {e}")
+
+    def stop(self, final_snapshot: bool = True) -> None:
+        """Stop the thread and, by default, write one last snapshot"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        if final_snapshot:
+            self.write_snapshot()
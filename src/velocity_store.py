@@ -0,0 +1,272 @@
+"""
+Shared Velocity Store Module
+Serves one host-wide velocity state to every API worker process over a
+Unix domain socket, so customers are not split across per-worker monitors
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+# Imported as part of the src package or, by scripts and tests, with src/ on sys.path
+try:
+    from .velocity_monitoring import ShardedVelocityMonitor, VelocityMonitor
+    from .velocity_snapshot import PeriodicSnapshotWriter
+except ImportError:
+    from velocity_monitoring import ShardedVelocityMonitor, VelocityMonitor
+    from velocity_snapshot import PeriodicSnapshotWriter
+
+logger = logging.getLogger(__name__)
+
+
+class VelocityStoreError(RuntimeError):
+    """Raised when the shared velocity store rejects or cannot serve a request"""
+
+
+class _VelocityStoreHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON requests from one worker connection"""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = self.server.dispatch(request.pop("op"), request)
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class VelocityStoreServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Owns the velocity windows for all workers on a host
+    Each worker connection is served by its own thread; the lock-striped
+    ShardedVelocityMonitor keeps concurrent customers from contending
+    """
+
+    daemon_threads = True
+
+    # Results of recent recording requests, kept so a retried request is answered without recording twice
+    COMPLETED_REQUESTS = 65536
+
+    def __init__(self, socket_path: str, monitor: Optional[VelocityMonitor] = None):
+        self.monitor = monitor or ShardedVelocityMonitor()
+        self.socket_path = socket_path
+        self._completed = OrderedDict()
+        self._completed_lock = threading.Lock()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _VelocityStoreHandler)
+
+    def dispatch(self, op: str, params: Dict):
+        """Run one store operation, answering a repeated request_id from the completed results"""
+        request_id = params.get("request_id")
+        if request_id is None:
+            return self._dispatch(op, params)
+
+        with self._completed_lock:
+            if request_id in self._completed:
+                return self._completed[request_id]
+        result = self._dispatch(op, params)
+        with self._completed_lock:
+            self._completed[request_id] = result
+            if len(self._completed) > self.COMPLETED_REQUESTS:
+                self._completed.popitem(last=False)
+        return result
+
+    def _dispatch(self, op: str, params: Dict):
+        """Run one store operation against the shared monitor"""
+        monitor = self.monitor
+        if op == "record_and_calculate":
+            return monitor.record_and_calculate(params["customer_id"], params["transaction"])
+        if op == "record":
+            return monitor.record_transaction(
+                params["customer_id"], params["transaction"], params.get("timestamp")
+            )
+        if op == "metrics":
+            return monitor.calculate_velocity_metrics(params["customer_id"], params.get("current_time"))
+        if op == "save_snapshot":
+            return monitor.save_snapshot(params["path"])
+        if op == "load_snapshot":
+            return monitor.load_snapshot(params["path"])
+        if op == "stats":
+            return {"customers": len(monitor.transaction_buffer), "time_mode": monitor.time_mode}
+        raise ValueError(f"Unknown velocity store operation: {op}")
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class SharedVelocityMonitor(VelocityMonitor):
+    """
+    VelocityMonitor whose windows live in one or more VelocityStoreServers
+    Risk scoring still runs in the calling process; only recording and the
+    window metrics cross the socket, in one round trip per assessment. With
+    several stores, customers are partitioned across them by a stable hash so
+    the stores are not a single-core bottleneck for many workers
+    """
+
+    def __init__(self, socket_paths: Union[str, List[str]], config_path: Optional[str] = None,
+                 time_mode: Optional[str] = None, timeout: float = 5.0):
+        """Initialize scoring configuration and lazily connect to the stores"""
+        super().__init__(config_path, time_mode=time_mode)
+        if isinstance(socket_paths, str):
+            socket_paths = socket_paths.split(",")
+        self.socket_paths = list(socket_paths)
+        self.timeout = timeout
+        self._connections = threading.local()
+
+    def store_for(self, customer_id: str) -> int:
+        """Index of the store owning a customer (same hash as ShardedVelocityMonitor)"""
+        return zlib.crc32(str(customer_id).encode("utf-8")) % len(self.socket_paths)
+
+    def _connection(self, store: int):
+        connections = getattr(self._connections, "files", None)
+        if connections is None:
+            connections = self._connections.files = {}
+
+        connection = connections.get(store)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_paths[store])
+            connection = connections[store] = sock.makefile("rwb")
+        return connection
+
+    def _call(self, op: str, store: int = 0, **params):
+        """
+        Send one request on this thread's connection, reconnecting and retrying once
+        if it went stale. A pooled socket to a restarted store usually only fails
+        once the response is read, so the whole round trip is retried; recording
+        requests carry a request_id the store uses to answer a retry without
+        recording the transaction again
+        """
+        socket_path = self.socket_paths[store]
+        payload = json.dumps({"op": op, **params}).encode("utf-8") + b"\n"
+        for attempt in range(2):
+            try:
+                connection = self._connection(store)
+                connection.write(payload)
+                connection.flush()
+                line = connection.readline()
+            except OSError as e:
+                line, error = b"", e
+            else:
+                error = None
+            if line:
+                break
+
+            self._connections.files.pop(store, None)
+            if attempt:
+                if error is not None:
+                    raise VelocityStoreError(f"Velocity store unavailable at {socket_path}: {error}")
+                raise VelocityStoreError(f"Velocity store at {socket_path} dropped a {op} request")
+
+        response = json.loads(line)
+        if not response["ok"]:
+            raise VelocityStoreError(response["error"])
+        return response["result"]
+
+    def _store_transaction(self, transaction_data: Dict) -> Dict:
+        """Only the fields the windows need are sent to the store"""
+        transaction = {"transaction_amount": float(transaction_data.get("transaction_amount", 0))}
+        if self.time_mode == "event":
+            transaction[self._timestamp_field] = self.event_time(transaction_data)
+        return transaction
+
+    def record_transaction(self, customer_id: str, transaction_data: Dict,
+                           timestamp: Optional[float] = None) -> Optional[float]:
+        """Record a transaction in the shared store"""
+        if timestamp is None and self.time_mode == "processing":
+            timestamp = time.time()
+        return self._call("record", self.store_for(customer_id), customer_id=str(customer_id),
+                          transaction=self._store_transaction(transaction_data), timestamp=timestamp,
+                          request_id=uuid.uuid4().hex)
+
+    def calculate_velocity_metrics(self, customer_id: str, current_time: Optional[float] = None) -> Dict:
+        """Calculate velocity metrics from the shared store"""
+        return self._call("metrics", self.store_for(customer_id),
+                          customer_id=str(customer_id), current_time=current_time)
+
+    def record_and_calculate(self, customer_id: str, transaction_data: Dict) -> Dict:
+        """Record and calculate in a single round trip to the shared store"""
+        return self._call("record_and_calculate", self.store_for(customer_id),
+                          customer_id=str(customer_id),
+                          transaction=self._store_transaction(transaction_data),
+                          request_id=uuid.uuid4().hex)
+
+    def _store_snapshot_path(self, path: str, store: int) -> str:
+        """One snapshot file per store; a single store keeps the path as given"""
+        path = os.path.abspath(path)
+        return path if len(self.socket_paths) == 1 else f"{path}.{store}"
+
+    def save_snapshot(self, path: str) -> int:
+        """Have each store write a snapshot of its share of the state"""
+        return sum(
+            self._call("save_snapshot", store, path=self._store_snapshot_path(path, store))
+            for store in range(len(self.socket_paths))
+        )
+
+    def load_snapshot(self, path: str) -> int:
+        """Have each store restore its share of the state"""
+        return sum(
+            self._call("load_snapshot", store, path=self._store_snapshot_path(path, store))
+            for store in range(len(self.socket_paths))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve shared velocity windows to API workers")
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    parser.add_argument("--config", default=None, help="Velocity monitoring config JSON")
+    parser.add_argument("--shards", type=int, default=16, help="Lock stripes in the store")
+    parser.add_argument("--time-mode", default=None, choices=VelocityMonitor.TIME_MODES)
+    parser.add_argument("--snapshot", default=None, help="Snapshot file to restore and keep updated")
+    parser.add_argument("--snapshot-interval", type=float, default=60.0,
+                        help="Seconds between snapshots")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    monitor = ShardedVelocityMonitor(args.config, num_shards=args.shards, time_mode=args.time_mode)
+    writer = None
+    if args.snapshot:
+        if os.path.exists(args.snapshot):
+            customers = monitor.load_snapshot(args.snapshot)
+            logger.info(f"⚡ Restored velocity history for {customers} customers from {args.snapshot}")
+        writer = PeriodicSnapshotWriter(monitor, args.snapshot, args.snapshot_interval)
+        writer.start()
+
+    server = VelocityStoreServer(args.socket, monitor)
+
+    # serve_forever runs in this thread, so shut it down from a helper thread on SIGTERM
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+
+    logger.info(f"🔌 Velocity store listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if writer is not None:
+            writer.stop()
+        logger.info("👋 Velocity store stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Shared test fixtures
+Small fitted models saved to a models directory the way model_training does
+"""
+
+import json
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+MODEL_FEATURES = 82
+
+
+def _fit_models(model_names):
+    """Fit the named models on synthetic features whose first column plays the transaction amount"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, MODEL_FEATURES))
+    X[:, 0] = rng.lognormal(4, 1, size=300)
+    y = (X[:, 0] > 100).astype(int)
+    scaler = StandardScaler().fit(X)
+
+    builders = {
+        "random_forest": lambda: RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y),
+        "logistic_regression": lambda: LogisticRegression(max_iter=500).fit(scaler.transform(X), y),
+        "isolation_forest": lambda: IsolationForest(n_estimators=10, random_state=0).fit(X),
+    }
+    return {name: builders[name]() for name in model_names}, {"standard": scaler}
+
+
+@pytest.fixture
+def write_models():
+    """
+    Factory saving small fitted models, uncompressed with their scaler and
+    metadata, to a models directory; returns the fitted models and scalers
+    """
+    def write(models_dir, model_names=("random_forest", "logistic_regression", "isolation_forest"),
+              f1_scores=None, thresholds=None):
+        fitted, scalers = _fit_models(model_names)
+        thresholds = thresholds or {}
+
+        models_dir.mkdir(exist_ok=True)
+        for model_name, model in fitted.items():
+            joblib.dump(model, models_dir / f"{model_name}_model.pkl", compress=0)
+        joblib.dump(scalers, models_dir / "scalers.pkl", compress=0)
+        (models_dir / "model_metadata.json").write_text(json.dumps({
+            "models": {
+                name: {"type": type(model).__name__, "threshold": thresholds.get(name, 0.5),
+                       "file_path": f"{name}_model.pkl"}
+                for name, model in fitted.items()
+            },
+            "performance_summary": {name: {"f1_score": score} for name, score in (f1_scores or {}).items()},
+        }))
+        return fitted, scalers
+
+    return write
@@ -7,6 +7,9 @@ import sys
 import os
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
@@ -105,6 +108,51 @@ class TestAMLCompliance:
         assert result["sanctions_risk_score"] == 0.0  # Should be clean
         assert len(result["sanctions_flags"]) == 0
         
+    def test_sanctions_screening_match(self):
+        """Test listed names match anywhere in the name fields, whatever their case"""
+        result = self.aml_checker.check_sanctions_screening({
+            "customer_name": "Acme sanctioned_entity_1 Holdings",
+            "location": "BLOCKED_COUNTRY_CODE-7"
+        })
+        
+        assert result["sanctions_risk_score"] == 1.0
+        assert result["sanctions_flags"] == ["SANCTIONS_MATCH", "SANCTIONS_LOCATION"]
+        
+    def test_sanctions_reload(self):
+        """Test reloading the sanctions list replaces the screened names"""
+        version = self.aml_checker.sanctions_version
+        assert self.aml_checker.reload_sanctions(["Ivan Petrov", "ivan petrov", ""]) == 1
+        
+        flagged = self.aml_checker.check_sanctions_screening({"merchant_name": "IVAN PETROV LLC"})
+        cleared = self.aml_checker.check_sanctions_screening({"customer_name": "SANCTIONED_ENTITY_1"})
+        
+        assert flagged["sanctions_flags"] == ["SANCTIONS_MATCH"]
+        assert cleared["sanctions_risk_score"] == 0.0
+        assert self.aml_checker.sanctions_version != version
+        
+    def test_sanctions_screening_fuzzy_match(self):
+        """Test near spellings of listed names are flagged with match details"""
+        self.aml_checker.reload_sanctions(["Ivan Petrov"])
+        
+        result = self.aml_checker.check_sanctions_screening({"customer_name": "Iwan Petrov"})
+        overall = self.aml_checker.calculate_overall_aml_risk({"customer_name": "Iwan Petrov"})
+        
+        assert result["sanctions_flags"] == ["SANCTIONS_FUZZY_MATCH"]
+        assert result["sanctions_matches"][0]["field"] == "customer_name"
+        assert result["sanctions_matches"][0]["listed_name"] == "IVAN PETROV"
+        assert 0.75 < result["sanctions_risk_score"] < 1.0
+        assert overall["requires_manual_review"]
+        assert overall["aml_sanctions_matches"] == result["sanctions_matches"]
+        
+    def test_rescreen_names(self):
+        """Test batch rescreening returns fuzzy matches per name"""
+        self.aml_checker.reload_sanctions(["Ivan Petrov"])
+        
+        results = self.aml_checker.rescreen_names(["Ivan Petrow", "John Doe"])
+        
+        assert results[0][0]["listed_name"] == "IVAN PETROV"
+        assert results[1] == []
+        
     def test_overall_aml_risk_calculation(self):
         """Test overall AML risk calculation"""
         transaction_data = {
@@ -258,6 +306,53 @@ class TestAMLCompliance:
                 assert result["aml_risk_level"] == case["expected_level"]
 
 
+class TestAMLRiskFrame:
+    """Test the vectorized AML rules against the per-transaction path"""
+    
+    def setup_method(self):
+        """Checker with a fuzzy-matchable name and no latency budget to hit"""
+        self.aml_checker = AMLComplianceChecker()
+        self.aml_checker.config["fuzzy_sanctions"]["budget_ms"] = 10000
+        self.aml_checker.reload_sanctions(["SANCTIONED_ENTITY_1", "BLOCKED_COUNTRY_CODE", "Ivan Petrov"])
+        
+    def test_frame_matches_scalar_path(self):
+        """Test every row's scores, level, flags and review match calculate_overall_aml_risk"""
+        rng = np.random.default_rng(0)
+        edge_amounts = [0, 999, 1111, 5555, 7777.9, 8000, 9999.99, 10000, 55555, 60000, -1111,
+                        111111111111111, 1e15 + 1, 50000.5]
+        n_rows = 400
+        df = pd.DataFrame({
+            "transaction_amount": np.where(rng.random(n_rows) < 0.5, rng.choice(edge_amounts, n_rows),
+                                           np.round(rng.uniform(0, 100000, n_rows), 2)),
+            "transaction_hour": rng.integers(0, 24, n_rows),
+            "merchant_category": rng.choice(["GAMBLING", "grocery", "MONEY_TRANSFER"], n_rows),
+            "location": rng.choice(["US", "offshore island", "BLOCKED_COUNTRY_CODE-1", "DOMESTIC"], n_rows),
+            "customer_name": rng.choice(["John Doe", "Iwan Petrov", "acme sanctioned_entity_1"], n_rows),
+            "merchant_name": rng.choice(["Shop", "Ivan Petrow Ltd"], n_rows),
+        }, index=np.arange(n_rows) * 3)
+        
+        frame = self.aml_checker.calculate_overall_aml_risk_frame(df)
+        
+        assert frame.index.equals(df.index)
+        for (_, row), (_, result) in zip(df.iterrows(), frame.iterrows()):
+            expected = self.aml_checker.calculate_overall_aml_risk(row.to_dict(), [], [])
+            assert result["aml_overall_risk_score"] == expected["aml_overall_risk_score"]
+            assert result["aml_risk_level"] == expected["aml_risk_level"]
+            assert self.aml_checker.decode_aml_flags(result["aml_flags_mask"]) == expected["aml_flags"]
+            assert result["aml_flags_count"] == len(expected["aml_flags"])
+            assert result["requires_manual_review"] == expected["requires_manual_review"]
+            for component, score in expected["aml_component_scores"].items():
+                assert result[component] == score
+        
+    def test_missing_columns_use_defaults(self):
+        """Test absent columns take the scalar path's defaults"""
+        frame = self.aml_checker.calculate_overall_aml_risk_frame(pd.DataFrame({"transaction_amount": [9100.0, 50.0]}))
+        
+        assert frame["aml_flags_mask"].tolist() == [1, 0]
+        assert frame["aml_risk_level"].tolist() == ["MINIMAL", "MINIMAL"]
+        assert len(self.aml_checker.history_store) == 0
+
+
 def test_aml_integration_availability():
     """Test that AML integration is available and working"""
     try:
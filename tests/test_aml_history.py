@@ -0,0 +1,163 @@
+"""
+Tests for the AML History store
+Window counts and totals, retention, retries, parsed caller history and
+checker integration
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aml_compliance import AMLComplianceChecker
+from aml_history import AMLHistoryStore, history_arrays
+from timestamps import to_epoch_seconds
+
+HOUR = 3600.0
+
+
+class TestAMLHistoryStore:
+    """Test per-customer window aggregates"""
+
+    def setup_method(self):
+        """Create a store with a one-day retention"""
+        self.store = AMLHistoryStore(retention_seconds=24 * HOUR)
+
+    def test_window_count_and_total(self):
+        """Test windows count transactions from the window start through its end"""
+        for hours_ago, amount in [(30, 1.0), (20, 10.0), (5, 100.0), (1, 1000.0)]:
+            self.store.record("C1", amount, timestamp=100 * HOUR - hours_ago * HOUR)
+
+        assert self.store.window("C1", 24 * HOUR, end_time=100 * HOUR) == (3, 1110.0)
+        assert self.store.window("C1", 6 * HOUR, end_time=100 * HOUR) == (2, 1100.0)
+        assert self.store.window("C1", 6 * HOUR, end_time=99 * HOUR) == (2, 1100.0)
+        assert self.store.window("C2", 24 * HOUR, end_time=100 * HOUR) == (0, 0.0)
+
+    def test_out_of_order_arrivals(self):
+        """Test a late transaction lands in time order with correct totals"""
+        for timestamp, amount in [(10.0, 1.0), (30.0, 4.0), (20.0, 2.0)]:
+            self.store.record("C1", amount, timestamp=timestamp)
+
+        assert self.store.window("C1", 15.0, end_time=30.0) == (2, 6.0)
+        assert list(self.store.customers["C1"].timestamps) == [10.0, 20.0, 30.0]
+
+    def test_retention_bounds_memory(self):
+        """Test expired transactions, capped customers and idle customers are dropped"""
+        store = AMLHistoryStore(retention_seconds=10.0, max_transactions_per_customer=3)
+        for timestamp in range(20):
+            store.record("C1", 1.0, timestamp=float(timestamp))
+        assert len(store.customers["C1"]) == 3
+        assert len(store.customers["C1"].timestamps) < 20
+
+        store.SWEEP_EVERY = 1
+        store.record("C2", 1.0, timestamp=100.0)
+        assert list(store.customers) == ["C2"]
+
+    def test_retried_transaction_counted_once(self):
+        """Test a transaction_id recorded twice is kept once and can be excluded"""
+        assert self.store.record("C1", 50.0, timestamp=1.0, transaction_id="T1")
+        assert not self.store.record("C1", 50.0, timestamp=2.0, transaction_id="T1")
+
+        assert self.store.window("C1", HOUR, end_time=10.0) == (1, 50.0)
+        assert self.store.window("C1", HOUR, end_time=10.0, exclude_id="T1") == (0, 0.0)
+
+    def test_to_epoch_seconds(self):
+        """Test timestamps of every supported form convert to the same epoch"""
+        moment = datetime(2025, 9, 7, 10, 0, tzinfo=timezone.utc)
+        assert to_epoch_seconds("2025-09-07T10:00:00Z") == moment.timestamp()
+        assert to_epoch_seconds("2025-09-07T12:00:00+02:00") == moment.timestamp()
+        assert to_epoch_seconds(moment.replace(tzinfo=None)) == moment.timestamp()
+        assert to_epoch_seconds(str(moment.timestamp())) == moment.timestamp()
+        with pytest.raises(ValueError):
+            to_epoch_seconds(None)
+
+    def test_history_arrays(self):
+        """Test caller history parses to time-sorted epochs, dropping bad timestamps"""
+        timestamps, amounts = history_arrays([
+            {"timestamp": "2025-09-07T10:00:00Z", "transaction_amount": 2.0},
+            {"timestamp": "not a time", "transaction_amount": 5.0},
+            {"transaction_amount": 7.0},
+            {"timestamp": "2025-09-07T11:00:00+02:00", "transaction_amount": 1.0},
+        ])
+
+        start = datetime(2025, 9, 7, 9, 0, tzinfo=timezone.utc).timestamp()
+        assert timestamps.tolist() == [start, start + HOUR]
+        assert amounts.tolist() == [1.0, 2.0]
+
+
+class TestCheckerHistory:
+    """Test the AML window rules consult the history store"""
+
+    def setup_method(self):
+        """Create a checker with its default history store"""
+        self.aml_checker = AMLComplianceChecker()
+        self.start = datetime(2025, 9, 7, 8, 0, tzinfo=timezone.utc)
+
+    def transaction(self, minutes: int, amount: float, transaction_id: str) -> dict:
+        return {"customer_id": "C1", "transaction_amount": amount, "transaction_id": transaction_id,
+                "timestamp": (self.start + timedelta(minutes=minutes)).isoformat()}
+
+    def test_structuring_from_recorded_history(self):
+        """Test split deposits over a day are flagged without caller-supplied history"""
+        results = [
+            self.aml_checker.calculate_overall_aml_risk(self.transaction(30 * idx, 3000, f"T{idx}"), record=True)
+            for idx in range(4)
+        ]
+
+        assert "MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD" not in results[2]["aml_flags"]
+        assert "MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD" in results[3]["aml_flags"]
+
+    def test_rapid_movement_from_recorded_history(self):
+        """Test a sixth transaction within hours is flagged as high frequency"""
+        for idx in range(5):
+            self.aml_checker.calculate_overall_aml_risk(self.transaction(idx, 100, f"T{idx}"), record=True)
+
+        result = self.aml_checker.check_rapid_movement(self.transaction(10, 100, "T5"))
+        retry = self.aml_checker.check_rapid_movement(self.transaction(4, 100, "T4"))
+
+        assert "HIGH_FREQUENCY_TRANSACTIONS" in result["rapid_movement_flags"]
+        assert "HIGH_FREQUENCY_TRANSACTIONS" not in retry["rapid_movement_flags"]
+
+    def test_caller_history_with_mixed_timezones(self):
+        """Test aware, naive and 'Z' history timestamps all count against the transaction time"""
+        history = [
+            {"transaction_amount": 4000, "timestamp": "2025-09-07T07:30:00Z"},
+            {"transaction_amount": 4000, "timestamp": "2025-09-07T09:00:00+02:00"},
+            {"transaction_amount": 4000, "timestamp": "2025-09-07T06:00:00"},
+            {"transaction_amount": 4000, "timestamp": "2025-09-05T06:00:00Z"},
+        ]
+
+        structuring = self.aml_checker.check_structuring(self.transaction(0, 100, "T9"), history)
+        rapid = self.aml_checker.check_rapid_movement(self.transaction(0, 100, "T9"), history)
+        overall = self.aml_checker.calculate_overall_aml_risk(self.transaction(0, 100, "T9"), history, history)
+
+        assert "MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD" in structuring["structuring_flags"]
+        assert rapid["rapid_movement_flags"] == []
+        assert "MULTIPLE_TRANSACTIONS_ABOVE_THRESHOLD" in overall["aml_flags"]
+
+    def test_recording_is_opt_in(self):
+        """Test assessments only add the transaction to the store when asked to"""
+        self.aml_checker.calculate_overall_aml_risk(self.transaction(0, 100, "T0"))
+        self.aml_checker.calculate_overall_aml_risk(self.transaction(1, 100, "T1"), transaction_history=[])
+        assert len(self.aml_checker.history_store) == 0
+
+        self.aml_checker.calculate_overall_aml_risk(self.transaction(2, 100, "T2"), record=True)
+        assert len(self.aml_checker.history_store) == 1
+        assert not self.aml_checker.stateless
+        assert self.aml_checker.reads_history(self.transaction(3, 100, "T3"))
+        assert not self.aml_checker.reads_history({"transaction_amount": 100})
+
+    def test_history_store_can_be_disabled(self, tmp_path):
+        """Test a config without the history store keeps assessments stateless"""
+        config_path = tmp_path / "aml.json"
+        config_path.write_text('{"history_store": {"enabled": false}}')
+
+        aml_checker = AMLComplianceChecker(str(config_path))
+        aml_checker.calculate_overall_aml_risk(self.transaction(0, 100, "T0"), record=True)
+
+        assert aml_checker.history_store is None
+        assert aml_checker.stateless
@@ -0,0 +1,204 @@
+"""
+Tests for Request Micro-Batching
+Coalescing concurrent /predict requests into batched scoring calls
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.batching import MicroBatcher
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestMicroBatcher:
+    """Test batching, flushing and failure isolation"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.batches = []
+
+    def double(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+    def test_concurrent_requests_share_batches(self):
+        """Test concurrent submissions are scored together and each gets its own result"""
+        async def scenario():
+            batcher = MicroBatcher(self.double, max_batch_size=16, max_wait_ms=50)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(idx) for idx in range(40)))
+            await batcher.stop()
+            return results, batcher
+
+        results, batcher = _run(scenario())
+        assert results == [idx * 2 for idx in range(40)]
+        assert [len(batch) for batch in self.batches] == [16, 16, 8]
+        assert batcher.get_metrics()["batch_size_distribution"] == {"5-8": 1, "9-16": 2}
+
+    def test_flushes_after_max_wait(self):
+        """Test a lone request is scored once max_wait_ms has passed"""
+        async def scenario():
+            batcher = MicroBatcher(self.double, max_batch_size=64, max_wait_ms=20)
+            await batcher.start()
+            result = await asyncio.wait_for(batcher.submit(21), timeout=1)
+            metrics = batcher.get_metrics()
+            await batcher.stop()
+            return result, metrics
+
+        result, metrics = _run(scenario())
+        assert result == 42
+        assert metrics["batches"] == 1
+        assert metrics["batch_size_distribution"] == {"1": 1}
+        assert 15 <= metrics["queue_delay_ms"]["max"] < 500
+
+    def test_bad_item_fails_alone(self):
+        """Test an exception returned in place of a result fails only that caller"""
+        def score(items):
+            results = []
+            for item in items:
+                try:
+                    results.append(10 / item)
+                except ZeroDivisionError as e:
+                    results.append(e)
+            return results
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(item) for item in (1, 0, 5)),
+                                           return_exceptions=True)
+            await batcher.stop()
+            return results, batcher.get_metrics()
+
+        results, metrics = _run(scenario())
+        assert results[0] == 10.0 and results[2] == 2.0
+        assert isinstance(results[1], ZeroDivisionError)
+        assert metrics["failed_items"] == 1 and metrics["failed_batches"] == 0
+
+    def test_failed_batch_is_not_replayed(self):
+        """Test a batch that raises fails its callers without recording velocity twice"""
+        from velocity_monitoring import VelocityMonitor
+        monitor = VelocityMonitor()
+
+        def score(items):
+            for item in items:
+                monitor.record_transaction("CUST_001", {"transaction_amount": item})
+            raise RuntimeError("model unavailable")
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(item) for item in (1.0, 2.0, 3.0)),
+                                           return_exceptions=True)
+            await batcher.stop()
+            return results, batcher.get_metrics()
+
+        results, metrics = _run(scenario())
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert metrics["failed_batches"] == 1
+        assert monitor.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 3
+
+    def test_stop_scores_pending(self):
+        """Test requests still queued at shutdown are answered"""
+        async def scenario():
+            batcher = MicroBatcher(self.double, max_batch_size=4, max_wait_ms=10000)
+            await batcher.start()
+            pending = [asyncio.ensure_future(batcher.submit(idx)) for idx in range(6)]
+            await asyncio.sleep(0.01)
+            await batcher.stop()
+            return await asyncio.gather(*pending)
+
+        assert _run(scenario()) == [0, 2, 4, 6, 8, 10]
+
+    def test_stop_waits_for_batch_in_flight(self):
+        """Test stopping while a batch is being scored still answers its callers"""
+        async def scenario():
+            started = asyncio.Event()
+
+            async def slow_runner(score_batch, items):
+                started.set()
+                await asyncio.sleep(0.05)
+                return score_batch(items)
+
+            batcher = MicroBatcher(self.double, max_batch_size=2, max_wait_ms=10000, runner=slow_runner)
+            await batcher.start()
+            pending = [asyncio.ensure_future(batcher.submit(idx)) for idx in range(2)]
+            await started.wait()
+            await batcher.stop()
+            return await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+        assert _run(scenario()) == [0, 2]
+        assert self.batches == [[0, 1]]
+
+    def test_requires_start_and_valid_config(self):
+        """Test submitting before start and bad limits are rejected"""
+        with pytest.raises(RuntimeError):
+            _run(MicroBatcher(self.double).submit(1))
+        with pytest.raises(ValueError):
+            MicroBatcher(self.double, max_batch_size=0)
+
+
+class TestBatchedPredictEndpoint:
+    """Test /predict answers identically with batching enabled"""
+
+    def test_batched_matches_unbatched(self):
+        """Test batched scoring returns the same fields as per-request scoring"""
+        from app import main
+
+        transactions = [
+            {"transaction_amount": 900.0, "transaction_hour": 3, "merchant_risk_score": 0.7,
+             "customer_id": "C1"},
+            {"transaction_amount": 40.0, "customer_id": "C2"},
+        ]
+        single = [main.score_predictions([data])[0] for data in transactions]
+        batched = main.score_predictions(transactions)
+
+        for one, many in zip(single, batched):
+            assert one["fraud_probability"] == many["fraud_probability"]
+            assert one["aml_risk_score"] == many["aml_risk_score"]
+            assert one["risk_level"] == many["risk_level"]
+
+    def test_bad_transaction_fails_alone(self):
+        """Test a transaction that cannot be scored fails alone and the others are recorded once"""
+        from app import main
+
+        transactions = [
+            {"transaction_amount": 120.0, "customer_id": "C_BATCH_OK"},
+            {"transaction_amount": "not a number", "customer_id": "C_BATCH_BAD"},
+            {"transaction_amount": 80.0, "customer_id": "C_BATCH_OK"},
+        ]
+        results = main.score_predictions(transactions)
+
+        assert isinstance(results[1], ValueError)
+        assert results[0]["fraud_probability"] == main.score_predictions([transactions[0]])[0]["fraud_probability"]
+        assert main.VELOCITY_MONITOR.calculate_velocity_metrics("C_BATCH_OK")['minute_window_count'] == 3
+        assert main.VELOCITY_MONITOR.calculate_velocity_metrics("C_BATCH_BAD")['minute_window_count'] == 0
+
+    def test_predict_through_batcher(self):
+        """Test the endpoint goes through the batcher when batching is enabled"""
+        from fastapi.testclient import TestClient
+        from app import main
+
+        main.PREDICT_BATCHING = True
+        snapshot_path, main.VELOCITY_SNAPSHOT_PATH = main.VELOCITY_SNAPSHOT_PATH, ""
+        try:
+            with TestClient(main.app) as client:
+                response = client.post("/predict", json={"transaction_amount": 750.0, "customer_id": "C9"})
+                metrics = client.get("/metrics").json()["predict_batching"]
+        finally:
+            main.PREDICT_BATCHING = False
+            main.PREDICT_BATCHER = None
+            main.VELOCITY_SNAPSHOT_PATH = snapshot_path
+
+        assert response.status_code == 200
+        assert response.json()["fraud_probability"] == pytest.approx(0.34)
+        assert metrics["items"] == 1
@@ -0,0 +1,58 @@
+"""
+Tests for Compiled Linear Module
+Logistic regression with the standard scaler folded into its coefficients
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compiled_linear import CompiledLinearModel
+
+
+class TestCompiledLinearModel:
+    """Test folded models against the scaler + LogisticRegression pipeline"""
+
+    def setup_method(self):
+        """Fit a scaler and model on features of very different magnitudes"""
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(400, 30))
+        self.X[:, 0] = rng.lognormal(6, 1.5, size=400)
+        self.y = (self.X[:, 0] / 400 + self.X[:, 1] + rng.normal(0, 0.5, size=400) > 1.5).astype(int)
+        self.rows = rng.normal(size=(50, 30))
+        self.rows[:, 0] = rng.lognormal(6, 1.5, size=50)
+
+    @pytest.mark.parametrize("with_mean", [True, False])
+    def test_matches_pipeline(self, with_mean):
+        """Test probabilities, decisions and predictions equal scaler + predict_proba"""
+        scaler = StandardScaler(with_mean=with_mean).fit(self.X)
+        model = LogisticRegression(max_iter=1000).fit(scaler.transform(self.X), self.y)
+        compiled = CompiledLinearModel.from_sklearn(model, scaler)
+        scaled = scaler.transform(self.rows)
+
+        np.testing.assert_allclose(compiled.predict_proba(self.rows), model.predict_proba(scaled), rtol=1e-9)
+        np.testing.assert_allclose(compiled.decision_function(self.rows), model.decision_function(scaled),
+                                   rtol=1e-9, atol=1e-9)
+        np.testing.assert_array_equal(compiled.predict(self.rows), model.predict(scaled))
+        for row, expected in zip(self.rows, model.predict_proba(scaled)[:, 1]):
+            assert compiled.score_row(row) == pytest.approx(expected, rel=1e-9)
+
+    def test_without_scaler(self):
+        """Test a model fitted on raw features compiles to its own coefficients"""
+        model = LogisticRegression(max_iter=1000).fit(self.X[:, 1:], self.y)
+        compiled = CompiledLinearModel.from_sklearn(model)
+        np.testing.assert_allclose(compiled.predict_proba(self.rows[0, 1:]),
+                                   model.predict_proba(self.rows[:1, 1:]), rtol=1e-12)
+
+    def test_rejects_multiclass(self):
+        """Test models with more than one coefficient row are rejected"""
+        model = LogisticRegression(max_iter=1000).fit(self.X[:, 1:], self.y + (self.X[:, 1] > 1))
+        with pytest.raises(ValueError):
+            CompiledLinearModel.from_sklearn(model)
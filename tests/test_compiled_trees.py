@@ -0,0 +1,123 @@
+"""
+Tests for Compiled Trees Module
+Flat node-array scoring of RandomForest and IsolationForest models
+"""
+
+import json
+import pytest
+import sys
+import os
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add project root and src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compiled_trees import (
+    CompiledForestClassifier, CompiledIsolationForest, average_path_length, compile_forest,
+    export_compiled_models,
+)
+from app.models import ModelManager
+
+
+class TestCompiledForest:
+    """Test compiled forests score exactly like scikit-learn"""
+
+    def setup_method(self):
+        """Synthetic training data and query rows"""
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(500, 20))
+        self.X[:, 0] = rng.lognormal(4, 1, size=500)
+        self.y = (self.X[:, 0] + 20 * self.X[:, 1] > 60).astype(int)
+        self.rows = rng.normal(size=(64, 20))
+        self.rows[:, 0] = rng.lognormal(4, 1, size=64)
+
+    @pytest.mark.parametrize("max_depth", [3, None])
+    def test_random_forest_matches(self, max_depth):
+        """Test predict_proba and predict match for shallow and fully grown trees"""
+        model = RandomForestClassifier(n_estimators=15, max_depth=max_depth, class_weight="balanced",
+                                       random_state=0).fit(self.X, self.y)
+        compiled = compile_forest(model)
+
+        assert isinstance(compiled, CompiledForestClassifier)
+        np.testing.assert_allclose(compiled.predict_proba(self.rows), model.predict_proba(self.rows),
+                                   rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(self.rows), model.predict(self.rows))
+        np.testing.assert_allclose(compiled.predict_proba(self.rows[0]), model.predict_proba(self.rows[:1]),
+                                   rtol=0, atol=1e-12)
+
+    @pytest.mark.parametrize("max_features", [1.0, 0.6])
+    def test_isolation_forest_matches(self, max_features):
+        """Test score_samples and predict match, including trees fitted on a feature subset"""
+        model = IsolationForest(n_estimators=20, max_features=max_features, contamination=0.1,
+                                random_state=0).fit(self.X)
+        compiled = compile_forest(model)
+
+        assert isinstance(compiled, CompiledIsolationForest)
+        assert compiled.offset_ == model.offset_
+        np.testing.assert_allclose(compiled.score_samples(self.rows), model.score_samples(self.rows), atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(self.rows), model.predict(self.rows))
+
+    def test_rows_on_split_thresholds(self):
+        """Test values at and next to each threshold fall the same side as in scikit-learn"""
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        compiled = compile_forest(model)
+
+        # Rows built from the split thresholds themselves, and their float32 neighbours
+        tree = model.estimators_[0].tree_
+        splits = tree.feature >= 0
+        rows = np.tile(self.rows[0], (3 * splits.sum(), 1))
+        for idx, (feature, threshold) in enumerate(zip(tree.feature[splits], tree.threshold[splits])):
+            value = np.float32(threshold)
+            for offset, candidate in enumerate([value, np.nextafter(value, np.float32(np.inf)),
+                                                np.nextafter(value, np.float32(-np.inf))]):
+                rows[3 * idx + offset, feature] = candidate
+
+        np.testing.assert_array_equal(compiled.apply(rows), model.apply(rows) + compiled.roots)
+
+    def test_average_path_length(self):
+        """Test c(n) for the small-sample special cases and the harmonic approximation"""
+        lengths = average_path_length([0, 1, 2, 256])
+        assert list(lengths[:3]) == [0.0, 0.0, 1.0]
+        assert lengths[3] == pytest.approx(2 * (np.log(255) + np.euler_gamma) - 2 * 255 / 256)
+
+    def test_rejects_other_models(self):
+        """Test unsupported models and wrong feature counts are rejected"""
+        with pytest.raises(ValueError):
+            compile_forest(LogisticRegression().fit(self.X, self.y))
+
+        compiled = compile_forest(RandomForestClassifier(n_estimators=2, random_state=0).fit(self.X, self.y))
+        with pytest.raises(ValueError):
+            compiled.predict_proba(self.rows[:, :5])
+
+
+class TestExportCompiledModels:
+    """Test exported forests are saved, recorded in metadata and served by ModelManager"""
+
+    def test_export_and_serve(self, tmp_path, write_models):
+        """Test ModelManager scores the compiled files, memory-mapped, like the originals"""
+        write_models(tmp_path, f1_scores={"random_forest": 0.9})
+
+        exported = export_compiled_models(str(tmp_path))
+        assert exported == {"random_forest": "random_forest_compiled.pkl",
+                            "isolation_forest": "isolation_forest_compiled.pkl"}
+        metadata = json.loads((tmp_path / "model_metadata.json").read_text())
+        assert metadata["models"]["random_forest"]["compiled_file_path"] == "random_forest_compiled.pkl"
+        assert "compiled_file_path" not in metadata["models"]["logistic_regression"]
+
+        manager = ModelManager(models_dir=str(tmp_path))
+        assert manager.load_models()
+        rows = np.random.default_rng(1).normal(size=(20, 82))
+        for model_name in ("random_forest", "isolation_forest"):
+            batch = manager.predict_fraud_batch(rows, model_name)
+            assert type(manager.models[model_name]).__name__.startswith("Compiled")
+            assert isinstance(manager.models[model_name].threshold32, np.memmap)
+
+            reference = ModelManager(models_dir=str(tmp_path), compiled=False)
+            reference.load_models()
+            expected = reference.predict_fraud_batch(rows, model_name)
+            np.testing.assert_allclose(batch["fraud_probability"], expected["fraud_probability"], atol=1e-12)
+            np.testing.assert_array_equal(batch["is_fraud"], expected["is_fraud"])
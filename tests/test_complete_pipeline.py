@@ -149,6 +149,27 @@ def test_feature_engineering(sample_df):
     assert len(feature_cols) >= 20, f"Expected at least 20 features, got {len(feature_cols)}"
 
 
+def test_feature_engineering_velocity_timestamps():
+    """Test velocity features follow the frame's timestamps and feed the engineer's monitor"""
+    import pandas as pd
+
+    engineer = FeatureEngineer()
+    df = pd.DataFrame({
+        "customer_id": ["C1", "C2", "C1", "C1"],
+        "transaction_amount": [100.0, 50.0, 200.0, 300.0],
+        # Out of order, with the last C1 transaction two hours after the others
+        "timestamp": ["2025-09-07T10:00:30Z", "2025-09-07T10:00:00Z",
+                      "2025-09-07T10:00:00Z", "2025-09-07T12:00:00Z"],
+    })
+
+    df_enhanced = engineer.engineer_features(df)
+
+    assert list(df_enhanced["transactions_last_minute"]) == [2, 1, 1, 1]
+    assert list(df_enhanced["amount_last_minute"]) == [300.0, 50.0, 200.0, 300.0]
+    assert list(df_enhanced["transactions_last_day"]) == [2, 1, 1, 3]
+    assert len(engineer.velocity_monitor.transaction_buffer) == 2
+
+
 def test_data_analysis(sample_df, feature_list):
     """Test 4: Data analysis and statistics"""
     logger.info("🔍 Testing data analysis...")
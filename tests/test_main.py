@@ -0,0 +1,150 @@
+"""
+Tests for the Fraud Detection API
+Model-backed /predict with startup loading, warm-up and rule-based fallback
+"""
+
+import pytest
+import sys
+import os
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.models import ModelManager
+from app.scoring_cache import ScoringCache
+
+
+# A logistic regression served alone, as in a deployment trained without the tree models
+LOGISTIC_MODEL = {
+    "model_names": ("logistic_regression",),
+    "f1_scores": {"logistic_regression": 0.9},
+    "thresholds": {"logistic_regression": 0.4},
+}
+
+
+class TestModelBackedPredict:
+    """Test /predict scores with the models loaded at startup"""
+
+    def setup_method(self):
+        """Use a fresh model manager and no snapshot file for each test"""
+        self.saved = (main.MODEL_MANAGER, main.VELOCITY_SNAPSHOT_PATH, main.SCORING_CACHE)
+        main.MODEL_MANAGER = ModelManager()
+        main.VELOCITY_SNAPSHOT_PATH = ""
+        main.SCORING_CACHE = ScoringCache()
+        main.STARTUP_STATS.clear()
+
+    def teardown_method(self):
+        main.MODEL_MANAGER, main.VELOCITY_SNAPSHOT_PATH, main.SCORING_CACHE = self.saved
+
+    def test_models_loaded_and_warmed_at_startup(self, tmp_path, monkeypatch, write_models):
+        """Test lifespan loads and warms the models and /predict uses them"""
+        write_models(tmp_path / "models", **LOGISTIC_MODEL)
+        monkeypatch.chdir(tmp_path)
+
+        transaction = {"transaction_amount": 900.0, "customer_id": "M1"}
+        with TestClient(main.app) as client:
+            assert main.MODEL_MANAGER.model_loaded
+            result = client.post("/predict", json=transaction).json()
+            health = client.get("/health").json()
+            startup = client.get("/metrics").json()["startup"]
+
+        features = main.FEATURE_PROCESSOR.build_feature_matrix([transaction])
+        expected = main.MODEL_MANAGER.predict_fraud(features)
+        assert result["method"] == "model"
+        assert result["model_used"] == "logistic_regression"
+        assert result["fraud_probability"] == pytest.approx(expected["fraud_probability"])
+        assert health["models_loaded"] is True
+        for key in ("model_load_seconds", "model_warmup_seconds", "startup_seconds", "first_request_ms"):
+            assert startup[key] >= 0
+
+    def test_repeated_predict_served_from_cache(self, tmp_path, monkeypatch, write_models):
+        """Test a resubmitted transaction reuses its scores, recomputes velocity and is dropped on reload"""
+        write_models(tmp_path / "models", **LOGISTIC_MODEL)
+        monkeypatch.chdir(tmp_path)
+
+        with TestClient(main.app) as client:
+            first = client.post("/predict", json={"transaction_amount": 650.0, "customer_id": "M4",
+                                                  "transaction_id": "T1"}).json()
+            retry = client.post("/predict", json={"transaction_amount": 650.0, "customer_id": "M4",
+                                                  "transaction_id": "T2"}).json()
+            cache = client.get("/metrics").json()["scoring_cache"]
+
+            main.MODEL_MANAGER.load_models()
+            client.post("/predict", json={"transaction_amount": 650.0, "customer_id": "M4"})
+            reloaded = client.get("/metrics").json()["scoring_cache"]
+
+        assert retry["fraud_probability"] == first["fraud_probability"]
+        assert retry["aml_risk_score"] == first["aml_risk_score"]
+        assert retry["velocity_risk_score"] >= first["velocity_risk_score"]
+        assert main.VELOCITY_MONITOR.get_customer_velocity_summary("M4")["total_transactions_24h"] >= 3
+        assert cache["hits"] == 1  # AML results depend on customer history, so only the fraud score is cached
+        assert reloaded["invalidations"] == 1
+
+    def test_predict_and_aml_check_record_once(self, tmp_path, monkeypatch):
+        """Test a transaction scored by /predict and checked by /aml_check enters the AML history once"""
+        monkeypatch.chdir(tmp_path)
+
+        transaction = {"transaction_amount": 3000.0, "customer_id": "AML1"}
+        with TestClient(main.app) as client:
+            client.post("/predict", json=transaction)
+            check = client.post("/aml_check", json=transaction).json()
+            for _ in range(2):
+                client.post("/aml_check", json={"transaction_amount": 3000.0})
+            cache = client.get("/metrics").json()["scoring_cache"]
+
+        assert check["compliance_status"] in ("PASS", "REVIEW_REQUIRED")
+        assert main.AML_CHECKER.history_store.window("AML1", 24 * 3600) == (1, 3000.0)
+        assert cache["hits"] == 1  # AML results of transactions without a customer are cached
+
+    def test_compare_models(self, tmp_path, monkeypatch, write_models):
+        """Test /compare_models scores one transaction with every requested model"""
+        write_models(tmp_path / "models", **LOGISTIC_MODEL)
+        monkeypatch.chdir(tmp_path)
+
+        transaction = {"transaction_amount": 400.0, "customer_id": "M3"}
+        with TestClient(main.app) as client:
+            result = client.post("/compare_models", json=transaction).json()
+            chosen = client.post("/compare_models?models=logistic_regression_fast", json=transaction).json()
+            unknown = client.post("/compare_models?models=xgboost", json=transaction)
+
+        scores = result["models"]
+        assert set(scores) == {"logistic_regression", "logistic_regression_fast"}
+        assert scores["logistic_regression_fast"]["fraud_probability"] == pytest.approx(
+            scores["logistic_regression"]["fraud_probability"])
+        assert scores["logistic_regression"]["threshold"] == 0.4
+        assert list(chosen["models"]) == ["logistic_regression_fast"]
+        assert unknown.status_code == 400
+
+    def test_rule_fallback_without_models(self, tmp_path, monkeypatch):
+        """Test /predict falls back to the rule score when loading fails"""
+        monkeypatch.chdir(tmp_path)
+
+        with TestClient(main.app) as client:
+            result = client.post("/predict", json={"transaction_amount": 750.0, "customer_id": "M2"}).json()
+            health = client.get("/health").json()
+
+        assert result["method"] == "rule_based"
+        assert result["fraud_probability"] == pytest.approx(0.34)
+        assert health["models_loaded"] is False
+
+        with TestClient(main.app) as client:
+            assert client.post("/compare_models", json={"transaction_amount": 750.0}).status_code == 503
+
+    def test_failed_warmup_falls_back(self, tmp_path, monkeypatch, write_models):
+        """Test a model that cannot score the warm-up batch is not used for requests"""
+        write_models(tmp_path / "models", **LOGISTIC_MODEL)
+        joblib.dump({"standard": StandardScaler().fit(np.zeros((3, 5)))}, tmp_path / "models" / "scalers.pkl")
+        monkeypatch.chdir(tmp_path)
+
+        with TestClient(main.app) as client:
+            result = client.post("/predict", json={"transaction_amount": 50.0}).json()
+
+        assert main.MODEL_MANAGER.model_loaded is False
+        assert result["method"] == "rule_based"
@@ -0,0 +1,246 @@
+"""
+Tests for Model Management
+Single-row and batched fraud scoring across model types
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import LinearSVC
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import ModelManager
+from soft_voting import SoftVotingEnsemble
+
+
+class TestPredictFraudBatch:
+    """Test batched predictions against the single-row path"""
+
+    def setup_method(self):
+        """Fit one small model of each supported kind"""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, 82))
+        y = (X[:, 0] + X[:, 1] > 0.5).astype(int)
+        scaler = StandardScaler().fit(X)
+        X_scaled = scaler.transform(X)
+
+        self.features = rng.normal(size=(40, 82))
+        self.manager = ModelManager()
+        self.manager.scalers = {"standard": scaler}
+        self.manager.models = {
+            "logistic_regression": LogisticRegression().fit(X_scaled, y),
+            "random_forest": RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y),
+            "ensemble": VotingClassifier(
+                [("lr", LogisticRegression()), ("rf", RandomForestClassifier(n_estimators=5, random_state=0))],
+                voting="soft"
+            ).fit(X_scaled, y),
+            "isolation_forest": IsolationForest(n_estimators=20, contamination=0.2, random_state=0).fit(X),
+            "svm": LinearSVC().fit(X, y),
+        }
+        self.manager.metadata = {"models": {
+            "logistic_regression": {"threshold": 0.3},
+            "random_forest": {"threshold": 0.2},
+            "ensemble": {"threshold": 0.4},
+            "isolation_forest": {"threshold": 0},
+        }}
+        self.manager.best_model_name = "random_forest"
+        self.manager.model_loaded = True
+
+    @pytest.mark.parametrize("model_name", ["logistic_regression", "random_forest", "ensemble",
+                                            "isolation_forest", "svm"])
+    def test_matches_single_row(self, model_name):
+        """Test every batch row equals predict_fraud on that row"""
+        batch = self.manager.predict_fraud_batch(self.features, model_name)
+        assert batch["model_used"] == model_name
+        assert batch["fraud_probability"].shape == (40,)
+
+        for idx in range(len(self.features)):
+            single = self.manager.predict_fraud(self.features[idx:idx + 1], model_name)
+            assert single["fraud_probability"] == pytest.approx(batch["fraud_probability"][idx])
+            assert single["is_fraud"] == batch["is_fraud"][idx]
+            assert single["risk_level"] == batch["risk_level"][idx]
+
+    def test_metadata_threshold(self):
+        """Test decisions use each model's metadata threshold"""
+        batch = self.manager.predict_fraud_batch(self.features, "logistic_regression")
+        assert batch["threshold"] == 0.3
+        np.testing.assert_array_equal(batch["is_fraud"], batch["fraud_probability"] >= 0.3)
+
+        self.manager.metadata["models"]["logistic_regression"]["threshold"] = 0.9
+        stricter = self.manager.predict_fraud_batch(self.features, "logistic_regression")
+        assert stricter["is_fraud"].sum() <= batch["is_fraud"].sum()
+
+        assert self.manager.predict_fraud_batch(self.features, "svm")["threshold"] == 0.5
+
+    def test_isolation_forest_path(self):
+        """Test anomalies match predict() and probabilities are the sigmoid of score_samples"""
+        model = self.manager.models["isolation_forest"]
+        batch = self.manager.predict_fraud_batch(self.features, "isolation_forest")
+
+        np.testing.assert_array_equal(batch["is_fraud"], model.predict(self.features) == -1)
+        np.testing.assert_allclose(
+            batch["fraud_probability"], 1 / (1 + np.exp(model.score_samples(self.features)))
+        )
+
+    def test_risk_codes(self):
+        """Test np.digitize buckets agree with the risk level boundaries"""
+        probabilities = np.array([0.0, 0.19, 0.2, 0.49, 0.5, 0.79, 0.8, 1.0])
+        codes = np.digitize(probabilities, ModelManager.RISK_BUCKET_EDGES)
+        assert list(ModelManager.RISK_LEVELS[codes]) == [
+            "VERY_LOW", "VERY_LOW", "LOW", "LOW", "MEDIUM", "MEDIUM", "HIGH", "HIGH"
+        ]
+
+        batch = self.manager.predict_fraud_batch(self.features)
+        assert batch["risk_code"].dtype == np.int8
+        np.testing.assert_array_equal(ModelManager.RISK_LEVELS[batch["risk_code"]], batch["risk_level"])
+
+    def test_fast_logistic_regression(self):
+        """Test the folded scaler + LR model gives the pipeline's probabilities and threshold"""
+        assert "logistic_regression_fast" in self.manager.available_models
+        fast = self.manager.predict_fraud_batch(self.features, "logistic_regression_fast")
+        reference = self.manager.predict_fraud_batch(self.features, "logistic_regression")
+
+        assert fast["threshold"] == 0.3
+        np.testing.assert_allclose(fast["fraud_probability"], reference["fraud_probability"], rtol=1e-9)
+        np.testing.assert_array_equal(fast["is_fraud"], reference["is_fraud"])
+
+        single = self.manager.predict_fraud(self.features[:1], "logistic_regression_fast")
+        assert single["fraud_probability"] == pytest.approx(reference["fraud_probability"][0])
+
+    def test_standardize_matches_scaler(self):
+        """Test the NumPy scaling equals StandardScaler.transform and checks the width"""
+        scaler = self.manager.scalers["standard"]
+        np.testing.assert_array_equal(self.manager._standardize(self.features), scaler.transform(self.features))
+        with pytest.raises(ValueError):
+            self.manager._standardize(self.features[:, :10])
+
+    def test_single_row_and_errors(self):
+        """Test a 1-D row is accepted and unavailable models are rejected"""
+        batch = self.manager.predict_fraud_batch(self.features[0])
+        assert batch["fraud_probability"].shape == (1,)
+
+        with pytest.raises(ValueError):
+            self.manager.predict_fraud_batch(self.features, "xgboost")
+
+        self.manager.model_loaded = False
+        with pytest.raises(RuntimeError):
+            self.manager.predict_fraud_batch(self.features)
+
+
+class TestPredictFraudMulti:
+    """Test scoring several models in one call, sharing base model work"""
+
+    def setup_method(self):
+        """Base models plus a soft-voting ensemble that names two of them"""
+        rng = np.random.default_rng(2)
+        X = rng.normal(size=(300, 82))
+        y = (X[:, 0] - X[:, 2] > 0.3).astype(int)
+        scaler = StandardScaler().fit(X)
+
+        self.features = rng.normal(size=(25, 82))
+        self.manager = ModelManager()
+        self.manager.scalers = {"standard": scaler}
+        self.manager.models = {
+            "random_forest": RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y),
+            "logistic_regression": LogisticRegression().fit(scaler.transform(X), y),
+            "isolation_forest": IsolationForest(n_estimators=10, random_state=0).fit(X),
+            "ensemble": SoftVotingEnsemble(["random_forest", "logistic_regression"], weights=[1, 3]),
+        }
+        self.manager.metadata = {"models": {"ensemble": {"threshold": 0.35}}}
+        self.manager.best_model_name = "ensemble"
+        self.manager.model_loaded = True
+
+    def test_matches_single_model_calls(self):
+        """Test every model's result equals its own predict_fraud_batch call"""
+        results = self.manager.predict_fraud_multi(self.features)
+        assert set(results) == {"random_forest", "logistic_regression", "isolation_forest", "ensemble",
+                                "logistic_regression_fast"}
+
+        for model_name, batch in results.items():
+            single = self.manager.predict_fraud_batch(self.features, model_name)
+            assert batch["threshold"] == single["threshold"]
+            np.testing.assert_allclose(batch["fraud_probability"], single["fraud_probability"])
+            np.testing.assert_array_equal(batch["is_fraud"], single["is_fraud"])
+
+        expected = (results["random_forest"]["fraud_probability"]
+                    + 3 * results["logistic_regression"]["fraud_probability"]) / 4
+        np.testing.assert_allclose(results["ensemble"]["fraud_probability"], expected)
+        np.testing.assert_array_equal(results["ensemble"]["is_fraud"], expected >= 0.35)
+
+    def test_base_models_run_once(self):
+        """Test the ensemble reuses its members' probabilities and the scaler runs once"""
+        forest = self.manager.models["random_forest"]
+        with patch.object(forest, "predict_proba", wraps=forest.predict_proba) as forest_proba, \
+                patch.object(self.manager, "_standardize", wraps=self.manager._standardize) as standardize:
+            self.manager.predict_fraud_multi(self.features, ["random_forest", "logistic_regression", "ensemble"])
+
+        assert forest_proba.call_count == 1
+        assert standardize.call_count == 1
+
+    def test_unavailable_model(self):
+        """Test an unknown model name is rejected before any scoring"""
+        with pytest.raises(ValueError):
+            self.manager.predict_fraud_multi(self.features, ["random_forest", "xgboost"])
+
+
+class TestModelLoading:
+    """Test memory-mapped, lazy loading of saved model files"""
+
+    def setup_method(self):
+        """Query rows for the models each test saves"""
+        self.features = np.random.default_rng(1).normal(size=(10, 82))
+
+    def test_lazy_loading(self, tmp_path, write_models):
+        """Test only the best model loads up front and the others load on first use"""
+        fitted, _ = write_models(tmp_path / "models", f1_scores={"random_forest": 0.7, "logistic_regression": 0.9})
+        manager = ModelManager(models_dir=str(tmp_path / "models"))
+
+        assert manager.load_models()
+        assert manager.best_model_name == "logistic_regression"
+        assert list(manager.models) == ["logistic_regression"]
+        assert set(manager.available_models) == {*fitted, "logistic_regression_fast"}
+
+        batch = manager.predict_fraud_batch(self.features, "random_forest")
+        np.testing.assert_allclose(
+            batch["fraud_probability"], fitted["random_forest"].predict_proba(self.features)[:, 1]
+        )
+        assert set(manager.models) == {"logistic_regression", "random_forest"}
+        assert set(manager.load_seconds) == {"logistic_regression", "random_forest"}
+
+    def test_memory_mapped_arrays(self, tmp_path, write_models):
+        """Test arrays in uncompressed files are mapped read-only and score the same"""
+        fitted, scalers = write_models(tmp_path / "models", f1_scores={"logistic_regression": 0.9})
+        manager = ModelManager(models_dir=str(tmp_path / "models"))
+        assert manager.load_models()
+
+        assert isinstance(manager.scalers["standard"].mean_, np.memmap)
+        assert isinstance(manager.models["logistic_regression"].coef_, np.memmap)
+        assert not manager.models["logistic_regression"].coef_.flags.writeable
+
+        expected = fitted["logistic_regression"].predict_proba(
+            scalers["standard"].transform(self.features))[:, 1]
+        np.testing.assert_allclose(manager.predict_fraud_batch(self.features)["fraud_probability"], expected)
+
+        eager = ModelManager(models_dir=str(tmp_path / "models"), mmap_mode=None)
+        assert eager.load_models()
+        assert not isinstance(eager.models["logistic_regression"].coef_, np.memmap)
+
+    def test_eager_loading_and_broken_files(self, tmp_path, write_models):
+        """Test lazy=False loads every model and an unreadable best model is skipped"""
+        write_models(tmp_path / "models", f1_scores={"random_forest": 0.9, "logistic_regression": 0.8})
+        (tmp_path / "models" / "random_forest_model.pkl").write_bytes(b"not a pickle")
+
+        manager = ModelManager(models_dir=str(tmp_path / "models"), lazy=False)
+        assert manager.load_models()
+        assert manager.best_model_name == "logistic_regression"
+        assert set(manager.models) == {"logistic_regression", "isolation_forest"}
+        with pytest.raises(ValueError):
+            manager.predict_fraud_batch(self.features, "random_forest")
@@ -0,0 +1,137 @@
+"""
+Tests for Scoring Pool
+Offloading CPU-bound scoring from the event loop with back-pressure
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.offload import PoolSaturatedError, ScoringPool
+
+
+class TestScoringPool:
+    """Test pool execution, admission and metrics"""
+
+    def test_runs_off_the_event_loop(self):
+        """Test calls run on a pool thread and return their result"""
+        pool = ScoringPool("thread", max_workers=2)
+
+        async def scenario():
+            return await pool.run(lambda: (threading.current_thread().name, 6 * 7))
+
+        try:
+            thread_name, result = asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+        assert result == 42
+        assert thread_name.startswith("scoring")
+
+    def test_rejects_when_saturated(self):
+        """Test calls beyond workers plus queue are rejected while the loop stays free"""
+        pool = ScoringPool("thread", max_workers=1, max_queue_size=1)
+
+        async def scenario():
+            running = [asyncio.ensure_future(pool.run(time.sleep, 0.2)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(time.sleep, 0)
+
+            # The event loop keeps serving while the pool is busy
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            loop_delay = time.perf_counter() - start
+
+            await asyncio.gather(*running)
+            return loop_delay
+
+        try:
+            loop_delay = asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+        assert loop_delay < 0.1
+        assert pool.get_metrics() == {"kind": "thread", "max_workers": 1, "max_queue_size": 1,
+                                      "in_flight": 0, "completed": 2, "rejected": 1}
+
+    def test_process_pool(self):
+        """Test picklable calls run in a process pool"""
+        pool = ScoringPool("process", max_workers=1)
+        try:
+            assert asyncio.run(pool.run(pow, 2, 10)) == 1024
+        finally:
+            pool.shutdown()
+
+    def test_invalid_configuration(self):
+        """Test unknown pool kinds and sizes are rejected"""
+        with pytest.raises(ValueError):
+            ScoringPool("greenlet")
+        with pytest.raises(ValueError):
+            ScoringPool(max_workers=0)
+
+
+class TestScoringBackPressure:
+    """Test endpoints answer 429 when the scoring pool is saturated"""
+
+    def test_predict_returns_429(self):
+        """Test /predict is turned away with 429 and Retry-After while the pool is full"""
+        from fastapi import HTTPException
+        from app import main
+
+        pool = ScoringPool("thread", max_workers=1, max_queue_size=0)
+
+        async def scenario():
+            busy = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+            await asyncio.sleep(0)
+            try:
+                await main.predict({"transaction_amount": 50.0})
+            finally:
+                await busy
+
+        main.SCORING_POOL = pool
+        try:
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(scenario())
+        finally:
+            main.SCORING_POOL = None
+            pool.shutdown()
+
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == "1"
+
+    def test_endpoints_through_pool(self):
+        """Test scoring endpoints return normal results through the pool"""
+        from fastapi.testclient import TestClient
+        from app import main
+
+        snapshot_path, main.VELOCITY_SNAPSHOT_PATH = main.VELOCITY_SNAPSHOT_PATH, ""
+        try:
+            with TestClient(main.app) as client:
+                predict = client.post("/predict", json={"transaction_amount": 60.0, "customer_id": "P1"})
+                aml = client.post("/aml_check", json={"transaction_amount": 9500.0})
+                metrics = client.get("/metrics").json()["scoring_pool"]
+        finally:
+            main.SCORING_POOL = None
+            main.VELOCITY_SNAPSHOT_PATH = snapshot_path
+
+        assert predict.status_code == 200 and "fraud_probability" in predict.json()
+        assert aml.json()["aml_assessment"]["aml_flags"] == ["AMOUNT_NEAR_CTR_THRESHOLD"]
+        assert metrics["kind"] == "thread"
+        assert metrics["completed"] >= 2
+
+    def test_process_pool_needs_shared_state(self, monkeypatch):
+        """Test the API refuses a process pool while velocity and AML history are in-process"""
+        from fastapi.testclient import TestClient
+        from app import main
+
+        monkeypatch.setattr(main, "SCORING_POOL_KIND", "process")
+        assert len(main.process_pool_blockers()) == 2
+        with pytest.raises(RuntimeError, match="VELOCITY_STORE_SOCKET"):
+            with TestClient(main.app):
+                pass
+        assert main.SCORING_POOL is None
@@ -0,0 +1,277 @@
+"""
+Tests for Prediction Utilities
+Feature processing and batch prediction helpers used by the API
+"""
+
+import pytest
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import ModelManager
+from app.predictor import BatchPredictor, FeatureProcessor
+from aml_compliance import AMLComplianceChecker
+
+
+class TestFeatureProcessor:
+    """Test feature processing with a shared AML checker"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.transaction = {
+            "transaction_amount": 9500.0,
+            "transaction_hour": 3,
+            "merchant_category": "GAMBLING",
+            "card_amount_mean": 120.0,
+        }
+
+    def test_checker_is_shared(self):
+        """Test one injected checker serves every transaction"""
+        checker = AMLComplianceChecker()
+        processor = FeatureProcessor(aml_checker=checker)
+        batch = BatchPredictor(MagicMock(), feature_processor=processor)
+
+        assert processor.aml_checker is checker
+        assert batch.feature_processor is processor
+        assert FeatureProcessor().aml_checker is not None
+
+    def test_aml_features_use_injected_checker(self):
+        """Test AML features come from the injected checker"""
+        checker = MagicMock()
+        checker.calculate_overall_aml_risk.return_value = {
+            "aml_overall_risk_score": 0.42,
+            "aml_flags": ["UNUSUAL_TIMING", "HIGH_RISK_MERCHANT_CATEGORY"],
+            "requires_manual_review": False,
+            "aml_component_scores": {
+                "structuring": 0.4, "rapid_movement": 0.0, "suspicious_patterns": 0.5, "sanctions": 0.0
+            },
+        }
+        processor = FeatureProcessor(aml_checker=checker)
+
+        features = processor._aml_features(self.transaction)
+        assert features["aml_risk_score"] == 0.42
+        assert features["aml_flags_count"] == 2
+        checker.calculate_overall_aml_risk.assert_called_once_with(self.transaction)
+
+    def test_malformed_transaction_falls_back(self):
+        """Test bad transaction fields fall back instead of failing the prediction"""
+        processor = FeatureProcessor()
+        features = processor._aml_features({"transaction_amount": 100.0, "location": 7})
+        assert features == FeatureProcessor.AML_FALLBACK_FEATURES
+
+    def test_rule_errors_are_not_swallowed(self):
+        """Test unexpected checker failures propagate"""
+        checker = MagicMock()
+        checker.calculate_overall_aml_risk.side_effect = KeyError("aml_component_scores")
+        processor = FeatureProcessor(aml_checker=checker)
+
+        with pytest.raises(KeyError):
+            processor.aml_features_many([self.transaction])
+
+    def test_aml_features_many(self):
+        """Test AML features are returned per transaction and not computed for the feature matrix"""
+        checker = MagicMock(wraps=AMLComplianceChecker())
+        processor = FeatureProcessor(aml_checker=checker)
+        transactions = [self.transaction, {"transaction_amount": 25.0}]
+
+        processor.process_many(transactions)
+        checker.calculate_overall_aml_risk.assert_not_called()
+
+        features = processor.aml_features_many(transactions)
+        assert [f["aml_risk_score"] for f in features] == [
+            processor._aml_features(transaction)["aml_risk_score"] for transaction in transactions
+        ]
+        assert checker.calculate_overall_aml_risk.call_count == 4
+
+    def test_process_many_matches_single(self):
+        """Test batch processing returns the same rows as one-by-one processing"""
+        processor = FeatureProcessor()
+        transactions = [self.transaction, {"transaction_amount": 25.0}, {"transaction_amount": 75.5,
+                                                                          "additional_features": [1.0, 2.0]}]
+
+        matrix = processor.process_many(transactions)
+        assert matrix.shape == (3, processor.required_features)
+        for row, transaction in zip(matrix, transactions):
+            np.testing.assert_array_equal(row, processor.process_transaction_features(transaction))
+        assert processor.process_many([]).shape == (0, processor.required_features)
+
+
+def _reference_features(transaction_data, required_features=82):
+    """Per-row feature construction as FeatureProcessor built it before vectorization"""
+    hour = int(transaction_data.get("transaction_hour", 12))
+    feature_list = [
+        float(transaction_data.get("transaction_amount", 0)),
+        hour,
+        int(transaction_data.get("transaction_day", 15)),
+        int(transaction_data.get("transaction_weekend", 0)),
+        int(transaction_data.get("is_business_hours", 1 if 9 <= hour <= 17 else 0)),
+        float(transaction_data.get("card_amount_mean", 50)),
+        int(transaction_data.get("card_txn_count_recent", 1)),
+        float(transaction_data.get("time_since_last_txn", 3600)),
+        float(transaction_data.get("merchant_risk_score", 0.1)),
+        float(transaction_data.get("amount_zscore", 0)),
+        int(transaction_data.get("is_amount_outlier", 0)),
+    ]
+    feature_list.extend(transaction_data.get("additional_features", []))
+    feature_list = (feature_list + [0.0] * required_features)[:required_features]
+    return np.nan_to_num(np.array(feature_list, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+class TestFeatureMatrix:
+    """Test the vectorized feature matrix builder"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = FeatureProcessor()
+        rng = np.random.default_rng(7)
+        self.transactions = []
+        for idx in range(200):
+            transaction = {"transaction_amount": float(rng.lognormal(4, 1)),
+                           "transaction_hour": int(rng.integers(0, 24))}
+            if idx % 3 == 0:
+                transaction["is_business_hours"] = 1
+                transaction["card_txn_count_recent"] = 4.7
+            if idx % 5 == 0:
+                transaction["additional_features"] = list(rng.normal(size=int(rng.integers(1, 90))))
+            if idx % 7 == 0:
+                transaction["amount_zscore"] = float("inf")
+            self.transactions.append(transaction)
+
+    def test_matches_row_by_row(self):
+        """Test the matrix equals the per-row construction for every transaction"""
+        matrix = self.processor.build_feature_matrix(self.transactions)
+        expected = np.array([_reference_features(t) for t in self.transactions])
+        np.testing.assert_array_equal(matrix, expected)
+
+    def test_dataframe_input(self):
+        """Test a DataFrame builds the same matrix, with missing cells taking defaults"""
+        frame = pd.DataFrame(self.transactions)
+        np.testing.assert_array_equal(
+            self.processor.build_feature_matrix(frame),
+            self.processor.build_feature_matrix(self.transactions)
+        )
+
+    def test_dtype_and_raw_dicts(self):
+        """Test float32 output and plain feature dictionaries without defaults"""
+        matrix = self.processor.build_feature_matrix(self.transactions[:3], dtype=np.float32)
+        assert matrix.dtype == np.float32
+
+        array = self.processor._dict_to_array({"transaction_amount": 10.0, "transaction_hour": float("nan")})
+        assert array.shape == (82,)
+        assert array[0] == 10.0
+        assert not array[1:].any()
+
+    def test_large_batch_is_fast(self):
+        """Test a 10k-row batch builds in well under a second"""
+        transactions = self.transactions * 50
+        start = time.perf_counter()
+        matrix = self.processor.build_feature_matrix(transactions)
+        assert matrix.shape == (10000, 82)
+        assert time.perf_counter() - start < 0.5
+
+
+def _fitted_model_manager():
+    """ModelManager holding small fitted models, as load_models would leave it"""
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 82))
+    X[:, 0] = rng.lognormal(4, 1, size=400)
+    y = (X[:, 0] > 150).astype(int)
+    scaler = StandardScaler().fit(X)
+
+    manager = ModelManager()
+    manager.scalers = {"standard": scaler}
+    manager.models = {
+        "logistic_regression": LogisticRegression(max_iter=500).fit(scaler.transform(X), y),
+        "random_forest": RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y),
+        "isolation_forest": IsolationForest(n_estimators=20, random_state=0).fit(X),
+    }
+    manager.metadata = {"models": {"logistic_regression": {"threshold": 0.3},
+                                   "random_forest": {"threshold": 0.1}}}
+    manager.best_model_name = "logistic_regression"
+    manager.model_loaded = True
+    return manager
+
+
+class TestBatchPredictor:
+    """Test batched inference against row-by-row predictions"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.model_manager = _fitted_model_manager()
+        self.predictor = BatchPredictor(self.model_manager)
+        rng = np.random.default_rng(1)
+        self.transactions = [
+            {"transaction_id": f"T{idx}", "transaction_amount": float(rng.lognormal(4.5, 1)),
+             "transaction_hour": int(rng.integers(0, 24))}
+            for idx in range(50)
+        ]
+
+    @pytest.mark.parametrize("model_name", ["logistic_regression", "random_forest", "isolation_forest"])
+    def test_matches_single_predictions(self, model_name):
+        """Test batch records equal predict_fraud on each row"""
+        results = self.predictor.predict_batch(self.transactions, model_name)
+        processor = self.predictor.feature_processor
+
+        for idx, (result, transaction) in enumerate(zip(results, self.transactions)):
+            features = processor.build_feature_matrix([transaction])
+            single = self.model_manager.predict_fraud(features, model_name)
+            for key in ("is_fraud", "risk_level", "model_used", "confidence"):
+                assert result[key] == pytest.approx(single[key])
+            assert result["fraud_probability"] == pytest.approx(single["fraud_probability"])
+            assert result["transaction_index"] == idx
+            assert result["transaction_id"] == transaction["transaction_id"]
+
+    def test_validation_errors_are_per_row(self):
+        """Test invalid rows are reported while the rest of the batch is scored"""
+        transactions = list(self.transactions[:3])
+        transactions[1] = {"transaction_amount": -5.0}
+        transactions.append({"transaction_amount": 10.0, "card_amount_mean": "n/a"})
+
+        result = self.predictor.predict_batch_columnar(transactions)
+        assert set(result.errors) == {1, 3}
+        assert "negative" in result.errors[1]
+
+        records = result.to_records()
+        assert len(records) == len(result) == 4
+        assert records[1] == {"transaction_index": 1, "transaction_id": "txn_1",
+                              "error": result.errors[1], "is_fraud": False,
+                              "fraud_probability": 0.0, "risk_level": "ERROR"}
+        assert records[0]["risk_level"] != "ERROR"
+        assert records[2]["model_used"] == "logistic_regression"
+
+    def test_single_model_call(self):
+        """Test the whole batch goes through the model once"""
+        model_manager = MagicMock()
+        model_manager.model_loaded = True
+        model_manager.predict_fraud_batch.side_effect = lambda features, model_name: {
+            "model_used": "stub",
+            "fraud_probability": np.full(len(features), 0.9),
+            "is_fraud": np.ones(len(features), dtype=bool),
+            "risk_level": np.full(len(features), "HIGH"),
+        }
+        predictor = BatchPredictor(model_manager)
+
+        result = predictor.predict_batch_columnar(self.transactions * 20)
+        assert model_manager.predict_fraud_batch.call_count == 1
+        assert model_manager.predict_fraud_batch.call_args[0][0].shape == (1000, 82)
+        assert result.is_fraud.all() and not result.errors
+
+    def test_model_failure_marks_rows(self):
+        """Test a failing model call reports every scored row as an error"""
+        self.model_manager.models["logistic_regression"] = MagicMock(
+            predict_proba=MagicMock(side_effect=ValueError("bad input"))
+        )
+        records = self.predictor.predict_batch(self.transactions[:5])
+        assert all(record["risk_level"] == "ERROR" for record in records)
+        assert records[0]["error"] == "bad input"
@@ -0,0 +1,114 @@
+"""
+Tests for the Sanctions Screening automaton
+Matches against Python substring checks, save/load and list-aware loading,
+and fuzzy name search
+"""
+
+import random
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sanctions_screening import (
+    FuzzyNameIndex, SanctionsAutomaton, edit_similarity, load_sanctions_automaton, normalize_name,
+    normalize_patterns,
+)
+
+
+class TestSanctionsAutomaton:
+    """Test Aho-Corasick screening against the substring loop it replaces"""
+
+    def setup_method(self):
+        """Build an automaton over overlapping names"""
+        self.patterns = ["HE", "SHE", "HIS", "HERS", "Kim Jong", "Müller"]
+        self.automaton = SanctionsAutomaton.build(self.patterns)
+
+    def test_matches_like_substring_loop(self):
+        """Test matches and find_all agree with `in` checks on random texts"""
+        rng = random.Random(0)
+        for _ in range(500):
+            text = "".join(rng.choice("hesirüMl ") for _ in range(rng.randint(0, 12)))
+            expected = [pattern for pattern in normalize_patterns(self.patterns) if pattern in text.upper()]
+            assert self.automaton.matches(text) == bool(expected)
+            assert sorted(self.automaton.find_all(text)) == sorted(expected)
+
+    def test_overlapping_matches(self):
+        """Test matches that are suffixes of other matches are all reported"""
+        assert self.automaton.find_all("ushers") == ["SHE", "HE", "HERS"]
+        assert self.automaton.find_all("Mr Kim Jong-un") == ["KIM JONG"]
+        assert self.automaton.find_all("MÜLLERSTRASSE") == ["MÜLLER"]
+        assert not self.automaton.matches("Kim Jang")
+
+    def test_empty_list_matches_nothing(self):
+        """Test an automaton without patterns never matches"""
+        automaton = SanctionsAutomaton.build(["", ""])
+        assert len(automaton) == 0
+        assert not automaton.matches("ANYTHING")
+
+    def test_save_and_load(self, tmp_path):
+        """Test a saved automaton loads back with the same matches"""
+        path = tmp_path / "sanctions.npz"
+        self.automaton.save(path)
+        loaded = SanctionsAutomaton.load(path)
+
+        assert loaded.patterns == self.automaton.patterns
+        assert loaded.fingerprint == self.automaton.fingerprint
+        assert loaded.find_all("ushers his") == self.automaton.find_all("ushers his")
+
+    def test_load_rebuilds_for_another_list(self, tmp_path):
+        """Test a cached automaton is only reused for the list it was built from"""
+        path = str(tmp_path / "sanctions.npz")
+        first = load_sanctions_automaton(["ALPHA"], path)
+        assert load_sanctions_automaton(["alpha"], path).fingerprint == first.fingerprint
+
+        rebuilt = load_sanctions_automaton(["BETA"], path)
+        assert rebuilt.matches("BETA CORP") and not rebuilt.matches("ALPHA CORP")
+        assert SanctionsAutomaton.load(path).patterns == ["BETA"]
+
+
+class TestFuzzyNameIndex:
+    """Test fuzzy sanctions name search"""
+
+    def setup_method(self):
+        """Index a few listed names"""
+        self.index = FuzzyNameIndex(["Ivan Petrov", "Hans Müller", "Kim Jong Un", "Al-Rashid Trading"])
+
+    def test_normalize_and_similarity(self):
+        """Test names fold to uppercase ASCII words and similarity is edit based"""
+        assert normalize_name("  hans  Müller-Schmidt ") == "HANS MULLER SCHMIDT"
+        assert edit_similarity("PETROV", "PETROV") == 1.0
+        assert edit_similarity("IVAN", "IWAN") == pytest.approx(0.75)
+        assert edit_similarity("", "ABC") == 0.0
+
+    def test_finds_typos_and_transliterations(self):
+        """Test near spellings inside longer name fields match their listed name"""
+        petrov = self.index.search("Mr Iwan Petrov")
+        assert petrov[0]["listed_name"] == "Ivan Petrov"
+        assert petrov[0]["matched_text"] == "IWAN PETROV"
+        assert petrov[0]["similarity"] == pytest.approx(1 - 1 / 11, abs=1e-4)
+
+        assert self.index.search("HANS MUELLER")[0]["listed_name"] == "Hans Müller"
+        assert self.index.search("al rashid trading co")[0]["similarity"] == 1.0
+
+    def test_unrelated_names_do_not_match(self):
+        """Test names below the threshold return nothing"""
+        assert self.index.search("John Doe") == []
+        assert self.index.search("Ivan Ivanov") == []
+        assert self.index.search("") == []
+
+    def test_deadline_stops_rescoring(self):
+        """Test a passed deadline returns early and is counted"""
+        assert self.index.search("Ivan Petrov", deadline=time.perf_counter() - 1) == []
+        assert self.index.budget_exhausted == 1
+
+    def test_search_batch(self):
+        """Test batch search matches per-name search"""
+        names = ["Iwan Petrov", "john doe", "IWAN  PETROV"]
+        results = self.index.search_batch(names)
+        assert results == [self.index.search(name) for name in names]
+        assert results[0] and not results[1]
@@ -0,0 +1,94 @@
+"""
+Tests for the Scoring Cache
+LRU eviction, TTL expiry, model-version invalidation and canonical keys
+"""
+
+import sys
+import os
+from unittest.mock import patch
+
+import pytest
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.scoring_cache import ScoringCache, canonical_key
+
+FIELDS = ["transaction_amount", "transaction_hour", "merchant_category"]
+
+
+class TestCanonicalKey:
+    """Test content keys of transactions"""
+
+    def test_independent_of_order_and_other_fields(self):
+        """Test key order and fields outside the list do not change the key"""
+        first = {"transaction_amount": 100, "transaction_hour": 3, "transaction_id": "T1"}
+        second = {"transaction_id": "T2", "transaction_hour": 3, "transaction_amount": 100.0}
+        assert canonical_key(first, FIELDS) == canonical_key(second, FIELDS)
+
+    def test_distinguishes_values_and_namespaces(self):
+        """Test a changed value, a missing field or another namespace change the key"""
+        base = {"transaction_amount": 100.0, "transaction_hour": 3}
+        key = canonical_key(base, FIELDS)
+        assert canonical_key({**base, "transaction_amount": 100.01}, FIELDS) != key
+        assert canonical_key({**base, "merchant_category": None}, FIELDS) != key
+        assert canonical_key(base, FIELDS, "aml") != key
+
+
+class TestScoringCache:
+    """Test the bounded LRU/TTL cache"""
+
+    def setup_method(self):
+        """Create a small cache for each test"""
+        self.cache = ScoringCache(max_entries=2, ttl_seconds=10)
+
+    def test_hits_and_misses(self):
+        """Test stored values are returned and counted"""
+        assert self.cache.get("a", "v1") is None
+        self.cache.put("a", {"score": 0.3}, "v1")
+        assert self.cache.get("a", "v1") == {"score": 0.3}
+
+        metrics = self.cache.get_metrics()
+        assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (1, 1, 1)
+        assert metrics["hit_rate"] == pytest.approx(0.5)
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache stays bounded and keeps recently read entries"""
+        self.cache.put("a", 1, "v1")
+        self.cache.put("b", 2, "v1")
+        self.cache.get("a", "v1")
+        self.cache.put("c", 3, "v1")
+
+        assert len(self.cache) == 2
+        assert self.cache.get("b", "v1") is None
+        assert self.cache.get("a", "v1") == 1
+        assert self.cache.get_metrics()["evictions"] == 1
+
+    def test_entries_expire(self):
+        """Test entries older than the TTL are misses"""
+        with patch("app.scoring_cache.time.monotonic", return_value=100.0):
+            self.cache.put("a", 1, "v1")
+        with patch("app.scoring_cache.time.monotonic", return_value=109.0):
+            assert self.cache.get("a", "v1") == 1
+        with patch("app.scoring_cache.time.monotonic", return_value=110.0):
+            assert self.cache.get("a", "v1") is None
+
+        assert len(self.cache) == 0
+        assert self.cache.get_metrics()["expirations"] == 1
+
+    def test_new_model_version_invalidates(self):
+        """Test a lookup with another model version drops every entry"""
+        self.cache.put("a", 1, "v1")
+        self.cache.put("b", 2, "v1")
+
+        assert self.cache.get("a", "v2") is None
+        assert len(self.cache) == 0
+        assert self.cache.get_metrics()["invalidations"] == 1
+        assert self.cache.get_metrics()["model_version"] == "v2"
+
+    def test_rejects_invalid_bounds(self):
+        """Test size and TTL must be positive"""
+        with pytest.raises(ValueError):
+            ScoringCache(max_entries=0)
+        with pytest.raises(ValueError):
+            ScoringCache(ttl_seconds=0)
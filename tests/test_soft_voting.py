@@ -0,0 +1,54 @@
+"""
+Tests for Soft Voting Module
+Ensembles built from their members' separately computed probabilities
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from soft_voting import SoftVotingEnsemble
+
+
+class TestSoftVotingEnsemble:
+    """Test the soft vote against VotingClassifier and its validation"""
+
+    def test_matches_voting_classifier(self):
+        """Test the weighted mean equals a soft VotingClassifier over the same fitted members"""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(200, 6))
+        y = (X[:, 0] + X[:, 1] > 0).astype(int)
+        rows = rng.normal(size=(30, 6))
+
+        voting = VotingClassifier(
+            [("rf", RandomForestClassifier(n_estimators=5, random_state=0)), ("lr", LogisticRegression())],
+            voting="soft", weights=[2, 1],
+        ).fit(X, y)
+        member_probabilities = {
+            name: model.predict_proba(rows)[:, 1] for name, model in voting.named_estimators_.items()
+        }
+
+        ensemble = SoftVotingEnsemble(["rf", "lr"], weights=[2, 1])
+        np.testing.assert_allclose(ensemble.combine(member_probabilities), voting.predict_proba(rows)[:, 1])
+
+    def test_unweighted_mean(self):
+        """Test members count equally without weights"""
+        ensemble = SoftVotingEnsemble(["a", "b"])
+        combined = ensemble.combine({"a": np.array([0.2, 1.0]), "b": np.array([0.4, 0.0]), "c": np.zeros(2)})
+        np.testing.assert_allclose(combined, [0.3, 0.5])
+
+    def test_invalid_configuration(self):
+        """Test empty member lists, mismatched weights and missing members are rejected"""
+        with pytest.raises(ValueError):
+            SoftVotingEnsemble([])
+        with pytest.raises(ValueError):
+            SoftVotingEnsemble(["a", "b"], weights=[1])
+        with pytest.raises(KeyError):
+            SoftVotingEnsemble(["a", "b"]).combine({"a": np.zeros(1)})
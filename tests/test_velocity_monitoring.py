@@ -3,17 +3,26 @@ Tests for Velocity Monitoring Module
 Comprehensive test suite for transaction velocity monitoring and risk assessment
 """
 
+import math
 import pytest
 import time
 import sys
 import os
+from collections import deque
 from datetime import datetime
 from unittest.mock import patch
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from velocity_monitoring import VelocityMonitor, add_velocity_features_to_transaction
+from velocity_monitoring import (
+    CompactVelocityHistory,
+    ShardedVelocityMonitor,
+    SlidingWindowAggregate,
+    VelocityMonitor,
+    add_velocity_features_to_transaction,
+    iter_transaction_file,
+)
 
 
 class TestVelocityMonitor:
@@ -302,6 +311,417 @@ class TestVelocityMonitor:
         assert 'HIGH_FREQUENCY_MINUTE' in risk_assessment['velocity_flags']
 
 
+class TestSlidingWindowAggregates:
+    """Test incremental window aggregates against a full rescan"""
+    
+    def test_aggregate_evicts_and_tracks_max(self):
+        """Test count, sum and monotonic max across eviction"""
+        timestamps, amounts = deque(), deque()
+        window = SlidingWindowAggregate(timestamps, amounts, 60)
+        for timestamp, amount in [(0.0, 50.0), (10.0, 300.0), (20.0, 100.0), (30.0, 200.0)]:
+            timestamps.append(timestamp)
+            amounts.append(amount)
+            window.add(amount)
+        
+        assert window.count == 4
+        assert window.total == 650.0
+        assert window.max_amount == 300.0
+        
+        window.evict(15.0)
+        assert window.count == 2
+        assert window.total == 300.0
+        assert window.max_amount == 200.0
+        assert window.first_timestamp == 20.0
+        assert window.last_timestamp == 30.0
+        
+        window.evict(100.0)
+        assert window.count == 0
+        assert window.total == 0.0
+        assert window.max_amount == 0
+    
+    def test_running_total_does_not_drift(self):
+        """Test the running total matches an exact sum after evicting amounts of mixed magnitude"""
+        monitor = VelocityMonitor()
+        customer_id = "CUST_DRIFT"
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx in range(2000):
+                now = 1000.0 + idx
+                mock_time.time.return_value = now
+                amount = 1e17 if idx % 500 == 0 else 0.1 * (idx % 7) + 0.01
+                monitor.record_transaction(customer_id, {"transaction_amount": amount})
+                
+                for window in monitor.transaction_buffer[customer_id]['windows'].values():
+                    entries = list(window.amounts)[window.start:]
+                    assert window.total == pytest.approx(math.fsum(entries), rel=1e-12, abs=1e-9)
+    
+    def test_incremental_metrics_match_rescan(self):
+        """Test incremental metrics are identical to a full rescan of the history"""
+        monitor = VelocityMonitor()
+        customer_id = "CUST_INCREMENTAL"
+        base_time = 1_700_000_000.0
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx in range(400):
+                now = base_time + idx * 37.0
+                mock_time.time.return_value = now
+                amount = float((idx * 7919) % 1000) + 0.25
+                monitor.record_transaction(customer_id, {"transaction_amount": amount})
+                
+                metrics = monitor.calculate_velocity_metrics(customer_id, now)
+                buffer = monitor.transaction_buffer[customer_id]
+                assert metrics == monitor._scan_velocity_metrics(
+                    list(buffer['timestamps']), list(buffer['amounts']), now
+                )
+    
+    def test_earlier_current_time_falls_back_to_rescan(self):
+        """Test metrics for a point before the last evaluation are still correct"""
+        monitor = VelocityMonitor()
+        customer_id = "CUST_REWIND"
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx, now in enumerate([1000.0, 1030.0, 1200.0]):
+                mock_time.time.return_value = now
+                monitor.record_transaction(customer_id, {"transaction_amount": 100.0 * (idx + 1)})
+        
+        assert monitor.calculate_velocity_metrics(customer_id, 1200.0)["minute_window_count"] == 1
+        
+        rewound = monitor.calculate_velocity_metrics(customer_id, 1050.0)
+        assert rewound["minute_window_count"] == 3
+        assert rewound["minute_window_total_amount"] == 600.0
+        assert rewound["minute_window_max_amount"] == 300.0
+
+
+class TestCompactVelocityStorage:
+    """Test the array-backed compact storage mode"""
+    
+    def test_compact_mode_matches_standard(self):
+        """Test compact storage produces the same metrics as the standard layout"""
+        standard = VelocityMonitor()
+        compact = VelocityMonitor(storage_mode="compact")
+        customer_id = "CUST_COMPACT"
+        base_time = 1_700_000_000.0
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx in range(300):
+                now = base_time + idx * 45.0
+                mock_time.time.return_value = now
+                transaction = {"transaction_amount": float((idx * 104729) % 5000) + 0.5}
+                standard.record_transaction(customer_id, transaction)
+                compact.record_transaction(customer_id, transaction)
+                
+                assert (compact.calculate_velocity_metrics(customer_id, now) ==
+                        standard.calculate_velocity_metrics(customer_id, now))
+    
+    def test_compact_mode_does_not_retain_payload(self):
+        """Test compact storage keeps only timestamps and amounts"""
+        monitor = VelocityMonitor(storage_mode="compact")
+        monitor.record_transaction("CUST_001", {"transaction_amount": 500.0, "card_number": "4111"})
+        
+        history = monitor.transaction_buffer["CUST_001"]
+        assert isinstance(history, CompactVelocityHistory)
+        assert len(history) == 1
+        assert history.history() == ([history.timestamp_at(0)], [500.0])
+        assert not hasattr(history, "transactions")
+    
+    def test_compact_mode_capped_retention(self):
+        """Test the retention cap drops the oldest transactions from every window"""
+        monitor = VelocityMonitor(storage_mode="compact")
+        monitor._max_transactions_per_customer = 20
+        customer_id = "CUST_CAPPED"
+        
+        for idx in range(50):
+            monitor.record_transaction(customer_id, {"transaction_amount": float(idx)})
+        
+        history = monitor.transaction_buffer[customer_id]
+        assert len(history) == 20
+        assert len(history.timestamps) == 20
+        
+        metrics = monitor.calculate_velocity_metrics(customer_id)
+        assert metrics['minute_window_count'] == 20
+        assert metrics['minute_window_total_amount'] == sum(range(30, 50))
+        assert metrics['minute_window_max_amount'] == 49.0
+    
+    def test_compact_mode_float32_amounts(self):
+        """Test float32 amount storage"""
+        monitor = VelocityMonitor(storage_mode="compact")
+        monitor._amount_typecode = "f"
+        
+        monitor.record_transaction("CUST_F32", {"transaction_amount": 0.1})
+        history = monitor.transaction_buffer["CUST_F32"]
+        
+        assert history.amounts.typecode == "f"
+        assert monitor.calculate_velocity_metrics("CUST_F32")['minute_window_total_amount'] == pytest.approx(0.1)
+    
+    def test_compact_mode_cleanup(self):
+        """Test cleanup evicts compact histories"""
+        monitor = VelocityMonitor(storage_mode="compact")
+        monitor.record_transaction("CUST_OLD", {"transaction_amount": 500.0})
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            mock_time.time.return_value = time.time() + 1000000
+            monitor._cleanup_old_transactions()
+        
+        assert "CUST_OLD" not in monitor.transaction_buffer
+    
+    def test_unknown_storage_mode(self):
+        """Test an unknown storage mode is rejected"""
+        with pytest.raises(ValueError):
+            VelocityMonitor(storage_mode="columnar")
+
+
+class TestShardedVelocityMonitor:
+    """Test the lock-striped sharded velocity monitor"""
+    
+    def test_sharded_matches_single_monitor(self):
+        """Test sharding does not change velocity assessments"""
+        single = VelocityMonitor()
+        sharded = ShardedVelocityMonitor(num_shards=4)
+        
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx in range(200):
+                mock_time.time.return_value = 1_700_000_000.0 + idx * 5.0
+                customer_id = f"CUST_{idx % 7}"
+                transaction = {"transaction_amount": float(idx % 13) * 1000.0, "customer_id": customer_id}
+                
+                expected = single.assess_velocity_risk(customer_id, transaction)
+                actual = sharded.assess_velocity_risk(customer_id, transaction)
+                assert actual['velocity_metrics'] == expected['velocity_metrics']
+                assert actual['velocity_risk_score'] == expected['velocity_risk_score']
+    
+    def test_customers_routed_to_stable_shards(self):
+        """Test each customer always lands on the same shard"""
+        sharded = ShardedVelocityMonitor(num_shards=8)
+        other = ShardedVelocityMonitor(num_shards=8)
+        
+        for idx in range(20):
+            sharded.record_transaction(f"CUST_{idx}", {"transaction_amount": 10.0})
+        
+        assert len(sharded.transaction_buffer) == 20
+        for idx in range(20):
+            customer_id = f"CUST_{idx}"
+            assert sharded.shards.index(sharded.shard_for(customer_id)) == (
+                other.shards.index(other.shard_for(customer_id))
+            )
+            assert customer_id in sharded.shard_for(customer_id).transaction_buffer
+            assert len(sharded.transaction_buffer[customer_id]['timestamps']) == 1
+        assert "CUST_MISSING" not in sharded.transaction_buffer
+    
+    def test_incremental_cleanup_evicts_in_batches(self):
+        """Test eviction proceeds a bounded batch at a time instead of a full sweep"""
+        with patch('velocity_monitoring.time') as mock_time:
+            mock_time.time.return_value = 1_000_000.0
+            monitor = VelocityMonitor()
+            monitor._cleanup_batch_size = 2
+            
+            for idx in range(6):
+                monitor.record_transaction(f"CUST_{idx}", {"transaction_amount": 10.0})
+            
+            # A week later every customer is stale, but each record only evicts a batch
+            mock_time.time.return_value = 1_000_000.0 + 604800 + 301
+            monitor.record_transaction("CUST_NEW", {"transaction_amount": 10.0})
+            assert len(monitor.transaction_buffer) == 5
+            
+            monitor.record_transaction("CUST_NEW", {"transaction_amount": 10.0})
+            monitor.record_transaction("CUST_NEW", {"transaction_amount": 10.0})
+            assert list(monitor.transaction_buffer.keys()) == ["CUST_NEW"]
+    
+    def test_sharded_concurrent_access(self):
+        """Test concurrent recording across shards"""
+        import threading
+        
+        sharded = ShardedVelocityMonitor(num_shards=4)
+        
+        def record_transactions(worker):
+            for idx in range(50):
+                sharded.record_transaction(f"CUST_{worker}_{idx % 5}", {"transaction_amount": 1.0})
+        
+        threads = [threading.Thread(target=record_transactions, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(sharded.transaction_buffer) == 20
+        metrics = sharded.calculate_velocity_metrics("CUST_0_0")
+        assert metrics['minute_window_count'] == 10
+
+
+class TestVelocityBatchAssessment:
+    """Test the vectorized batch velocity assessment against the scalar path"""
+    
+    def _scalar_results(self, customer_ids, timestamps, amounts):
+        monitor = VelocityMonitor()
+        results = []
+        with patch('velocity_monitoring.time') as mock_time:
+            for customer_id, timestamp, amount in zip(customer_ids, timestamps, amounts):
+                mock_time.time.return_value = timestamp
+                results.append(monitor.assess_velocity_risk(customer_id, {"transaction_amount": amount}))
+        return results
+    
+    def test_batch_matches_scalar_path(self):
+        """Test batch scores and metrics match row-by-row assessment on the same ordered input"""
+        import random
+        rng = random.Random(7)
+        
+        customer_ids, timestamps, amounts = [], [], []
+        now = 1_700_000_000.0
+        for _ in range(600):
+            now += rng.choice([0.0, 0.5, 2.0, 15.0, 400.0, 5000.0])
+            customer_ids.append(f"CUST_{rng.randint(0, 5)}")
+            timestamps.append(now)
+            amounts.append(float(rng.choice([25, 500, 9000, 60000, 150000])) + 0.25)
+        
+        expected = self._scalar_results(customer_ids, timestamps, amounts)
+        batch = VelocityMonitor().assess_velocity_risk_batch(customer_ids, timestamps, amounts)
+        
+        for idx, result in enumerate(expected):
+            assert batch['velocity_risk_score'][idx] == pytest.approx(result['velocity_risk_score'], abs=1e-4)
+            assert batch['velocity_risk_level'][idx] == result['velocity_risk_level']
+            assert batch['velocity_flags_count'][idx] == len(result['velocity_flags'])
+            assert bool(batch['requires_velocity_review'][idx]) == result['requires_velocity_review']
+            for key, value in result['velocity_metrics'].items():
+                assert batch[key][idx] == pytest.approx(value), key
+    
+    def test_batch_totals_carry_no_other_customer_rounding(self):
+        """Test a small customer's window totals are exact after a customer with huge amounts"""
+        customer_ids = ["A", "A", "A", "B", "B", "B"]
+        timestamps = [1.0, 2.0, 3.0, 1.0, 2.0, 3.0]
+        amounts = [1e15, 3e15, 7e15, 0.1, 0.2, 0.3]
+        
+        batch = VelocityMonitor().assess_velocity_risk_batch(customer_ids, timestamps, amounts)
+        
+        assert list(batch['minute_window_total_amount'][3:]) == [0.1, 0.1 + 0.2, 0.1 + 0.2 + 0.3]
+        assert list(batch['minute_window_total_amount'][:3]) == [1e15, 4e15, 11e15]
+    
+    def test_batch_rejects_unordered_timestamps(self):
+        """Test timestamps going backwards within a customer are rejected"""
+        with pytest.raises(ValueError):
+            VelocityMonitor().assess_velocity_risk_batch(["A", "B", "A"], [10.0, 5.0, 9.0], [1.0, 1.0, 1.0])
+    
+    def test_batch_empty_input(self):
+        """Test an empty batch returns empty columns"""
+        batch = VelocityMonitor().assess_velocity_risk_batch([], [], [])
+        assert len(batch['velocity_risk_score']) == 0
+
+
+class TestEventTimeVelocity:
+    """Test event-time windows, watermark eviction and replay"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.monitor = VelocityMonitor(time_mode="event")
+        self.base = 1_700_000_000.0  # 2023-11-14 22:13:20 UTC
+    
+    def test_windows_follow_event_time(self):
+        """Test windows are evaluated at transaction timestamps, not the wall clock"""
+        for offset in (0, 30, 90, 4000):
+            self.monitor.record_transaction("CUST_001", {
+                "transaction_amount": 100.0, "timestamp": self.base + offset
+            })
+        
+        metrics = self.monitor.calculate_velocity_metrics("CUST_001")
+        assert metrics['minute_window_count'] == 1
+        assert metrics['hour_window_count'] == 1
+        assert metrics['day_window_count'] == 4
+    
+    def test_iso_timestamps(self):
+        """Test ISO 8601 event timestamps, with naive values taken as UTC"""
+        self.monitor.record_transaction("CUST_001", {
+            "transaction_amount": 10.0, "timestamp": "2023-11-14T22:13:20Z"
+        })
+        recorded = self.monitor.record_transaction("CUST_001", {
+            "transaction_amount": 10.0, "timestamp": "2023-11-14T22:13:50"
+        })
+        
+        assert recorded == self.base + 30
+        assert self.monitor.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 2
+    
+    def test_missing_timestamp_rejected(self):
+        """Test event mode requires a timestamp"""
+        with pytest.raises(ValueError):
+            self.monitor.record_transaction("CUST_001", {"transaction_amount": 10.0})
+    
+    def test_late_events_dropped_behind_watermark(self):
+        """Test events older than the watermark are counted and dropped"""
+        self.monitor.record_transaction("CUST_001", {"transaction_amount": 10.0, "timestamp": self.base})
+        assert self.monitor.record_transaction(
+            "CUST_001", {"transaction_amount": 10.0, "timestamp": self.base - 5}
+        ) is None
+        assert self.monitor.late_event_count == 1
+        
+        monitor = VelocityMonitor(time_mode="event")
+        monitor._allowed_lateness = 60
+        monitor.record_transaction("CUST_001", {"transaction_amount": 10.0, "timestamp": self.base})
+        recorded = monitor.record_transaction(
+            "CUST_001", {"transaction_amount": 10.0, "timestamp": self.base - 5}
+        )
+        assert recorded == self.base  # kept in order behind the customer's latest event
+        assert monitor.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 2
+    
+    def test_watermark_evicts_idle_customers(self):
+        """Test cleanup is driven by event time rather than the wall clock"""
+        self.monitor.record_transaction("CUST_OLD", {"transaction_amount": 10.0, "timestamp": self.base})
+        self.monitor.record_transaction("CUST_NEW", {
+            "transaction_amount": 10.0, "timestamp": self.base + 8 * 86400
+        })
+        
+        assert "CUST_OLD" not in self.monitor.transaction_buffer
+        assert "CUST_NEW" in self.monitor.transaction_buffer
+    
+    def test_off_hours_uses_event_hour(self):
+        """Test off-hours flags use the UTC hour of the event"""
+        result = None
+        for offset in range(5):
+            result = self.monitor.assess_velocity_risk("CUST_001", {
+                "transaction_amount": 10.0, "timestamp": self.base + 2 * 3600 + offset
+            })
+        assert "OFF_HOURS_ACTIVITY" in result['velocity_flags']
+        
+        result = self.monitor.assess_velocity_risk("CUST_002", {
+            "transaction_amount": 10.0, "timestamp": self.base + 14 * 3600
+        })
+        assert "OFF_HOURS_ACTIVITY" not in result['velocity_flags']
+    
+    def test_replay_csv_and_jsonl(self, tmp_path):
+        """Test replaying CSV and JSON Lines files gives identical assessments"""
+        import csv
+        import json
+        
+        rows = [
+            {"customer_id": f"CUST_{idx % 3}", "transaction_amount": 100.0 + idx,
+             "timestamp": self.base + idx * 7}
+            for idx in range(30)
+        ]
+        csv_path = tmp_path / "transactions.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        jsonl_path = tmp_path / "transactions.jsonl"
+        jsonl_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        
+        from_csv = list(VelocityMonitor(time_mode="event").replay(iter_transaction_file(str(csv_path))))
+        from_jsonl = list(VelocityMonitor(time_mode="event").replay(iter_transaction_file(str(jsonl_path))))
+        
+        assert len(from_csv) == 30
+        assert [r['velocity_risk_score'] for r in from_csv] == [r['velocity_risk_score'] for r in from_jsonl]
+        assert from_csv[-1]['velocity_metrics']['minute_window_count'] == 3
+    
+    def test_replay_requires_event_mode(self):
+        """Test replay refuses to run on the wall clock"""
+        with pytest.raises(ValueError):
+            list(VelocityMonitor().replay([]))
+    
+    def test_batch_uses_event_hours(self):
+        """Test the batch path flags off-hours from each row's timestamp"""
+        timestamps = [self.base + 2 * 3600, self.base + 14 * 3600]
+        batch = self.monitor.assess_velocity_risk_batch(["CUST_A", "CUST_B"], timestamps, [10.0, 10.0])
+        
+        # Identical single transactions, differing only by the off-hours flag
+        assert batch['velocity_flags_count'][0] == batch['velocity_flags_count'][1] + 1
+
+
 class TestVelocityFeatureIntegration:
     """Test velocity monitoring integration with other features"""
     
@@ -0,0 +1,146 @@
+"""
+Tests for Velocity Sketches Module
+Approximate, fixed-memory velocity windows for high-cardinality keys
+"""
+
+import pytest
+import random
+import sys
+import os
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import DimensionVelocityMonitor, ShardedVelocityMonitor, VelocityMonitor
+from velocity_sketches import SlidingCountMinSketch
+
+TIME_WINDOWS = {"minute_window": 60, "hour_window": 3600, "day_window": 86400}
+
+
+class TestSlidingCountMinSketch:
+    """Test the sketch estimates and their error bounds"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.now = 1_700_000_000.0
+
+    def test_single_key_is_exact(self):
+        """Test a key with no colliding traffic is estimated exactly"""
+        sketch = SlidingCountMinSketch(TIME_WINDOWS, width=1024, depth=4)
+        for offset, amount in ((0, 100.0), (10, 250.5), (20, 75.25)):
+            sketch.add("MERCHANT_1", self.now + offset, amount)
+
+        metrics = sketch.metrics("MERCHANT_1", self.now + 20)
+        assert metrics['minute_window_count'] == 3
+        assert metrics['minute_window_total_amount'] == 425.75
+        assert metrics['minute_window_max_amount'] == 250.5
+        assert metrics['minute_window_rate'] == pytest.approx(3 / 20)
+        assert sketch.metrics("MERCHANT_2", self.now + 20)['minute_window_count'] == 0
+
+    def test_counts_within_error_bound(self):
+        """Test estimates never undercount and overshoot by at most e/width of the traffic"""
+        rng = random.Random(3)
+        sketch = SlidingCountMinSketch(TIME_WINDOWS, width=256, depth=4)
+        exact = {}
+        for idx in range(5000):
+            key = f"IP_{int(rng.paretovariate(1.2)) % 2000}"
+            exact[key] = exact.get(key, 0) + 1
+            sketch.add(key, self.now + idx * 0.001, 1.0)
+
+        bound = sketch.error_bounds()["count_epsilon"] * 5000
+        for key, count in exact.items():
+            estimate = sketch.metrics(key, self.now + 5)['minute_window_count']
+            assert count <= estimate <= count + bound
+
+    def test_buckets_expire(self):
+        """Test old buckets rotate out of each window"""
+        sketch = SlidingCountMinSketch(TIME_WINDOWS, buckets_per_window=12)
+        sketch.add("DEVICE_1", self.now, 10.0)
+
+        assert sketch.metrics("DEVICE_1", self.now + 30)['minute_window_count'] == 1
+        later = sketch.metrics("DEVICE_1", self.now + 120)
+        assert later['minute_window_count'] == 0
+        assert later['hour_window_count'] == 1
+
+        sketch.add("DEVICE_1", self.now + 7200, 10.0)
+        assert sketch.metrics("DEVICE_1", self.now + 7200)['hour_window_count'] == 1
+        assert sketch.metrics("DEVICE_1", self.now + 7200)['day_window_count'] == 2
+
+    def test_distinct_counts(self):
+        """Test distinct values per key are estimated within the HyperLogLog error"""
+        sketch = SlidingCountMinSketch(TIME_WINDOWS, distinct_windows=["hour_window"], hll_registers=64)
+        for idx in range(2000):
+            sketch.add("MERCHANT_1", self.now + idx * 0.5, 20.0, distinct_value=f"CARD_{idx % 400}")
+
+        metrics = sketch.metrics("MERCHANT_1", self.now + 1000)
+        assert metrics['hour_window_count'] == 2000
+        assert metrics['hour_window_distinct_count'] == pytest.approx(400, rel=0.3)
+        assert 'minute_window_distinct_count' not in metrics
+
+    def test_memory_is_fixed(self):
+        """Test memory does not grow with the number of keys"""
+        sketch = SlidingCountMinSketch(TIME_WINDOWS, width=512, depth=4)
+        before = sketch.nbytes
+        for idx in range(2000):
+            sketch.add(f"IP_{idx}", self.now, 1.0)
+        assert sketch.nbytes == before
+
+    def test_invalid_configuration(self):
+        """Test unsupported sketch shapes are rejected"""
+        with pytest.raises(ValueError):
+            SlidingCountMinSketch(TIME_WINDOWS, depth=9)
+        with pytest.raises(ValueError):
+            SlidingCountMinSketch(TIME_WINDOWS, hll_registers=48)
+        with pytest.raises(ValueError):
+            SlidingCountMinSketch(TIME_WINDOWS, distinct_windows=["year_window"])
+
+
+class TestApproximateVelocityMonitor:
+    """Test the approximate storage mode of VelocityMonitor"""
+
+    def test_matches_exact_mode_without_collisions(self):
+        """Test risk assessments agree with the exact mode for a lightly loaded sketch"""
+        approximate = VelocityMonitor(storage_mode="approximate")
+        exact = VelocityMonitor()
+
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx, amount in enumerate((25.0, 9500.0, 12000.0, 60000.0, 150000.0)):
+                mock_time.time.return_value = 1_700_000_000.0 + idx * 5
+                approximate_result = approximate.assess_velocity_risk("MERCHANT_1", {"transaction_amount": amount})
+                exact_result = exact.assess_velocity_risk("MERCHANT_1", {"transaction_amount": amount})
+
+                assert approximate_result['velocity_risk_score'] == exact_result['velocity_risk_score']
+                assert approximate_result['velocity_flags'] == exact_result['velocity_flags']
+
+    def test_no_per_key_buffers(self):
+        """Test the approximate mode keeps nothing per key"""
+        monitor = VelocityMonitor(storage_mode="approximate")
+        for idx in range(100):
+            monitor.record_transaction(f"IP_{idx}", {"transaction_amount": 1.0})
+        assert len(monitor.transaction_buffer) == 0
+        assert monitor.calculate_velocity_metrics("IP_5")['minute_window_count'] == 1
+
+    def test_snapshots_and_sharding_rejected(self, tmp_path):
+        """Test operations that need per-key histories are refused"""
+        monitor = VelocityMonitor(storage_mode="approximate")
+        with pytest.raises(ValueError):
+            monitor.save_snapshot(str(tmp_path / "velocity.snap"))
+        with pytest.raises(ValueError):
+            ShardedVelocityMonitor(storage_mode="approximate", num_shards=2)
+
+    def test_dimension_monitor(self):
+        """Test per-dimension assessments with dimension-specific thresholds"""
+        monitor = DimensionVelocityMonitor(dimensions=["merchant_id", "ip_address"])
+        transaction = {"transaction_amount": 50.0, "merchant_id": "M_1", "ip_address": "10.0.0.1"}
+
+        results = {}
+        for _ in range(40):
+            results = monitor.assess_velocity_risk(transaction)
+
+        assert set(results) == {"merchant_id", "ip_address"}
+        assert results["ip_address"]['velocity_metrics']['minute_window_count'] == 40
+        assert "HIGH_FREQUENCY_MINUTE" in results["ip_address"]['velocity_flags']
+        assert "HIGH_FREQUENCY_MINUTE" not in results["merchant_id"]['velocity_flags']
+
+        assert monitor.assess_velocity_risk({"transaction_amount": 5.0}) == {}
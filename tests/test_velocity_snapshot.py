@@ -0,0 +1,187 @@
+"""
+Tests for Velocity Snapshot Module
+Binary snapshot/restore of velocity monitor state across restarts
+"""
+
+import pytest
+import time
+import sys
+import os
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from velocity_monitoring import ShardedVelocityMonitor, VelocityMonitor
+from velocity_snapshot import PeriodicSnapshotWriter, SnapshotBackedBuffer, VelocitySnapshot
+
+
+class TestVelocitySnapshot:
+    """Test the snapshot file format"""
+
+    def test_build_write_load_roundtrip(self, tmp_path):
+        """Test histories survive a write/load roundtrip and are found by customer id"""
+        snapshot = VelocitySnapshot.build(
+            ["CUST_B", "CUST_A", "CUST_C"], [2, 1, 0],
+            np.array([10.0, 20.0, 5.0]), np.array([1.5, 2.5, 3.5]),
+            metadata={"time_mode": "processing"}
+        )
+        path = str(tmp_path / "velocity.snap")
+        snapshot.write(path)
+
+        loaded = VelocitySnapshot.load(path)
+        assert len(loaded) == 3
+        assert loaded.metadata == {"time_mode": "processing"}
+
+        timestamps, amounts = loaded.history(loaded.index_of("CUST_B"))
+        assert timestamps.tolist() == [10.0, 20.0]
+        assert amounts.tolist() == [1.5, 2.5]
+        assert loaded.history(loaded.index_of("CUST_A"))[1].tolist() == [3.5]
+        assert len(loaded.history(loaded.index_of("CUST_C"))[0]) == 0
+        assert loaded.index_of("CUST_MISSING") is None
+        assert loaded.index_of("CUST_A_MUCH_LONGER_ID") is None
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test loading a file that is not a snapshot fails clearly"""
+        path = tmp_path / "not_a_snapshot.bin"
+        path.write_bytes(b"{}" * 16)
+        with pytest.raises(ValueError):
+            VelocitySnapshot.load(str(path))
+
+    def test_duplicate_customers_rejected(self):
+        """Test a customer may only appear once"""
+        with pytest.raises(ValueError):
+            VelocitySnapshot.build(["CUST_A", "CUST_A"], [1, 1], np.zeros(2), np.zeros(2))
+
+
+class TestMonitorSnapshotRestore:
+    """Test saving and restoring VelocityMonitor state"""
+
+    def _populate(self, monitor, now):
+        with patch('velocity_monitoring.time') as mock_time:
+            for idx in range(30):
+                mock_time.time.return_value = now - 3000 + idx * 100.25
+                monitor.record_transaction(f"CUST_{idx % 4}", {"transaction_amount": 100.0 + idx})
+
+    def _metrics(self, monitor, customer_ids, now):
+        with patch('velocity_monitoring.time') as mock_time:
+            mock_time.time.return_value = now
+            return {cid: monitor.calculate_velocity_metrics(cid) for cid in customer_ids}
+
+    @pytest.mark.parametrize("storage_mode", ["standard", "compact"])
+    def test_restore_matches_original(self, tmp_path, storage_mode):
+        """Test a restored monitor reports the same metrics as the one that was saved"""
+        now = time.time()
+        original = VelocityMonitor(storage_mode=storage_mode)
+        self._populate(original, now)
+        path = str(tmp_path / "velocity.snap")
+
+        assert original.save_snapshot(path) == 4
+
+        restored = VelocityMonitor(storage_mode=storage_mode)
+        assert restored.load_snapshot(path) == 4
+        assert isinstance(restored.transaction_buffer, SnapshotBackedBuffer)
+        assert restored.transaction_buffer.pending_count == 4
+
+        customer_ids = [f"CUST_{idx}" for idx in range(4)]
+        assert self._metrics(restored, customer_ids, now) == self._metrics(original, customer_ids, now)
+        assert restored.transaction_buffer.pending_count == 0
+
+    def test_restored_customers_keep_counting(self, tmp_path):
+        """Test new transactions extend restored windows instead of starting from zero"""
+        original = VelocityMonitor()
+        for _ in range(3):
+            original.record_transaction("CUST_001", {"transaction_amount": 50.0})
+        path = str(tmp_path / "velocity.snap")
+        original.save_snapshot(path)
+
+        restored = VelocityMonitor()
+        restored.load_snapshot(path)
+        assert "CUST_001" in restored.transaction_buffer
+
+        restored.record_transaction("CUST_001", {"transaction_amount": 50.0})
+        metrics = restored.calculate_velocity_metrics("CUST_001")
+        assert metrics['minute_window_count'] == 4
+        assert metrics['minute_window_total_amount'] == 200.0
+
+    def test_resave_keeps_untouched_customers(self, tmp_path):
+        """Test customers never accessed after a restore are carried into the next snapshot"""
+        original = VelocityMonitor()
+        for idx in range(5):
+            original.record_transaction(f"CUST_{idx}", {"transaction_amount": 10.0})
+        first_path = str(tmp_path / "first.snap")
+        original.save_snapshot(first_path)
+
+        restored = VelocityMonitor()
+        restored.load_snapshot(first_path)
+        restored.record_transaction("CUST_0", {"transaction_amount": 10.0})
+        restored.record_transaction("CUST_NEW", {"transaction_amount": 10.0})
+        second_path = str(tmp_path / "second.snap")
+        assert restored.save_snapshot(second_path) == 6
+
+        reloaded = VelocityMonitor()
+        reloaded.load_snapshot(second_path)
+        assert reloaded.calculate_velocity_metrics("CUST_0")['minute_window_count'] == 2
+        assert reloaded.calculate_velocity_metrics("CUST_4")['minute_window_count'] == 1
+
+    def test_expired_history_not_restored(self, tmp_path):
+        """Test customers whose history expired while the process was down are dropped"""
+        original = VelocityMonitor()
+        with patch('velocity_monitoring.time') as mock_time:
+            mock_time.time.return_value = time.time() - 8 * 86400
+            original.record_transaction("CUST_OLD", {"transaction_amount": 10.0})
+        path = str(tmp_path / "velocity.snap")
+        original.save_snapshot(path)
+
+        restored = VelocityMonitor()
+        restored.load_snapshot(path)
+        assert restored.transaction_buffer.get("CUST_OLD") is None
+
+        restored.load_snapshot(path)
+        restored._cleanup_old_transactions()
+        assert restored.transaction_buffer.pending_count == 0
+
+    def test_sharded_restore_routes_customers(self, tmp_path):
+        """Test a sharded monitor restores each customer into its own shard"""
+        original = VelocityMonitor()
+        for idx in range(40):
+            original.record_transaction(f"CUST_{idx}", {"transaction_amount": 10.0})
+        path = str(tmp_path / "velocity.snap")
+        original.save_snapshot(path)
+
+        sharded = ShardedVelocityMonitor(num_shards=4)
+        assert sharded.load_snapshot(path) == 40
+        assert sum(shard.transaction_buffer.pending_count for shard in sharded.shards) == 40
+        assert sharded.calculate_velocity_metrics("CUST_7")['minute_window_count'] == 1
+
+        resaved_path = str(tmp_path / "resaved.snap")
+        assert sharded.save_snapshot(resaved_path) == 40
+
+    def test_event_clock_restored(self, tmp_path):
+        """Test an event-time monitor resumes from the snapshot's event clock"""
+        original = VelocityMonitor(time_mode="event")
+        original.record_transaction("CUST_001", {"transaction_amount": 10.0, "timestamp": 1_700_000_000})
+        path = str(tmp_path / "velocity.snap")
+        original.save_snapshot(path)
+
+        restored = VelocityMonitor(time_mode="event")
+        restored.load_snapshot(path)
+        assert restored._event_clock == 1_700_000_000
+        assert restored.record_transaction(
+            "CUST_001", {"transaction_amount": 10.0, "timestamp": 1_699_999_000}
+        ) is None
+
+    def test_periodic_writer_writes_on_stop(self, tmp_path):
+        """Test the background writer leaves a final snapshot behind"""
+        monitor = VelocityMonitor()
+        monitor.record_transaction("CUST_001", {"transaction_amount": 10.0})
+        path = str(tmp_path / "velocity.snap")
+
+        writer = PeriodicSnapshotWriter(monitor, path, interval_seconds=3600)
+        writer.start()
+        writer.stop()
+
+        assert not writer.is_alive()
+        assert len(VelocitySnapshot.load(path)) == 1
@@ -0,0 +1,182 @@
+"""
+Tests for Shared Velocity Store Module
+Multiple worker monitors sharing one velocity state over a Unix socket
+"""
+
+import pytest
+import socket
+import sys
+import os
+import threading
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets")
+
+from velocity_monitoring import VelocityMonitor
+
+if hasattr(socket, "AF_UNIX"):
+    from velocity_store import SharedVelocityMonitor, VelocityStoreError, VelocityStoreServer
+
+
+class TestSharedVelocityStore:
+    """Test worker monitors against a store served from a background thread"""
+
+    def setup_method(self):
+        """Start a local store on a short socket path (AF_UNIX paths are length limited)"""
+        import tempfile
+        self.temp_dir = tempfile.mkdtemp(prefix="vs")
+        self.socket_path = os.path.join(self.temp_dir, "store.sock")
+        self.server = VelocityStoreServer(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+        os.rmdir(self.temp_dir)
+
+    def test_workers_share_counts(self):
+        """Test transactions recorded by different workers land in the same windows"""
+        worker_a = SharedVelocityMonitor(self.socket_path)
+        worker_b = SharedVelocityMonitor(self.socket_path)
+
+        worker_a.assess_velocity_risk("CUST_001", {"transaction_amount": 100.0})
+        worker_b.assess_velocity_risk("CUST_001", {"transaction_amount": 200.0})
+        result = worker_a.assess_velocity_risk("CUST_001", {"transaction_amount": 300.0})
+
+        assert result['velocity_metrics']['minute_window_count'] == 3
+        assert result['velocity_metrics']['minute_window_total_amount'] == 600.0
+        assert worker_b.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 3
+
+    def test_matches_in_process_monitor(self):
+        """Test a shared monitor scores exactly like an in-process one"""
+        shared = SharedVelocityMonitor(self.socket_path)
+        local = VelocityMonitor()
+
+        for amount in (25.0, 9500.0, 12000.0, 60000.0, 150000.0):
+            shared_result = shared.assess_velocity_risk("CUST_001", {"transaction_amount": amount})
+            local_result = local.assess_velocity_risk("CUST_001", {"transaction_amount": amount})
+            assert shared_result['velocity_risk_score'] == local_result['velocity_risk_score']
+            assert shared_result['velocity_flags'] == local_result['velocity_flags']
+
+    def test_concurrent_workers_lose_no_counts(self):
+        """Test concurrent recording from many threads is counted exactly"""
+        shared = SharedVelocityMonitor(self.socket_path)
+
+        def record_transactions(worker):
+            for idx in range(50):
+                shared.record_transaction(f"CUST_{idx % 5}", {"transaction_amount": 1.0})
+
+        threads = [threading.Thread(target=record_transactions, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for idx in range(5):
+            assert shared.calculate_velocity_metrics(f"CUST_{idx}")['minute_window_count'] == 80
+
+    def test_store_errors_are_raised(self):
+        """Test store-side failures surface as VelocityStoreError"""
+        shared = SharedVelocityMonitor(self.socket_path)
+        with pytest.raises(VelocityStoreError):
+            shared._call("unknown_op")
+
+        # The connection stays usable after an error response
+        assert shared.calculate_velocity_metrics("CUST_NONE")['minute_window_count'] == 0
+
+    def test_stale_connection_is_retried(self):
+        """Test a pooled connection that dies before answering is replaced and the request retried"""
+        shared = SharedVelocityMonitor(self.socket_path)
+
+        for op in ("metrics", "record"):
+            # A peer that reads the request and hangs up, as a restarted store leaves pooled sockets
+            stale, peer = socket.socketpair()
+
+            def hang_up():
+                peer.makefile("rb").readline()
+                peer.close()
+            threading.Thread(target=hang_up, daemon=True).start()
+            shared._connections.files = {0: stale.makefile("rwb")}
+
+            if op == "metrics":
+                assert shared.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 0
+            else:
+                shared.record_transaction("CUST_001", {"transaction_amount": 10.0})
+            stale.close()
+
+        assert shared.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 1
+
+    def test_repeated_request_id_recorded_once(self):
+        """Test a retried recording request is answered without recording it again"""
+        params = {"customer_id": "CUST_001", "transaction": {"transaction_amount": 10.0},
+                  "request_id": "retry-1"}
+        first = self.server.dispatch("record_and_calculate", dict(params))
+        second = self.server.dispatch("record_and_calculate", dict(params))
+
+        assert first == second
+        assert first['minute_window_count'] == 1
+        assert self.server.monitor.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 1
+
+    def test_batch_and_replay_on_shared_monitor(self):
+        """Test the inherited batch assessment and event-time replay work against the store"""
+        shared = SharedVelocityMonitor(self.socket_path, time_mode="event")
+        transactions = [{"customer_id": "CUST_001", "transaction_amount": 10.0 * (idx + 1),
+                         "timestamp": 1_700_000_000 + idx} for idx in range(3)]
+
+        replayed = list(shared.replay(transactions))
+        assert [r['velocity_metrics']['minute_window_count'] for r in replayed] == [1, 2, 3]
+        assert self.server.monitor.calculate_velocity_metrics(
+            "CUST_001", 1_700_000_002)['minute_window_count'] == 3
+
+        batch = shared.assess_velocity_risk_batch(
+            ["CUST_001"] * 3, [t["timestamp"] for t in transactions],
+            [t["transaction_amount"] for t in transactions]
+        )
+        assert list(batch['minute_window_count']) == [1, 2, 3]
+        assert list(batch['velocity_risk_score']) == [r['velocity_risk_score'] for r in replayed]
+
+    def test_unavailable_store(self):
+        """Test a missing store fails fast instead of silently undercounting"""
+        shared = SharedVelocityMonitor(os.path.join(self.temp_dir, "missing.sock"))
+        with pytest.raises(VelocityStoreError):
+            shared.assess_velocity_risk("CUST_001", {"transaction_amount": 10.0})
+
+    def test_customers_partitioned_across_stores(self):
+        """Test several stores split customers by hash while counts stay exact"""
+        second_path = os.path.join(self.temp_dir, "store2.sock")
+        second_server = VelocityStoreServer(second_path)
+        threading.Thread(target=second_server.serve_forever, daemon=True).start()
+
+        try:
+            worker_a = SharedVelocityMonitor([self.socket_path, second_path])
+            worker_b = SharedVelocityMonitor(f"{self.socket_path},{second_path}")
+            for idx in range(20):
+                worker_a.record_transaction(f"CUST_{idx}", {"transaction_amount": 1.0})
+                worker_b.record_transaction(f"CUST_{idx}", {"transaction_amount": 1.0})
+
+            assert len(self.server.monitor.transaction_buffer) > 0
+            assert len(second_server.monitor.transaction_buffer) > 0
+            assert (len(self.server.monitor.transaction_buffer)
+                    + len(second_server.monitor.transaction_buffer)) == 20
+            for idx in range(20):
+                assert worker_b.calculate_velocity_metrics(f"CUST_{idx}")['minute_window_count'] == 2
+        finally:
+            second_server.shutdown()
+            second_server.server_close()
+
+    def test_snapshot_through_store(self):
+        """Test snapshots are written and restored by the store process"""
+        shared = SharedVelocityMonitor(self.socket_path)
+        shared.record_transaction("CUST_001", {"transaction_amount": 10.0})
+        path = os.path.join(self.temp_dir, "velocity.snap")
+
+        try:
+            assert shared.save_snapshot(path) == 1
+            local = VelocityMonitor()
+            local.load_snapshot(path)
+            assert local.calculate_velocity_metrics("CUST_001")['minute_window_count'] == 1
+        finally:
+            os.unlink(path)